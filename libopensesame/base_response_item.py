@@ -204,7 +204,9 @@ class base_response_item(item):
 
 		"""
 		desc:
-			Creates a function that sleeps for a specific duration.
+			Creates a function that sleeps for a specific duration. The
+			duration is relative to the onset of the item, so that the time
+			that has passed since the onset is subtracted from the duration.
 
 		arguments:
 			duration:
@@ -218,6 +220,6 @@ class base_response_item(item):
 
 		if duration == 0:
 			return lambda: None
-		if self.var.duration > 0:
-			return lambda: self.clock.sleep(self.var.duration)
+		if duration > 0:
+			return lambda: self.clock.sleep_until(self._t0 + duration)
 		raise osexception(u'Duration should not be negative')
@@ -26,6 +26,9 @@ from libopensesame.syntax import syntax
 from libopensesame.exceptions import osexception
 from libopensesame import misc, item, debug, metadata
 from libopensesame.item_stack import item_stack_singleton
+from libopensesame.item_tracer import item_tracer_singleton
+from libopensesame.gc_scheduler import gc_scheduler_singleton
+from libopensesame.startup_profiler import startup_profiler_singleton
 from libopensesame.py3compat import *
 import os
 import pickle
@@ -396,20 +399,26 @@ class experiment(item.item):
 		self.var.opensesame_version = metadata.__version__
 		self.var.opensesame_codename = metadata.codename
 		self.running = True
-		self.init_random()
-		self.init_display()
-		self.init_clock()
-		self.init_sound()
-		self.init_log()
-		self.python_workspace.init_globals()
-		self.reset_feedback()
-		self.init_heartbeat()
+		for init_func in [self.init_random, self.init_display,
+			self.init_clock, self.init_sound, self.init_log,
+			self.python_workspace.init_globals, self.reset_feedback,
+			self.init_heartbeat]:
+			with startup_profiler_singleton.step(
+				u'experiment.%s' % init_func.__name__):
+				init_func()
+		if startup_profiler_singleton.enabled:
+			print(startup_profiler_singleton.report())
+			startup_profiler_singleton.disable()
 		print(u"experiment.run(): experiment started at %s" % time.ctime())
 
 		if self.var.start in self.items:
 			item_stack_singleton.clear()
+			if self.var.get(u'trace_items', u'no', [u'yes', u'no']) == u'yes':
+				print('experiment.run(): enabling item tracer')
+				item_tracer_singleton.enable()
 			if self.var.disable_garbage_collection == u'yes':
 				print('experiment.run(): disabling garbage collection')
+				gc_scheduler_singleton.configure_from_experiment(self)
 				gc.disable()
 			self.items.execute(self.var.start)
 		else:
@@ -485,6 +494,14 @@ class experiment(item.item):
 		sampler.close_sound(self)
 		canvas.close_display(self)
 		self.cleanup()
+		if item_tracer_singleton.enabled:
+			try:
+				path = os.path.splitext(self.logfile)[0] + u'.trace.json'
+				print(u'experiment.end(): saving item trace to %s' % path)
+				item_tracer_singleton.save_chrome_trace(path)
+			except Exception as e:
+				print(u'experiment.end(): failed to save item trace: %s' % e)
+			item_tracer_singleton.disable()
 		if not gc.isenabled():
 			print('experiment.end(): enabling garbage collection')
 			gc.enable()
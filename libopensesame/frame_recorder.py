@@ -0,0 +1,224 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from array import array
+import os
+import struct
+import sys
+
+class frame_recorder(object):
+
+	"""
+	desc: |
+		Records the timestamps of display flips, as returned by
+		`canvas.show()`. Items that care about display timing, such as
+		`coroutines` and `video_player`, start a recording at the beginning of
+		their run phase, and stop it at the end. In between, every flip is
+		recorded into a preallocated array, so that recording doesn't allocate
+		memory. Recordings can be nested, in which case the outer recording
+		also contains the flips of the inner recording.
+
+		Flips that occur while no recording is active are ignored, and flips
+		that don't fit in the array anymore are discarded.
+	"""
+
+	def __init__(self, capacity=65536):
+
+		"""
+		desc:
+			Constructor.
+
+		keywords:
+			capacity:
+				desc:	The maximum number of flips that can be recorded at
+						once.
+				type:	int
+		"""
+
+		self._timestamps = array(u'd' if py3 else b'd', [0]) * capacity
+		self._n = 0
+		self._depth = 0
+
+	@property
+	def recording(self):
+
+		"""
+		desc:
+			Indicates whether a recording is active.
+		"""
+
+		return self._depth > 0
+
+	def start(self):
+
+		"""
+		desc:
+			Starts a recording.
+
+		returns:
+			desc:	A handle to pass to `stop()`.
+			type:	int
+		"""
+
+		if not self._depth:
+			self._n = 0
+		self._depth += 1
+		return self._n
+
+	def stop(self, handle):
+
+		"""
+		desc:
+			Stops a recording.
+
+		arguments:
+			handle:
+				desc:	The handle that was returned by `start()`.
+				type:	int
+
+		returns:
+			desc:	The recorded timestamps.
+			type:	list
+		"""
+
+		self._depth = max(0, self._depth - 1)
+		return self._timestamps[handle:self._n].tolist()
+
+	def record(self, t):
+
+		"""
+		desc:
+			Records the timestamp of a flip, if a recording is active.
+
+		arguments:
+			t:
+				desc:	The timestamp.
+				type:	[int, float]
+
+		returns:
+			desc:	The timestamp, so that this function can wrap the return
+					value of `canvas.show()`.
+			type:	[int, float]
+		"""
+
+		if self._depth and self._n < len(self._timestamps):
+			self._timestamps[self._n] = t
+			self._n += 1
+		return t
+
+def summarize(timestamps, interval=None):
+
+	"""
+	desc:
+		Summarizes the timing of a series of flips.
+
+	arguments:
+		timestamps:
+			desc:	A list of flip timestamps.
+			type:	list
+
+	keywords:
+		interval:
+			desc:	The intended interval between flips, or None to use the
+					median interval.
+			type:	[int, float, NoneType]
+
+	returns:
+		desc: |
+			A dict with the following keys:
+
+			- `count` is the number of flips.
+			- `mean_interval` is the mean interval between flips.
+			- `max_jitter` is the largest deviation of an interval from the
+			  intended interval.
+			- `dropped` is the estimated number of frames that were skipped,
+			  i.e. for each interval the number of intended intervals that
+			  fit in it, minus one.
+
+			Intervals are None if there are fewer than two flips.
+		type:	dict
+	"""
+
+	intervals = [t2 - t1 for t1, t2 in zip(timestamps[:-1], timestamps[1:])]
+	if not intervals:
+		return {
+			u'count' : len(timestamps),
+			u'mean_interval' : None,
+			u'max_jitter' : None,
+			u'dropped' : 0
+			}
+	if interval is None:
+		interval = sorted(intervals)[len(intervals) // 2]
+	dropped = 0
+	if interval > 0:
+		for dt in intervals:
+			dropped += max(0, int(round(dt / interval)) - 1)
+	return {
+		u'count' : len(timestamps),
+		u'mean_interval' : sum(intervals) / len(intervals),
+		u'max_jitter' : max(abs(dt - interval) for dt in intervals),
+		u'dropped' : dropped
+		}
+
+def log_summary(item, timestamps, interval=None):
+
+	"""
+	desc:
+		Summarizes the timing of a series of flips, and sets the summary as
+		experimental variables: `flip_count_[item]`,
+		`flip_mean_interval_[item]`, `flip_max_jitter_[item]`, and
+		`flip_dropped_[item]`. If the experimental variable
+		`save_flip_timestamps` is 'yes', the timestamps are also appended to a
+		binary file next to the log file: `[logfile base].[item].flips`. For each
+		run of the item, this file contains the number of flips as a
+		little-endian unsigned 32-bit integer, followed by the timestamps as
+		little-endian 64-bit floats.
+
+	arguments:
+		item:
+			desc:	The item that recorded the flips.
+			type:	item
+		timestamps:
+			desc:	A list of flip timestamps.
+			type:	list
+
+	keywords:
+		interval:
+			desc:	The intended interval between flips, or None to use the
+					median interval.
+			type:	[int, float, NoneType]
+	"""
+
+	var = item.experiment.var
+	for key, val in summarize(timestamps, interval).items():
+		var.set(u'flip_%s_%s' % (key, item.name), val)
+	if var.get(u'save_flip_timestamps', u'no', [u'yes', u'no']) != u'yes':
+		return
+	a = array(u'd' if py3 else b'd', timestamps)
+	if sys.byteorder != u'little':
+		a.byteswap()
+	path = u'%s.%s.flips' % (os.path.splitext(item.experiment.logfile)[0],
+		item.name)
+	with open(path, u'ab') as fd:
+		fd.write(struct.pack(u'<I', len(a)))
+		fd.write(a.tobytes() if py3 else a.tostring())
+
+# Create a single instance of the recorder
+frame_recorder_singleton = frame_recorder()
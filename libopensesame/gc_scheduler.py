@@ -0,0 +1,170 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from libopensesame.exceptions import osexception
+from timeit import default_timer
+import gc
+
+class gc_scheduler(object):
+
+	"""
+	desc: |
+		Decides when garbage is collected while automatic garbage collection
+		is disabled, which is the case when the experimental variable
+		`disable_garbage_collection` is 'yes'. Only sequences call
+		`collect()`, when they finish, and what happens then depends on the
+		mode, which is set with the experimental variable `gc_mode`:
+
+		- `full` (default) does a full collection every time.
+		- `young` only collects the youngest generation, which is fast, but
+		  doesn't free objects that have survived earlier collections.
+		- `boundary` does a full collection only when the sequence is listed
+		  in the experimental variable `gc_boundaries`, a semicolon-separated
+		  list of sequence names. Names of other items have no effect.
+		- `threshold` does a full collection only when the number of
+		  allocations since the last collection (minus deallocations) exceeds
+		  the experimental variable `gc_threshold` (default: 10000).
+
+		The duration of each collection is logged as `gc_duration` (in
+		milliseconds), and the number of collections and their total duration
+		as `gc_count` and `gc_total_duration`.
+	"""
+
+	modes = [u'full', u'young', u'boundary', u'threshold']
+
+	def __init__(self):
+
+		"""
+		desc:
+			Constructor.
+		"""
+
+		self.configure()
+
+	def configure(self, mode=u'full', boundaries=None, threshold=10000):
+
+		"""
+		desc:
+			Configures the scheduler, and resets the collection statistics.
+
+		keywords:
+			mode:
+				desc:	The scheduling mode.
+				type:	str
+			boundaries:
+				desc:	The names of the sequences after which garbage is
+						collected in `boundary` mode.
+				type:	[list, NoneType]
+			threshold:
+				desc:	The number of allocations that triggers a collection
+						in `threshold` mode.
+				type:	int
+		"""
+
+		if mode not in self.modes:
+			raise osexception(u'Invalid garbage-collection mode: %s' % mode)
+		self.mode = mode
+		self.boundaries = set(boundaries) if boundaries else set()
+		self.threshold = threshold
+		self.count = 0
+		self.total_duration = 0
+
+	def configure_from_experiment(self, experiment):
+
+		"""
+		desc:
+			Configures the scheduler based on the experimental variables.
+
+		arguments:
+			experiment:
+				desc:	The experiment object.
+				type:	experiment
+		"""
+
+		var = experiment.var
+		boundaries = safe_decode(var.get(u'gc_boundaries', u''))
+		self.configure(
+			mode=var.get(u'gc_mode', u'full', self.modes),
+			boundaries=[name.strip() for name in boundaries.split(u';')
+				if name.strip()],
+			threshold=var.get(u'gc_threshold', 10000))
+
+	def generation(self, item_name):
+
+		"""
+		desc:
+			Determines which generation should be collected after a
+			sequence.
+
+		arguments:
+			item_name:
+				desc:	The name of the sequence that has finished.
+				type:	str
+
+		returns:
+			desc:	The oldest generation that should be collected, or None if
+					no garbage should be collected.
+			type:	[int, NoneType]
+		"""
+
+		if self.mode == u'full':
+			return 2
+		if self.mode == u'young':
+			return 0
+		if self.mode == u'boundary':
+			return 2 if item_name in self.boundaries else None
+		return 2 if gc.get_count()[0] >= self.threshold else None
+
+	def collect(self, item):
+
+		"""
+		desc:
+			Collects garbage after a sequence has finished, if automatic
+			garbage collection is disabled and the mode says so.
+
+		arguments:
+			item:
+				desc:	The sequence that has finished.
+				type:	sequence
+
+		returns:
+			desc:	The duration of the collection in milliseconds, or None if
+					no garbage was collected.
+			type:	[float, NoneType]
+		"""
+
+		if gc.isenabled():
+			return None
+		generation = self.generation(item.name)
+		if generation is None:
+			return None
+		t0 = default_timer()
+		gc.collect(generation)
+		duration = 1000. * (default_timer() - t0)
+		self.count += 1
+		self.total_duration += duration
+		var = item.experiment.var
+		var.gc_duration = duration
+		var.gc_count = self.count
+		var.gc_total_duration = self.total_duration
+		return duration
+
+# Create a single instance of the scheduler
+gc_scheduler_singleton = gc_scheduler()
@@ -24,17 +24,35 @@ if py3:
 	from html.parser import HTMLParser
 else:
 	from HTMLParser import HTMLParser
+import re
 from libopensesame import debug
 from libopensesame.exceptions import osexception
-try:
-	from bidi.algorithm import get_display as bidi_func
-except:
-	debug.msg(
-		u'Failed to import bidi. Bi-directional-text support will not be available',
-		reason=u'warning')
-	bidi_func = None
-else:
-	import re
+
+# The bidi module is only imported when bi-directional text is first drawn.
+# False means that it hasn't been imported yet, and None that it's not
+# available.
+_bidi_func = False
+
+def bidi_func():
+
+	"""
+	desc:
+		Gets the function that converts bi-directional text to display order.
+
+	returns:
+		desc:	A function, or None if bidi is not available.
+	"""
+
+	global _bidi_func
+	if _bidi_func is False:
+		try:
+			from bidi.algorithm import get_display as _bidi_func
+		except:
+			debug.msg(
+				u'Failed to import bidi. Bi-directional-text support will not be available',
+				reason=u'warning')
+			_bidi_func = None
+	return _bidi_func
 
 class html(HTMLParser):
 
@@ -171,9 +189,9 @@ class html(HTMLParser):
 		# Parse bi-directional strings. Bidi doesn't play nice with HTML tags,
 		# which is especially annoying for BR tags. So we first convert all BR
 		# tags to newlines.
-		if canvas.bidi and bidi_func is not None:
+		if canvas.bidi and bidi_func() is not None:
 			text = re.sub(u'<[ ]*(br|BR)[ ]*/>', u'\n', text)
-			text = bidi_func(text)
+			text = bidi_func()(text)
 		# Convert line breaks to HTML break tags
 		text = text.replace(os.linesep, u'<br />').replace(u'\n', u'<br />')
 
@@ -267,7 +285,7 @@ class html(HTMLParser):
 				_y += dy
 
 		# Restore the canvas font and colors
-		canvas.set_config(**backup_cfg)
+		canvas.restore_config(**backup_cfg)
 		if dry_run:
 			return max_width, height
 
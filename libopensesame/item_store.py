@@ -21,6 +21,7 @@ from libopensesame import plugins
 from libopensesame.misc import debug
 from libopensesame.exceptions import osexception
 from libopensesame.item_stack import item_stack_singleton
+from libopensesame.item_tracer import item_tracer_singleton
 from libopensesame.py3compat import *
 
 class item_store(object):
@@ -101,9 +102,33 @@ class item_store(object):
 		"""
 
 		item_stack_singleton.push(name, u'run')
+		t0 = item_tracer_singleton.start()
 		self[name].run()
+		if t0 is not None:
+			self._trace(name, u'run', t0)
 		item_stack_singleton.pop()
 
+	def _trace(self, name, phase, t0):
+
+		"""
+		visible: False
+
+		desc:
+			Records a phase with the item tracer, and sets the duration as an
+			experiment variable, such as `run_duration_my_sketchpad`.
+
+		arguments:
+			name:	An item name.
+			phase:	The phase, i.e. 'prepare' or 'run'.
+			t0:		The timestamp that was returned by the tracer.
+		"""
+
+		duration = item_tracer_singleton.stop(name, phase, t0,
+			len(item_stack_singleton.l)-1)
+		if duration is not None:
+			self.experiment.var.set(u'%s_duration_%s' % (phase, name),
+				duration)
+
 	def prepare(self, name):
 
 		"""
@@ -117,7 +142,10 @@ class item_store(object):
 		"""
 
 		item_stack_singleton.push(name, u'prepare')
+		t0 = item_tracer_singleton.start()
 		self[name].prepare()
+		if t0 is not None:
+			self._trace(name, u'prepare', t0)
 		item_stack_singleton.pop()
 
 	def new(self, _type, name=None, script=None):
@@ -0,0 +1,183 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from timeit import default_timer
+import json
+
+class item_tracer(object):
+
+	"""
+	desc: |
+		Records how long the prepare and run phases of items take. The tracer
+		is disabled by default, in which case it doesn't record anything. It is
+		enabled by setting the experiment variable `trace_items` to 'yes'.
+
+		Each phase is recorded as an (item, phase, start, end, depth) tuple,
+		where start and end are timestamps in milliseconds from a
+		high-resolution clock, and depth is the nesting depth on the item
+		stack. The records are kept in a preallocated ring buffer, so that
+		recording doesn't allocate memory during the experiment, and the
+		oldest records are overwritten when the buffer is full.
+	"""
+
+	def __init__(self):
+
+		"""
+		desc:
+			Constructor.
+		"""
+
+		self.disable()
+
+	def enable(self, capacity=65536):
+
+		"""
+		desc:
+			Enables the tracer, and clears all records.
+
+		keywords:
+			capacity:
+				desc:	The maximum number of records.
+				type:	int
+		"""
+
+		self.enabled = True
+		self._records = [None] * capacity
+		self._index = 0
+
+	def disable(self):
+
+		"""
+		desc:
+			Disables the tracer, and clears all records.
+		"""
+
+		self.enabled = False
+		self._records = []
+		self._index = 0
+
+	def start(self):
+
+		"""
+		desc:
+			Marks the start of a phase.
+
+		returns:
+			desc:	A timestamp to pass to `stop()`, or None if the tracer is
+					disabled.
+			type:	[float, NoneType]
+		"""
+
+		if not self.enabled:
+			return None
+		return 1000. * default_timer()
+
+	def stop(self, item, phase, start, depth):
+
+		"""
+		desc:
+			Marks the end of a phase, and records it.
+
+		arguments:
+			item:
+				desc:	The item name.
+				type:	str
+			phase:
+				desc:	The phase, i.e. 'prepare' or 'run'.
+				type:	str
+			start:
+				desc:	The timestamp that was returned by `start()`.
+				type:	[float, NoneType]
+			depth:
+				desc:	The nesting depth of the item.
+				type:	int
+
+		returns:
+			desc:	The duration of the phase in milliseconds, or None if the
+					tracer is disabled.
+			type:	[float, NoneType]
+		"""
+
+		if start is None or not self.enabled:
+			return None
+		end = 1000. * default_timer()
+		self._records[self._index % len(self._records)] = \
+			(item, phase, start, end, depth)
+		self._index += 1
+		return end - start
+
+	@property
+	def records(self):
+
+		"""
+		desc:
+			A list of (item, phase, start, end, depth) tuples, from oldest to
+			newest.
+		"""
+
+		n = len(self._records)
+		if self._index <= n:
+			return self._records[:self._index]
+		i = self._index % n
+		return self._records[i:] + self._records[:i]
+
+	def to_chrome_trace(self):
+
+		"""
+		desc:
+			Converts the records to the Chrome trace-event format, which can
+			be opened with `chrome://tracing` and other trace viewers.
+
+		returns:
+			desc:	A dict that can be serialized to JSON.
+			type:	dict
+		"""
+
+		events = []
+		for item, phase, start, end, depth in self.records:
+			events.append({
+				u'name' : item,
+				u'cat' : phase,
+				u'ph' : u'X',
+				u'ts' : 1000. * start,
+				u'dur' : 1000. * (end - start),
+				u'pid' : 0,
+				u'tid' : 0,
+				u'args' : {u'phase' : phase, u'depth' : depth}
+				})
+		return {u'traceEvents' : events, u'displayTimeUnit' : u'ms'}
+
+	def save_chrome_trace(self, path):
+
+		"""
+		desc:
+			Saves the records to a file in the Chrome trace-event format.
+
+		arguments:
+			path:
+				desc:	The path of the file.
+				type:	str
+		"""
+
+		with open(path, u'w') as fd:
+			json.dump(self.to_chrome_trace(), fd)
+
+# Create a single instance of the tracer
+item_tracer_singleton = item_tracer()
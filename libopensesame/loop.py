@@ -20,8 +20,9 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from libopensesame.exceptions import osexception
 from libopensesame import item
-from datamatrix import operations, DataMatrix
-from pseudorandom import Enforce, MaxRep, MinDist, InvalidConstraint
+# datamatrix.operations and pseudorandom are only imported when they are
+# needed, which is not the case for many loops.
+from datamatrix import DataMatrix
 import openexp.keyboard
 
 class loop(item.item):
@@ -92,6 +93,8 @@ class loop(item.item):
 				self.dm[row][var] = val
 				continue
 			if cmd == u'constrain':
+				from pseudorandom import Enforce, MaxRep, MinDist, \
+					InvalidConstraint
 				if self.operations:
 					raise osexception(
 						u'constraints must come before operations')
@@ -138,6 +141,7 @@ class loop(item.item):
 				s += u'\t%s\n' % \
 					self.syntax.create_cmd(u'setcycle', [i, name, val])
 		if self.ef is not None:
+			from pseudorandom import MaxRep, MinDist
 			d = {}
 			for constraint in self.ef.constraints:
 				col = constraint.cols[0]
@@ -186,6 +190,7 @@ class loop(item.item):
 			type:	DataMatrix
 		"""
 
+		from datamatrix import operations
 		if self.var.source == u'table':
 			src_dm = self.dm
 		else:
@@ -320,6 +325,7 @@ class loop(item.item):
 			if self.experiment.var.repeat_cycle:
 				self.live_dm <<= self.live_dm[self.live_row:self.live_row+1]
 				if self.var.order == u'random':
+					from datamatrix import operations
 					self.live_dm = self.live_dm[:self.live_row+1] \
 						<< operations.shuffle(self.live_dm[self.live_row+1:])
 			self.live_row += 1
@@ -112,6 +112,9 @@ def opensesamerun_options():
 		help=u"Print lots of debugging messages to the standard output")
 	group.add_option(u"--stack", action=u"store_true", dest=u"stack", help= \
 		u"Print stack information")
+	group.add_option(u"--profile-startup", action=u"store_true",
+		dest=u"profile_startup", help= \
+		u"Print how much time is spent on imports and initialization before the experiment starts")
 	parser.add_option_group(group)
 	group = optparse.OptionGroup(parser, u"Miscellaneous options")
 	group.add_option(u"--pylink", action=u"store_true", dest=u"pylink", help= \
@@ -120,6 +120,8 @@ class mouse_response(mouse_response_mixin, base_response_item):
 
 		base_response_item.prepare(self)
 		self._flush = self.var.flush == u'yes'
+		self._record_trajectory = self.var.get(u'mouse_trajectory', u'no',
+			[u'yes', u'no']) == u'yes'
 
 	def run(self):
 
@@ -130,7 +132,16 @@ class mouse_response(mouse_response_mixin, base_response_item):
 		# Show cursor if necessary
 		if self.var.show_cursor == u'yes':
 			self._mouse.visible = True
-		base_response_item.run(self)
+		# Optionally record the mouse trajectory until the response
+		if self._record_trajectory:
+			self._mouse.start_trajectory(
+				rate=self.var.get(u'mouse_trajectory_rate', 100))
+		try:
+			base_response_item.run(self)
+		finally:
+			if self._record_trajectory:
+				from openexp._mouse.trajectory import log_trajectory
+				log_trajectory(self.experiment, self._mouse.stop_trajectory())
 		self._mouse.visible = False
 
 	def coroutine(self):
@@ -157,4 +168,8 @@ class mouse_response(mouse_response_mixin, base_response_item):
 		l = base_response_item.var_info(self)
 		l.append( (u'cursor_x', u'[Depends on response]') )
 		l.append( (u'cursor_y', u'[Depends on response]') )
+		if self.var.get(u'mouse_trajectory', u'no') == u'yes':
+			l.append( (u'mouse_trajectory_data', u'[Depends on response]') )
+			l.append( (u'mouse_auc', u'[Depends on response]') )
+			l.append( (u'mouse_max_deviation', u'[Depends on response]') )
 		return l
@@ -19,6 +19,8 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
 import sys
+import pickle
+import hashlib
 import yaml
 import site
 from libopensesame import debug, misc
@@ -29,6 +31,11 @@ from libopensesame.py3compat import *
 _plugin_dict = {}
 _folders = {}
 _properties = {}
+_indexes = {}
+
+# The version of the plugin-index format. Indexes with another version are
+# rebuilt.
+index_version = 1
 
 # The plug-ins can be either source or bytecode. Usually they will be source,
 # but some distributions (notably the runtime for Android) will automatically
@@ -171,6 +178,28 @@ def plugin_properties(plugin, _type=u'plugins'):
 	if plugin in _properties:
 		return _properties[plugin]
 	folder = plugin_folder(plugin, _type=_type)
+	entry = _index(os.path.dirname(folder))[u'plugins'][plugin]
+	_properties[plugin] = dict(entry[u'info'])
+	_properties[plugin][u'plugin_folder'] = folder
+	_properties[plugin][u'type'] = _type
+	return _properties[plugin]
+
+def _parse_info(plugin, folder):
+
+	"""
+	desc:
+		Parses the info file of a plugin.
+
+	arguments:
+		plugin:		The plugin name.
+		folder:		The plugin folder.
+
+	returns:
+		desc:	An (info dictionary, info path) tuple. The info path is None
+				if the plugin has no info file.
+		type:	tuple
+	"""
+
 	info_txt = os.path.join(folder, u'info.txt')
 	info_yaml = os.path.join(folder, u'info.yaml')
 	# For backwards compatibility, also look for a .json file. These can be
@@ -186,13 +215,16 @@ def plugin_properties(plugin, _type=u'plugins'):
 			s = safe_decode(fd.read(), enc=u'utf-8')
 		s = s.replace(u'\t', u'    ')
 		try:
-			_properties[plugin] = yaml.load(s)
+			info = yaml.load(s)
 		except:
 			debug.msg(u'Failed to parse %s' % info_yaml)
-			_properties[plugin] = {}
+			info = {}
+		if not isinstance(info, dict):
+			info = {}
+		return info, info_yaml
 	# Old-style plug-ins, using info.txt
-	elif os.path.exists(info_txt):
-		_properties[plugin] = {}
+	if os.path.exists(info_txt):
+		info = {}
 		with open(info_txt, u'r') as fd:
 			for l in fd:
 				a = l.split(":")
@@ -203,15 +235,161 @@ def plugin_properties(plugin, _type=u'plugins'):
 						val = int(val)
 					except:
 						pass
-					_properties[plugin][var] = val
+					info[var] = val
+		return info, info_txt
+	debug.msg( \
+		u'Failed to read plug-in information (%s) from info.[txt|json]' \
+		% plugin, reason=u'warning')
+	return {}, None
+
+def _index_path(folder):
+
+	"""
+	desc:
+		Gets the path of the index file for a plugin folder. Index files are
+		stored in the user's OpenSesame folder, because plugin folders are
+		often not writable.
+
+	arguments:
+		folder:		A plugin folder.
+
+	returns:
+		The path to the index file, or None if there is no home folder.
+	"""
+
+	try:
+		home = misc.home_folder()
+	except KeyError:
+		return None
+	digest = hashlib.md5(safe_encode(folder, enc=u'utf-8')).hexdigest()
+	return os.path.join(home, u'.opensesame', u'cache',
+		u'plugin-index-%s.pickle' % digest)
+
+def _mtime(path):
+
+	"""
+	desc:
+		Gets the modification time of a path.
+
+	arguments:
+		path:		A path, or None.
+
+	returns:
+		The modification time, or None if the path doesn't exist.
+	"""
+
+	if path is None:
+		return None
+	try:
+		return os.stat(path).st_mtime
+	except OSError:
+		return None
+
+def _index_entry(plugin, folder):
+
+	"""
+	desc:
+		Builds the index entry for a single plugin.
+
+	arguments:
+		plugin:		The plugin name.
+		folder:		The plugin folder.
+
+	returns:
+		An index entry.
+	"""
+
+	entry = {
+		u'mtime' : _mtime(folder),
+		u'module' : None,
+		u'info' : {},
+		u'info_path' : None,
+		u'info_mtime' : None
+		}
+	if not os.path.isdir(folder):
+		return entry
+	for tmpl in src_templates + bytecode_templates:
+		path = os.path.join(folder, tmpl % plugin)
+		if os.path.exists(path):
+			entry[u'module'] = path
+			break
 	else:
-		_properties[plugin] = {}
-		debug.msg( \
-			u'Failed to read plug-in information (%s) from info.[txt|json]' \
-			% plugin, reason=u'warning')
-	_properties[plugin][u'plugin_folder'] = folder
-	_properties[plugin][u'type'] = _type
-	return _properties[plugin]
+		return entry
+	entry[u'info'], entry[u'info_path'] = _parse_info(plugin, folder)
+	entry[u'info_mtime'] = _mtime(entry[u'info_path'])
+	return entry
+
+def _index(folder):
+
+	"""
+	desc: |
+		Gets the index of a plugin folder, which lists for each plugin the
+		module file and the parsed info file.
+
+		Indexes are kept in memory, and are stored on disk so that they can
+		be reused the next time. A stored index is validated with the
+		modification times of the plugin folder, of each plugin's subfolder,
+		and of each plugin's info file, and only the entries that have
+		changed are rebuilt. Indexes are pickled (rather than stored as json)
+		so that the parsed info keeps its types, such as tuples and non-str
+		keys.
+
+	arguments:
+		folder:		A plugin folder.
+
+	returns:
+		An index dictionary.
+	"""
+
+	global _indexes
+	if folder in _indexes:
+		return _indexes[folder]
+	path = _index_path(folder)
+	index = None
+	if path is not None and os.path.exists(path):
+		try:
+			with open(path, u'rb') as fd:
+				index = pickle.load(fd)
+		except Exception as e:
+			debug.msg(u'Failed to read plugin index %s: %s' % (path, e))
+	if not isinstance(index, dict) or \
+		index.get(u'version', None) != index_version or \
+		index.get(u'folder', None) != folder:
+		index = {
+			u'version' : index_version,
+			u'folder' : folder,
+			u'mtime' : None,
+			u'plugins' : {}
+			}
+	changed = False
+	mtime = _mtime(folder)
+	if index[u'mtime'] != mtime:
+		# If the folder has changed, plugins may have been added or removed
+		index[u'mtime'] = mtime
+		names = [safe_decode(name, enc=misc.filesystem_encoding())
+			for name in os.listdir(folder)]
+		index[u'plugins'] = dict((name, index[u'plugins'].get(name, None))
+			for name in names)
+		changed = True
+	for name, entry in index[u'plugins'].items():
+		plugin_path = os.path.join(folder, name)
+		if entry is not None and \
+			entry[u'mtime'] == _mtime(plugin_path) and \
+			entry[u'info_mtime'] == _mtime(entry[u'info_path']):
+			continue
+		index[u'plugins'][name] = _index_entry(name, plugin_path)
+		changed = True
+	if changed and path is not None:
+		try:
+			s = pickle.dumps(index, protocol=2)
+			if not os.path.exists(os.path.dirname(path)):
+				os.makedirs(os.path.dirname(path))
+			with open(path, u'wb') as fd:
+				fd.write(s)
+		except Exception as e:
+			debug.msg(u'Failed to write plugin index %s: %s' % (path, e))
+	_indexes[folder] = index
+	return index
 
 def plugin_category(plugin, _type=u'plugins'):
 
@@ -240,12 +418,13 @@ def list_plugins(filter_disabled=True, _type=u'plugins'):
 			if not (filter_disabled and plugin_disabled(plugin, _type=_type))]
 	plugins = []
 	for folder in plugin_folders(_type=_type):
-		for plugin in os.listdir(folder):
-			if is_plugin(plugin, _type=_type):
-				_plugin = plugin, plugin_property(plugin, u'priority',
-					_type=_type)
-				if _plugin not in plugins:
-					plugins.append(_plugin)
+		for plugin, entry in sorted(_index(folder)[u'plugins'].items()):
+			if entry[u'module'] is None or not is_plugin(plugin, _type=_type):
+				continue
+			_plugin = plugin, plugin_property(plugin, u'priority',
+				_type=_type)
+			if _plugin not in plugins:
+				plugins.append(_plugin)
 	# Sort (inversely) by priority
 	plugins.sort(key=lambda p: -p[1])
 	_plugin_dict[_type] = [plugin[0] for plugin in plugins]
@@ -268,13 +447,13 @@ def plugin_folder(plugin, _type=u'plugins'):
 
 	if plugin in _folders:
 		return _folders[plugin]
+	plugin = str(plugin)
 	for folder in plugin_folders(_type=_type):
-		plugin = str(plugin)
-		for tmpl in src_templates + bytecode_templates:
-			if os.path.exists(os.path.join(folder, plugin, tmpl % plugin)):
-				f = os.path.join(folder, plugin)
-				_folders[plugin] = f
-				return f
+		entry = _index(folder)[u'plugins'].get(plugin, None)
+		if entry is not None and entry[u'module'] is not None:
+			f = os.path.join(folder, plugin)
+			_folders[plugin] = f
+			return f
 	return None
 
 def plugin_icon_large(plugin, _type=u'plugins'):
@@ -363,7 +542,7 @@ def load_plugin(plugin, item_name, experiment, string, prefix=u'',
 	item = item_class(item_name, experiment, string)
 	return item
 
-def load_extension(ext_name, main_window):
+def load_extension(ext_name, main_window, **kwdict):
 
 	"""
 	desc:
@@ -373,6 +552,10 @@ def load_extension(ext_name, main_window):
 		ext_name:		The extension name.
 		main_window:	The main window object.
 
+	keyword-dict:
+		kwdict:			Keywords that are passed on to the extension
+						constructor.
+
 	returns:
 		An extension object.
 	"""
@@ -381,7 +564,7 @@ def load_extension(ext_name, main_window):
 	mod = import_plugin(ext_name, _type=u'extensions')
 	cls = getattr(mod, ext_name)
 	ext = cls(main_window, info=plugin_properties(ext_name,
-		_type=u'extensions'))
+		_type=u'extensions'), **kwdict)
 	return ext
 
 def load_cls(path, cls, mod, pkg=None):
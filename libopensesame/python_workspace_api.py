@@ -117,6 +117,32 @@ def sampler(src, **playback_args):
 	from openexp.sampler import sampler
 	return sampler(experiment, src, **playback_args)
 
+def preload_sounds(src):
+
+	"""
+	desc: |
+		Reads and decodes sound files in advance, and keeps the decoded sounds
+		in memory for the rest of the experiment. Creating SAMPLER objects
+		for these sounds, including in `sampler` items, is then fast. The
+		total memory for decoded sounds that are kept in advance is limited
+		by the `sound_bank_size` variable (in MB). Each SAMPLER object holds
+		an additional copy of its sound, which does not count towards this
+		limit.
+
+	arguments:
+		src:
+			desc:	A list of full paths to `.wav` or `.ogg` files.
+			type:	list
+
+	example: |
+		preload_sounds([pool['standard.ogg'], pool['oddball.ogg']])
+		my_sampler = sampler(pool['oddball.ogg'])
+		my_sampler.play()
+	"""
+
+	from openexp.sampler import preload
+	preload(experiment, src)
+
 # Miscellaneous API	functions
 
 def synth(osc="sine", freq=440, length=100, attack=0, decay=5):
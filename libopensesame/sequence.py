@@ -21,7 +21,7 @@ from libopensesame.py3compat import *
 
 from libopensesame.exceptions import osexception
 from libopensesame import item
-import gc
+from libopensesame.gc_scheduler import gc_scheduler_singleton
 import openexp.keyboard
 
 class sequence(item.item):
@@ -49,8 +49,7 @@ class sequence(item.item):
 			self.python_workspace[u'self'] = self
 			if self.python_workspace._eval(cond):
 				self.experiment.items.run(_item)
-		if not gc.isenabled():
-			gc.collect()
+		gc_scheduler_singleton.collect(self)
 
 	def set_validator(self):
 
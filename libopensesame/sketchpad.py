@@ -24,7 +24,7 @@ from libopensesame.item import item
 from libopensesame.base_response_item import base_response_item
 from libopensesame.keyboard_response import keyboard_response_mixin
 from libopensesame.mouse_response import mouse_response_mixin
-from openexp.canvas import canvas
+from openexp.canvas import canvas, display_list, prepare_pool
 
 class sketchpad(base_response_item, keyboard_response_mixin,
 	mouse_response_mixin):
@@ -110,12 +110,25 @@ class sketchpad(base_response_item, keyboard_response_mixin,
 		"""See item."""
 
 		base_response_item.prepare(self)
-		self.canvas = canvas(self.experiment, color=self.var.foreground,
+		pool = prepare_pool(self.experiment)
+		if pool is None:
+			self.canvas = canvas(self.experiment, color=self.var.foreground,
+				background_color=self.var.background, auto_prepare=False)
+			for element in self.elements:
+				if element.is_shown():
+					element.draw()
+			self.canvas.prepare()
+			return
+		# If the back-end supports it, the elements are evaluated here, but the
+		# actual drawing is recorded and then done by a worker thread. The
+		# display list waits for the worker when the canvas is shown.
+		self.canvas = display_list(self.experiment, color=self.var.foreground,
 			background_color=self.var.background, auto_prepare=False)
-		for element in self.elements:
-			if element.is_shown():
-				element.draw()
-		self.canvas.prepare()
+		with self.canvas.element(self.name):
+			for element in self.elements:
+				if element.is_shown():
+					element.draw()
+		self.canvas.prepare_in_background(pool)
 
 	def run(self):
 
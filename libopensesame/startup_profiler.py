@@ -0,0 +1,201 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from timeit import default_timer
+from contextlib import contextmanager
+import sys
+if py3:
+	import builtins
+else:
+	import __builtin__ as builtins
+
+class startup_profiler(object):
+
+	"""
+	desc: |
+		Measures how much time is spent on importing modules and on
+		initialization steps before an experiment starts. The profiler is
+		enabled by passing `--profile-startup` to `opensesamerun`, and the
+		report is printed to the standard output right before the first item
+		is executed.
+
+		Import times are measured by wrapping `__import__()`. Each module is
+		listed with its cumulative import time, which includes the modules
+		that it imports, and its own time, which doesn't.
+	"""
+
+	def __init__(self):
+
+		self.enabled = False
+		self.imports = {}
+		self.steps = []
+		self._stack = []
+		self._import = None
+		self._t0 = None
+
+	def enable(self):
+
+		"""
+		desc:
+			Starts profiling.
+		"""
+
+		if self.enabled:
+			return
+		self.enabled = True
+		self._t0 = default_timer()
+		self._import = builtins.__import__
+		builtins.__import__ = self._timed_import
+
+	def disable(self):
+
+		"""
+		desc:
+			Stops profiling.
+		"""
+
+		if not self.enabled:
+			return
+		self.enabled = False
+		builtins.__import__ = self._import
+
+	@contextmanager
+	def step(self, name):
+
+		"""
+		desc:
+			A context manager that times an initialization step. If the
+			profiler is disabled, this does nothing.
+
+		arguments:
+			name:
+				desc:	The name of the step.
+				type:	str
+		"""
+
+		if not self.enabled:
+			yield
+			return
+		t0 = default_timer()
+		try:
+			yield
+		finally:
+			self.steps.append((name, 1000.*(default_timer()-t0)))
+
+	def report(self, n=25):
+
+		"""
+		desc:
+			Gives a report of the initialization steps and the slowest
+			imports.
+
+		keywords:
+			n:
+				desc:	The number of imports to list.
+				type:	int
+
+		returns:
+			desc:	A report.
+			type:	str
+		"""
+
+		l = [u'Startup profile (%.1f ms in total)' \
+			% (1000.*(default_timer()-self._t0))]
+		l.append(u'')
+		l.append(u'%-40s %10s' % (u'step', u'ms'))
+		for name, duration in self.steps:
+			l.append(u'%-40s %10.1f' % (name, duration))
+		l.append(u'')
+		l.append(u'%-40s %10s %10s' % (u'import', u'cumul. ms', u'self ms'))
+		imports = sorted(self.imports.items(), key=lambda i: -i[1][1])
+		for name, (cumulative, own) in imports[:n]:
+			l.append(u'%-40s %10.1f %10.1f' % (name, cumulative, own))
+		l.append(u'(%d modules imported in %.1f ms)' % (len(self.imports),
+			sum(own for cumulative, own in self.imports.values())))
+		return u'\n'.join(l)
+
+	def _timed_import(self, name, globals=None, locals=None, fromlist=(),
+		level=0):
+
+		"""
+		visible: False
+
+		desc:
+			A replacement for `__import__()` that times imports of modules that
+			haven't been imported yet.
+		"""
+
+		if level == 0 and name in sys.modules and \
+			not self._missing_from(name, fromlist):
+			return self._import(name, globals, locals, fromlist, level)
+		n_modules = len(sys.modules)
+		self._stack.append(0.)
+		t0 = default_timer()
+		try:
+			return self._import(name, globals, locals, fromlist, level)
+		finally:
+			duration = 1000.*(default_timer()-t0)
+			children = self._stack.pop()
+			if self._stack:
+				self._stack[-1] += duration
+			if len(sys.modules) > n_modules:
+				if level > 0 and globals is not None:
+					package = globals.get(u'__package__', None) or u''
+					name = package + u'.' + name if name else package
+				cumulative, own = self.imports.get(name, (0., 0.))
+				self.imports[name] = cumulative+duration, \
+					own+duration-children
+
+	def _missing_from(self, name, fromlist):
+
+		"""
+		visible: False
+
+		desc:
+			Checks whether a `from [name] import [fromlist]` statement may
+			import submodules that haven't been imported yet.
+
+		arguments:
+			name:
+				desc:	The name of an imported module.
+				type:	str
+			fromlist:
+				desc:	The names that are imported from the module.
+				type:	[list, tuple, NoneType]
+
+		returns:
+			desc:	True if a name in the fromlist is neither an imported
+					submodule nor an attribute of the module.
+			type:	bool
+		"""
+
+		if not fromlist:
+			return False
+		module = sys.modules[name]
+		for attr in fromlist:
+			if attr == u'*':
+				continue
+			if u'%s.%s' % (name, attr) not in sys.modules and \
+				not hasattr(module, attr):
+				return True
+		return False
+
+# A singleton instance of the startup profiler
+startup_profiler_singleton = startup_profiler()
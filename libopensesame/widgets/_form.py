@@ -21,7 +21,7 @@ from libopensesame.py3compat import *
 
 from libopensesame import type_check
 from libopensesame.exceptions import osexception
-from openexp.canvas import canvas
+from openexp.canvas import display_list
 from openexp.mouse import mouse
 
 class form(object):
@@ -121,7 +121,9 @@ class form(object):
 		n_cells = len(self.cols)*len(self.rows)
 		self.widgets = [None]*n_cells
 		self.span = [(1,1)]*n_cells
-		self.canvas = canvas(self.experiment, auto_prepare=False,
+		# The canvas is a display list, so that only widgets that have changed
+		# are redrawn when the form is rendered again.
+		self.canvas = display_list(self.experiment, auto_prepare=False,
 			color=self.item.var.foreground,
 			background_color=self.item.var.background)
 		# Dynamically load the theme object
@@ -171,30 +173,41 @@ class form(object):
 			raise osexception(u'The form contains no widgets')
 		self.mouse = mouse(self.experiment, timeout=5)
 		self.mouse.show_cursor()
-		if focus_widget is not None:
-			self.render()
-			if self.timed_out():
-				self.experiment.var.form_response = None
-				return None
-			resp = focus_widget.on_mouse_click(None)
-			if resp is not None:
-				return
-		while True:
-			self.render()
-			if self.timed_out():
-				self.experiment.var.form_response = None
-				return None
-			button, xy, time = self.mouse.get_click(visible=True)
-			if xy is None:
-				continue
-			pos = self.xy_to_index(xy)
-			if pos is not None:
-				w = self.widgets[pos]
-				if w is not None:
-					resp = self.widgets[pos].on_mouse_click(xy)
-					if resp is not None:
-						self.experiment.var.form_response = resp
-						return resp
+		# Optionally record the mouse trajectory while the form is shown
+		record_trajectory = self.experiment.var.get(u'mouse_trajectory',
+			u'no', [u'yes', u'no']) == u'yes'
+		if record_trajectory:
+			self.mouse.start_trajectory(
+				rate=self.experiment.var.get(u'mouse_trajectory_rate', 100))
+		try:
+			if focus_widget is not None:
+				self.render()
+				if self.timed_out():
+					self.experiment.var.form_response = None
+					return None
+				resp = focus_widget.on_mouse_click(None)
+				if resp is not None:
+					return
+			while True:
+				self.render()
+				if self.timed_out():
+					self.experiment.var.form_response = None
+					return None
+				button, xy, time = self.mouse.get_click(visible=True)
+				if xy is None:
+					continue
+				pos = self.xy_to_index(xy)
+				if pos is not None:
+					w = self.widgets[pos]
+					if w is not None:
+						resp = self.widgets[pos].on_mouse_click(xy)
+						if resp is not None:
+							self.experiment.var.form_response = resp
+							return resp
+		finally:
+			if record_trajectory:
+				from openexp._mouse.trajectory import log_trajectory
+				log_trajectory(self.experiment, self.mouse.stop_trajectory())
 		self.mouse.hide_cursor()
 
 	def timed_out(self):
@@ -325,9 +338,15 @@ class form(object):
 		"""
 
 		self.validate_geometry()
-		self.canvas.clear()
-		for widget in self.widgets:
-			if widget is not None:
+		for index, widget in enumerate(self.widgets):
+			if widget is None:
+				self.canvas.remove(index)
+				continue
+			# The element area extends into the spacing around the cell, so
+			# that frames are fully contained.
+			x, y, w, h = self.get_rect(index)
+			with self.canvas.element(index, (x-self.spacing, y-self.spacing,
+				w+2*self.spacing, h+2*self.spacing)):
 				widget.render()
 		self.canvas.show()
 
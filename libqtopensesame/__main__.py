@@ -125,8 +125,11 @@ def opensesamerun():
 	import libopensesame.misc
 	libopensesame.misc.parse_environment_file()
 	import libopensesame.experiment
+	from libopensesame.startup_profiler import startup_profiler_singleton
 	# Parse the command line options
 	options = libopensesame.misc.opensesamerun_options()
+	if options.profile_startup:
+		startup_profiler_singleton.enable()
 	app = None
 	# If the command line options haven't provided sufficient information to
 	# run right away, present a GUI
@@ -169,8 +172,9 @@ def opensesamerun():
 
 	if options.debug:
 		# In debug mode, don't try to catch any exceptions
-		exp = libopensesame.experiment.experiment(u"Experiment",
-			experiment, experiment_path=experiment_path)
+		with startup_profiler_singleton.step(u'parse experiment'):
+			exp = libopensesame.experiment.experiment(u"Experiment",
+				experiment, experiment_path=experiment_path)
 		exp.set_subject(options.subject)
 		exp.var.fullscreen = options.fullscreen
 		exp.logfile = logfile
@@ -181,8 +185,9 @@ def opensesamerun():
 		experiment_path = safe_decode(os.path.abspath(options.experiment),
 			enc=libopensesame.misc.filesystem_encoding())
 		try:
-			exp = libopensesame.experiment.experiment(u"Experiment",
-				experiment, experiment_path=experiment_path)
+			with startup_profiler_singleton.step(u'parse experiment'):
+				exp = libopensesame.experiment.experiment(u"Experiment",
+					experiment, experiment_path=experiment_path)
 		except Exception as e:
 			libopensesame.misc.messagebox(u"OpenSesame Run",
 				libopensesame.misc.strip_tags(e))
@@ -26,6 +26,42 @@ from libqtopensesame.misc.config import cfg
 from libqtopensesame.misc.base_subcomponent import base_subcomponent
 from libqtopensesame.misc.translate import translation_context
 
+# The .ui files by extension folder. Each entry is a (modification time,
+# resources) tuple.
+_ui_files = {}
+
+def ui_files(ext_name, folder):
+
+	"""
+	desc:
+		Gets the .ui files in an extension folder. The folder is only scanned
+		once, and again when its modification time changes.
+
+	arguments:
+		ext_name:
+			desc:	The extension name.
+			type:	unicode
+		folder:
+			desc:	The extension folder.
+			type:	unicode
+
+	returns:
+		desc:	A dictionary with `extensions.[extension name].[ui name]`
+				resource names as keys and paths as values.
+		type:	dict
+	"""
+
+	mtime = os.path.getmtime(folder)
+	if folder in _ui_files and _ui_files[folder][0] == mtime:
+		return _ui_files[folder][1]
+	resources = {}
+	for path in os.listdir(folder):
+		if path.endswith(u'.ui'):
+			resources[u'extensions.%s.%s' % (ext_name,
+				os.path.splitext(path)[0])] = os.path.join(folder, path)
+	_ui_files[folder] = mtime, resources
+	return resources
+
 class base_extension(base_subcomponent):
 
 	"""
@@ -33,7 +69,7 @@ class base_extension(base_subcomponent):
 		A base class for GUI extensions.
 	"""
 
-	def __init__(self, main_window, info={}):
+	def __init__(self, main_window, info={}, action=None):
 
 		"""
 		desc:
@@ -45,6 +81,9 @@ class base_extension(base_subcomponent):
 		keywords:
 			info:			A dictionary with extension properties that have
 							been read from info.[json|txt].
+			action:			An existing QAction to use for the extension, or
+							None to create a new one. This is used when an
+							extension is loaded lazily.
 		"""
 
 		debug.msg(u'creating %s' % self.name())
@@ -52,7 +91,10 @@ class base_extension(base_subcomponent):
 		self.info = info
 		self.setup(main_window)
 		self.register_ui_files()
-		self.create_action()
+		if action is None:
+			self.create_action()
+		else:
+			self.action = action
 		self.register_config()
 
 	@property
@@ -413,11 +455,8 @@ class base_extension(base_subcomponent):
 			be retrieved as extensions.[extension name].[ui name].
 		"""
 
-		for path in os.listdir(self.info[u'plugin_folder']):
-			if path.endswith(u'.ui'):
-				self.experiment.resources[u'extensions.%s.%s' % (self.name(),
-					os.path.splitext(path)[0])] = os.path.join(
-					self.info[u'plugin_folder'], path)
+		self.experiment.resources.update(ui_files(self.name(),
+			self.info[u'plugin_folder']))
 
 	def qaction(self, icon, label, target, checkable=False, tooltip=None,
 		shortcut=None):
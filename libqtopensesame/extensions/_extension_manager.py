@@ -19,13 +19,19 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 from libopensesame.py3compat import *
 import sys
+from timeit import default_timer
 from qtpy import QtWidgets, QtCore
-from libopensesame import plugins
+from libopensesame import plugins, debug
 from libopensesame.exceptions import osexception
 from libqtopensesame.misc.base_subcomponent import base_subcomponent
+from libqtopensesame.extensions._lazy_extension import lazy_extension
 from libqtopensesame.misc.translate import translation_context
 _ = translation_context(u'extension_manager', category=u'core')
 
+# Extensions that take longer than this (in milliseconds) to handle an event
+# are reported in the debug output.
+slow_event_threshold = 100
+
 def suspend_events(fnc):
 
 	"""
@@ -66,11 +72,17 @@ class extension_manager(base_subcomponent):
 		QtWidgets.QApplication.processEvents()
 		self._extensions = []
 		self.events = {}
+		self.event_timing = {}
 		self._suspended = False
 		self._suspended_until = None
 		for ext_name in plugins.list_plugins(_type=u'extensions'):
 			try:
-				ext = plugins.load_extension(ext_name, self.main_window)
+				info = plugins.plugin_properties(ext_name,
+					_type=u'extensions')
+				if info.get(u'lazy', False):
+					ext = lazy_extension(self.main_window, ext_name, info=info)
+				else:
+					ext = plugins.load_extension(ext_name, self.main_window)
 			except Exception as e:
 				if not isinstance(e, osexception):
 					e = osexception(msg=u'Extension error', exception=e)
@@ -80,12 +92,25 @@ class extension_manager(base_subcomponent):
 				self.console.write(e)
 				continue
 			self._extensions.append(ext)
-			for event in ext.supported_events():
-				if event not in self.events:
-					self.events[event] = []
-				self.events[event].append(ext)
+		self.update_events()
 		self.main_window.set_busy(False)
 
+	def update_events(self):
+
+		"""
+		desc:
+			Updates which extensions receive which events. This is called
+			automatically when a lazy extension has been loaded.
+		"""
+
+		events = {}
+		for ext in self._extensions:
+			for event in ext.supported_events():
+				if event not in events:
+					events[event] = []
+				events[event].append(ext)
+		self.events = events
+
 	def __getitem__(self, extension_name):
 
 		"""
@@ -103,6 +128,8 @@ class extension_manager(base_subcomponent):
 
 		for ext in self._extensions:
 			if ext.name() == extension_name:
+				if isinstance(ext, lazy_extension):
+					return ext.extension()
 				return ext
 		raise osexception(u'Extension %s does not exist' % extension_name)
 
@@ -126,9 +153,14 @@ class extension_manager(base_subcomponent):
 		if self._suspended:
 			return
 		if event == u'open_experiment':
+			# Registering resources is timed as a separate event
 			for ext in self._extensions:
+				t0 = default_timer()
 				ext.register_ui_files()
+				self._log_timing(ext.name(), u'register_ui_files',
+					1000.*(default_timer()-t0))
 		for ext in self.events.get(event, []):
+			t0 = default_timer()
 			try:
 				ext.fire(event, **kwdict)
 			except Exception as e:
@@ -138,6 +170,51 @@ class extension_manager(base_subcomponent):
 					u'Extension %s misbehaved on event %s (see debug window for stack trace)' \
 					% (ext.name(), event))
 				self.console.write(e)
+			self._log_timing(ext.name(), event, 1000.*(default_timer()-t0))
+
+	def _log_timing(self, ext_name, event, duration):
+
+		"""
+		visible: False
+
+		desc:
+			Updates the timing statistics for an extension and event.
+
+		arguments:
+			ext_name:	The extension name.
+			event:		The event name.
+			duration:	The time that the extension took to handle the event
+						in milliseconds.
+		"""
+
+		key = ext_name, event
+		count, total, longest = self.event_timing.get(key, (0, 0., 0.))
+		self.event_timing[key] = count+1, total+duration, \
+			max(longest, duration)
+		if duration > slow_event_threshold:
+			debug.msg(u'extension %s took %.2f ms to handle event_%s' \
+				% (ext_name, duration, event), reason=u'warning')
+
+	def timing_summary(self):
+
+		"""
+		desc:
+			Gives the time that each extension has spent handling each event,
+			sorted from slowest to fastest, so that slow extensions can be
+			identified. For example, you can run
+			`opensesame.extension_manager.timing_summary()` in the debug
+			window.
+
+		returns:
+			desc:	A list of (extension name, event name, count, total
+					duration, longest duration) tuples. Durations are in
+					milliseconds.
+			type:	list
+		"""
+
+		return sorted(
+			[key + value for key, value in self.event_timing.items()],
+			key=lambda row: -row[3])
 
 	def suspend(self):
 
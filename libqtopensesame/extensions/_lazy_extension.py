@@ -0,0 +1,131 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from libopensesame import debug, plugins
+from libqtopensesame.extensions._base_extension import base_extension
+
+class lazy_extension(base_extension):
+
+	"""
+	desc: |
+		A lightweight stand-in for an extension that has `lazy: true` in its
+		info.yaml. The menu and toolbar entries, settings, and .ui files are
+		registered from the info dictionary, without importing the extension
+		module. The extension itself is loaded when the action is triggered,
+		when one of the events that are listed under `events` in info.yaml is
+		fired, or when the extension is explicitly retrieved from the
+		extension manager.
+
+		After loading, the extension receives all events that it supports.
+		Because the `startup` event has already been fired at this point, it
+		is fired once more for the newly loaded extension.
+	"""
+
+	def __init__(self, main_window, ext_name, info={}):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			main_window:	The main-window object.
+			ext_name:		The extension name.
+
+		keywords:
+			info:			A dictionary with extension properties that have
+							been read from info.[json|txt].
+		"""
+
+		self._name = ext_name
+		self._extension = None
+		self._events = list(info.get(u'events', []))
+		base_extension.__init__(self, main_window, info=info)
+
+	@property
+	def loaded(self):
+
+		"""
+		desc:
+			Indicates whether the extension itself has been loaded.
+
+		type:	bool
+		"""
+
+		return self._extension is not None
+
+	def name(self):
+
+		return self._name
+
+	def extension(self):
+
+		"""
+		desc:
+			Gets the extension, and loads it if this hasn't been done yet. If
+			loading fails, the extension no longer receives events.
+
+		returns:
+			type:	base_extension
+		"""
+
+		if self._extension is not None:
+			return self._extension
+		debug.msg(u'loading lazy extension %s' % self._name)
+		self.set_busy()
+		try:
+			ext = plugins.load_extension(self._name, self.main_window,
+				action=self.action)
+		except:
+			self._events = []
+			self.extension_manager.update_events()
+			raise
+		finally:
+			self.set_busy(False)
+		self._extension = ext
+		self.extension_manager.update_events()
+		if u'startup' in ext.supported_events():
+			ext.fire(u'startup')
+		return ext
+
+	def activate(self):
+
+		self.extension()._activate()
+
+	def fire(self, event, **kwdict):
+
+		# When the extension is loaded, it already receives the startup event
+		loaded = self.loaded
+		ext = self.extension()
+		if loaded or event != u'startup':
+			ext.fire(event, **kwdict)
+
+	def supported_events(self):
+
+		if self._extension is None:
+			return self._events
+		return self._extension.supported_events()
+
+	def settings_widget(self):
+
+		return self.extension().settings_widget()
+
+	def apply_settings_widget(self):
+
+		self.extension().apply_settings_widget()
@@ -20,14 +20,11 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 
 import os
-if os.environ[u'QT_API'] == u'pyqt5':
-	from PyQt5 import uic
-else:
-	from PyQt4 import uic
 from qtpy import QtCore, QtWidgets
 from libopensesame import debug
 from libopensesame.exceptions import osexception
 from libqtopensesame.misc.base_qtobject import base_qtobject
+from libqtopensesame.misc import ui_cache
 
 class base_component(base_qtobject):
 
@@ -88,12 +85,7 @@ class base_component(base_qtobject):
 					from libopensesame import misc
 					ui_path = misc.resource(os.path.join(*path_list)+u'.ui')
 			debug.msg(u'dynamically loading ui: %s' % ui_path)
-			if py3:
-				with open(ui_path, encoding=u'utf-8') as fd:
-					self.ui = uic.loadUi(fd, self)
-			else:
-				with open(ui_path) as fd:
-					self.ui = uic.loadUi(fd, self)
+			self.ui = ui_cache.load_ui(ui_path, self)
 		else:
 			self.ui = None
 
@@ -0,0 +1,188 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+
+import os
+import sys
+import io
+import hashlib
+if os.environ[u'QT_API'] == u'pyqt5':
+	from PyQt5 import uic
+	from PyQt5.QtCore import PYQT_VERSION_STR
+else:
+	from PyQt4 import uic
+	from PyQt4.QtCore import PYQT_VERSION_STR
+from libopensesame import debug, misc, plugins
+
+# Compiled ui classes by ui path. Each entry is a (modification time, class)
+# tuple. The class is None if compilation failed.
+_classes = {}
+
+def cache_folder():
+
+	"""
+	desc:
+		Gets the folder where compiled .ui files are stored.
+
+	returns:
+		desc:	A folder, or None if there is no home folder.
+		type:	[unicode, NoneType]
+	"""
+
+	try:
+		home = misc.home_folder()
+	except KeyError:
+		return None
+	return os.path.join(home, u'.opensesame', u'cache', u'ui')
+
+def compile_ui(ui_path):
+
+	"""
+	desc:
+		Compiles a .ui file to a Python module in the cache folder, unless a
+		module for the same file contents has already been compiled. Modules
+		are named after a hash of the file contents and the PyQt and Python
+		versions, so that they are recompiled whenever one of these changes.
+
+	arguments:
+		ui_path:
+			desc:	The path to a .ui file.
+			type:	unicode
+
+	returns:
+		desc:	A (folder, module name) tuple.
+		type:	tuple
+	"""
+
+	folder = cache_folder()
+	if folder is None:
+		raise IOError(u'No cache folder')
+	with open(ui_path, u'rb') as fd:
+		contents = fd.read()
+	digest = hashlib.sha1(contents)
+	digest.update(safe_encode(u'%s %s %d.%d' % (os.environ[u'QT_API'],
+		PYQT_VERSION_STR, sys.version_info[0], sys.version_info[1])))
+	mod = u'ui_%s' % digest.hexdigest()
+	py_path = os.path.join(folder, mod + u'.py')
+	if os.path.exists(py_path):
+		return folder, mod
+	debug.msg(u'compiling %s to %s' % (ui_path, py_path))
+	if not os.path.exists(folder):
+		os.makedirs(folder)
+	# The module is compiled in memory. Under Python 2, uic writes byte
+	# strings, and under Python 3 unicode strings.
+	buf = io.StringIO() if py3 else io.BytesIO()
+	uic.compileUi(io.BytesIO(contents), buf)
+	# Write to a temporary file first, so that other processes never see a
+	# half-written module.
+	tmp_path = u'%s.%d.tmp' % (py_path, os.getpid())
+	try:
+		with open(tmp_path, u'wb') as fd:
+			fd.write(safe_encode(buf.getvalue(), enc=u'utf-8'))
+		try:
+			os.rename(tmp_path, py_path)
+		except OSError:
+			# On Windows, renaming fails if another process has compiled the
+			# same module in the meantime, which is fine.
+			if not os.path.exists(py_path):
+				raise
+	finally:
+		# After a successful rename, the temporary file no longer exists.
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+	return folder, mod
+
+def ui_class(ui_path):
+
+	"""
+	desc:
+		Gets the class that is generated from a .ui file. Classes are
+		compiled on first use, and cached both on disk and in memory.
+
+	arguments:
+		ui_path:
+			desc:	The path to a .ui file.
+			type:	unicode
+
+	returns:
+		desc:	A class with a `setupUi()` function, like the classes that
+				are generated by `pyuic`, or None if the file could not be
+				compiled before. In that case, compilation is not tried
+				again until the file changes.
+	"""
+
+	mtime = os.path.getmtime(ui_path)
+	if ui_path in _classes and _classes[ui_path][0] == mtime:
+		return _classes[ui_path][1]
+	try:
+		folder, mod = compile_ui(ui_path)
+		mod = plugins.load_mod(folder, mod)
+		for name, cls in mod.__dict__.items():
+			if name.startswith(u'Ui_') and hasattr(cls, u'setupUi'):
+				break
+		else:
+			raise ValueError(u'No ui class in %s' % mod.__file__)
+	except Exception:
+		_classes[ui_path] = mtime, None
+		raise
+	_classes[ui_path] = mtime, cls
+	return cls
+
+def load_ui(ui_path, widget):
+
+	"""
+	desc:
+		Sets up a widget from a .ui file. This is the equivalent of
+		`uic.loadUi(ui_path, widget)`, but uses the compiled class, so that
+		the XML doesn't need to be parsed again. If compilation fails, for
+		example because the cache folder is not writable, `uic.loadUi()` is
+		used instead.
+
+	arguments:
+		ui_path:
+			desc:	The path to a .ui file.
+			type:	unicode
+		widget:
+			desc:	The widget to set up.
+			type:	QWidget
+
+	returns:
+		desc:	The widget.
+		type:	QWidget
+	"""
+
+	try:
+		cls = ui_class(ui_path)
+	except Exception as e:
+		debug.msg(u'failed to compile %s: %s' % (ui_path, e))
+		cls = None
+	if cls is None:
+		if py3:
+			with open(ui_path, encoding=u'utf-8') as fd:
+				return uic.loadUi(fd, widget)
+		with open(ui_path) as fd:
+			return uic.loadUi(fd, widget)
+	# Like uic.loadUi(), set the child widgets as attributes of the widget
+	# itself.
+	ui = cls()
+	ui.setupUi(widget)
+	for name, value in ui.__dict__.items():
+		setattr(widget, name, value)
+	return widget
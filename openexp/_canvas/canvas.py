@@ -164,6 +164,13 @@ class canvas(backend):
 		--%
 	"""
 
+	# Indicates how a display_list redraws changed elements: u'surface' for
+	# back-ends that draw onto a surface, which is partially redrawn;
+	# u'stim_list' for back-ends that keep a list of stimuli, of which only the
+	# changed ones are recreated; and u'all' for back-ends that are cleared and
+	# redrawn completely.
+	_display_list_mode = u'all'
+
 	def __init__(self, experiment, auto_prepare=True, **style_args):
 
 		"""
@@ -220,6 +227,7 @@ class canvas(backend):
 		self._width = self.experiment.var.width
 		self._height = self.experiment.var.height
 		self.auto_prepare = auto_prepare
+		self._color_cache = {}
 		backend.__init__(self, configurables={
 			u'color' : None,
 			u'background_color' : None,
@@ -256,13 +264,42 @@ class canvas(backend):
 			del cfg['font_style']
 		# Convert color to backend specific colors
 		if u'color' in cfg and not hasattr(cfg[u'color'], u'backend_color'):
-			cfg[u'color'] = color(self.experiment, cfg[u'color'])
+			cfg[u'color'] = self._color(cfg[u'color'])
 		if u'background_color' in cfg \
 			and not hasattr(cfg[u'background_color'], u'backend_color'):
-			cfg[u'background_color'] = color(self.experiment,
-				cfg[u'background_color'])
+			cfg[u'background_color'] = self._color(cfg[u'background_color'])
 		backend.set_config(self, **cfg)
 
+	def _color(self, colorspec):
+
+		"""
+		visible: False
+
+		desc:
+			Converts a color specification to a color object. Color objects
+			are cached, because the conversion is relatively slow and the same
+			colors are usually used over and over again.
+
+		arguments:
+			colorspec:	A color specification.
+
+		returns:
+			A color object.
+		"""
+
+		try:
+			return self._color_cache[colorspec]
+		except TypeError:
+			# Unhashable color specifications, such as lists, are not cached
+			return color(self.experiment, colorspec)
+		except KeyError:
+			pass
+		if len(self._color_cache) >= 256:
+			self._color_cache.clear()
+		_color = color(self.experiment, colorspec)
+		self._color_cache[colorspec] = _color
+		return _color
+
 	def default_config(self):
 
 		return {
@@ -324,6 +361,8 @@ class canvas(backend):
 		"""
 		desc: |
 			Turns the current CANVAS into a copy of the passed CANVAS.
+			Copying is cheap, because both CANVAS objects share their contents
+			until one of them is drawn onto.
 
 			__Note:__
 
@@ -684,6 +723,106 @@ class canvas(backend):
 
 		raise NotImplementedError()
 
+	@configurable
+	def circles(self, xs, ys, rs, **style_args):
+
+		"""
+		desc: |
+			Draws many circles in a single operation. This is much faster than
+			repeatedly calling [canvas.circle], for example to draw a dot-motion
+			display. All circles have the same style.
+
+		arguments:
+			xs:
+				desc:	A sequence of center X coordinates.
+				type:	[list, tuple, ndarray]
+			ys:
+				desc:	A sequence of center Y coordinates.
+				type:	[list, tuple, ndarray]
+			rs:
+				desc:	A sequence of radii, or a single radius for all
+						circles.
+				type:	[list, tuple, ndarray, int, float]
+
+		keyword-dict:
+			style_args:	"%arg_style"
+
+		example: |
+			from random import randint
+			my_canvas = canvas()
+			xs = [randint(-256, 256) for i in range(1000)]
+			ys = [randint(-256, 256) for i in range(1000)]
+			my_canvas.circles(xs, ys, 2, fill=True)
+		"""
+
+		for x, y, r in zip(xs, ys, _broadcast(rs, len(xs))):
+			self.circle(x, y, r)
+
+	@configurable
+	def lines(self, x1s, y1s, x2s, y2s, **style_args):
+
+		"""
+		desc:
+			Draws many lines in a single operation. This is much faster than
+			repeatedly calling [canvas.line]. All lines have the same style.
+
+		arguments:
+			x1s:
+				desc:	A sequence of start X coordinates.
+				type:	[list, tuple, ndarray]
+			y1s:
+				desc:	A sequence of start Y coordinates.
+				type:	[list, tuple, ndarray]
+			x2s:
+				desc:	A sequence of end X coordinates.
+				type:	[list, tuple, ndarray]
+			y2s:
+				desc:	A sequence of end Y coordinates.
+				type:	[list, tuple, ndarray]
+
+		keyword-dict:
+			style_args:	"%arg_style"
+
+		example: |
+			my_canvas = canvas()
+			# Draw a grid of horizontal lines
+			ys = range(-200, 201, 20)
+			my_canvas.lines([-200]*len(ys), ys, [200]*len(ys), ys)
+		"""
+
+		for sx, sy, ex, ey in zip(x1s, y1s, x2s, y2s):
+			self.line(sx, sy, ex, ey)
+
+	@configurable
+	def polygons(self, vertices_list, **style_args):
+
+		"""
+		desc:
+			Draws many polygons in a single operation. This is faster than
+			repeatedly calling [canvas.polygon]. All polygons have the same
+			style.
+
+		arguments:
+			vertices_list:
+				desc:	A list of vertex lists. Each vertex list is as described
+						for [canvas.polygon].
+				type:	list
+
+		keyword-dict:
+			style_args:	"%arg_style"
+
+		example: |
+			my_canvas = canvas()
+			triangle = [(0, 0), (10, 0), (0, 10)]
+			my_canvas.polygons([
+				[(x+dx, y) for x, y in triangle]
+				for dx in range(-200, 201, 20)
+				])
+		"""
+
+		for vertices in vertices_list:
+			self.polygon(vertices)
+
 	@configurable
 	def text_size(self, text, max_width=None, **style_args):
 
@@ -1057,6 +1196,29 @@ class canvas(backend):
 
 		raise NotImplementedError()
 
+	@staticmethod
+	def prepare_pool(experiment):
+
+		"""
+		visible:	False
+
+		desc:
+			Gets a pool of worker threads that can rasterize canvases in the
+			background. Back-ends that cannot rasterize outside of the main
+			thread return None.
+
+		arguments:
+			experiment:
+				desc:	An experiment object.
+				type:	experiment
+
+		returns:
+			desc:	A worker pool, or None if background preparation is not
+					supported or not enabled.
+		"""
+
+		return None
+
 	@staticmethod
 	def arrow_shape(sx, sy, ex, ey, body_length=0.8, body_width=.5,
 		head_width=30):
@@ -1270,6 +1432,25 @@ def _noise_patch(env=u"gaussian", size=96, stdev=12, col1=u"white",
 	del px
 	return surface
 
+def _broadcast(val, n):
+
+	"""
+	desc:
+		Turns a single value into a list of `n` identical values. Sequences
+		are returned as is.
+
+	arguments:
+		val:	A single value or a sequence.
+		n:		The length of the sequence.
+
+	returns:
+		A sequence.
+	"""
+
+	if not hasattr(val, u'__len__'):
+		return [val]*n
+	return val
+
 def _match_env(env):
 
 	"""
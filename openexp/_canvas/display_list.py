@@ -0,0 +1,498 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from contextlib import contextmanager
+from functools import partial
+from libopensesame.exceptions import osexception
+from openexp.color import color
+try:
+	import pygame
+except ImportError:
+	pygame = None
+
+# The canvas functions that are recorded as drawing operations. All other
+# attributes are simply passed on to the canvas.
+drawing_operations = [u'fixdot', u'circle', u'line', u'arrow', u'rect',
+	u'ellipse', u'polygon', u'circles', u'lines', u'polygons', u'text',
+	u'image', u'gabor', u'noise_patch']
+
+class element(object):
+
+	"""
+	desc:
+		A named group of recorded drawing operations, with a bounding
+		rectangle.
+	"""
+
+	def __init__(self, name, rect):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			name:
+				desc:	The name of the element.
+			rect:
+				desc:	A (left, top, width, height) tuple in canvas
+						coordinates, or None for the entire canvas.
+				type:	[tuple, NoneType]
+		"""
+
+		self.name = name
+		self.rect = rect
+		self.operations = []
+		self.signature = []
+		# The back-end specific result of the last rasterization: a list of
+		# stimuli for stimulus-list back-ends, unused otherwise.
+		self.stims = []
+		self.dirty = True
+
+class display_list(object):
+
+	"""
+	desc: |
+		A retained-mode layer on top of a CANVAS. Drawing operations are not
+		executed right away, but are recorded as named elements. When the
+		display list is prepared or shown, only elements that have changed
+		since the last time are rasterized again:
+
+		- For back-ends that draw onto a `pygame.Surface` (legacy, droid),
+		  only the dirty rectangles are cleared and redrawn.
+		- For back-ends that keep a list of stimuli (psycho, xpyriment), only
+		  the stimuli of changed elements are recreated.
+
+		All other attributes, such as `text_size()` and the style properties,
+		are passed on to the underlying CANVAS. Drawing operations that are
+		performed outside of an element are executed right away, and are not
+		retained.
+
+		Rasterization can also be done in a worker thread, by calling
+		[display_list.prepare_in_background]. The display list then waits for
+		the worker to finish before it is used again.
+
+		__Example__:
+
+		~~~ .python
+		from openexp.canvas import display_list
+		my_display = display_list(exp)
+		for i in range(10):
+			with my_display.element(u'counter', (-50, -50, 100, 100)):
+				my_display.text(u'%d' % i)
+			with my_display.element(u'fixdot', (-10, -10, 20, 20)):
+				my_display.fixdot()
+			# Only the counter is redrawn
+			my_display.show()
+			clock.sleep(1000)
+		~~~
+	"""
+
+	# The attributes that belong to the display list itself. All other
+	# attributes are set on the canvas.
+	_own_attributes = (u'canvas', u'_elements', u'_element_index',
+		u'_current', u'_damage', u'_clear_style', u'_background_stims',
+		u'_full_redraw', u'_flush_func', u'_pending')
+
+	def __init__(self, canvas):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			canvas:
+				desc:	The canvas that is drawn onto.
+				type:	canvas
+		"""
+
+		self.canvas = canvas
+		self._pending = None
+		self._elements = []
+		self._element_index = {}
+		self._current = None
+		self._damage = []
+		self._clear_style = {}
+		self._background_stims = []
+		self._full_redraw = True
+		self._flush_func = {
+			u'surface' : self._flush_surface,
+			u'stim_list' : self._flush_stim_list,
+			}.get(canvas._display_list_mode, self._flush_all)
+
+	def __getattr__(self, name):
+
+		"""
+		visible: False
+
+		desc:
+			Wraps drawing operations so that they are recorded, and passes all
+			other attributes on to the canvas.
+		"""
+
+		if name in drawing_operations:
+			return partial(self._draw, name)
+		self._wait()
+		return getattr(self.canvas, name)
+
+	def __setattr__(self, name, value):
+
+		"""
+		visible: False
+
+		desc:
+			Passes attributes that do not belong to the display list, such as
+			style properties, on to the canvas.
+		"""
+
+		if name in self._own_attributes:
+			object.__setattr__(self, name, value)
+			return
+		self._wait()
+		setattr(self.canvas, name, value)
+
+	@property
+	def dirty(self):
+
+		"""
+		name:	dirty
+
+		desc:
+			A list of names of elements that will be rasterized when the
+			display list is prepared or shown. This is a read-only property.
+		"""
+
+		self._wait()
+		return [el.name for el in self._elements if el.dirty]
+
+	@contextmanager
+	def element(self, name, rect=None):
+
+		"""
+		desc:
+			A context manager that (re)defines an element. All drawing
+			operations that are performed within the context replace the
+			drawing operations that were previously recorded for the element.
+			If the drawing operations are identical to the previous ones, the
+			element is not marked as dirty.
+
+		arguments:
+			name:
+				desc:	The name of the element. Elements are drawn in the
+						order in which they were first defined.
+
+		keywords:
+			rect:
+				desc:	A (left, top, width, height) tuple that specifies an
+						area that fully contains the element, or `None` if the
+						element can cover the entire canvas. Drawing is clipped
+						to this area.
+				type:	[tuple, NoneType]
+		"""
+
+		self._wait()
+		if self._current is not None:
+			raise osexception(u'Display-list elements cannot be nested')
+		el = element(name, rect)
+		self._current = el
+		try:
+			yield el
+		finally:
+			self._current = None
+		old_el = self._element_index.get(name, None)
+		if old_el is None:
+			self._elements.append(el)
+			self._element_index[name] = el
+			return
+		if old_el.signature == el.signature and old_el.rect == rect:
+			return
+		if not old_el.dirty:
+			self._damage.append(old_el.rect)
+		old_el.operations = el.operations
+		old_el.signature = el.signature
+		old_el.rect = rect
+		old_el.dirty = True
+
+	def remove(self, name):
+
+		"""
+		desc:
+			Removes an element. If no element with this name exists, nothing
+			happens.
+
+		arguments:
+			name:
+				desc:	The name of the element.
+		"""
+
+		self._wait()
+		el = self._element_index.pop(name, None)
+		if el is None:
+			return
+		self._elements.remove(el)
+		self._damage.append(el.rect)
+
+	def clear(self, **style_args):
+
+		"""
+		desc:
+			Removes all elements and clears the canvas.
+
+		keyword-dict:
+			style_args:
+				Optional style keywords, which are passed to `canvas.clear()`.
+		"""
+
+		self._wait()
+		if self._current is not None:
+			raise osexception(
+				u'A display list cannot be cleared while defining an element')
+		self._elements = []
+		self._element_index = {}
+		self._damage = []
+		self._clear_style = style_args
+		self._full_redraw = True
+
+	def prepare(self):
+
+		"""
+		desc:
+			Rasterizes all dirty elements, and prepares the canvas.
+		"""
+
+		self.flush()
+		return self.canvas.prepare()
+
+	def show(self):
+
+		"""
+		desc:
+			Rasterizes all dirty elements, and shows the canvas.
+
+		returns:
+			desc:	The timestamp that is returned by `canvas.show()`.
+			type:	[int, float]
+		"""
+
+		self.flush()
+		return self.canvas.show()
+
+	def flush(self):
+
+		"""
+		desc:
+			Rasterizes all dirty elements onto the canvas.
+		"""
+
+		self._wait()
+		self._flush()
+
+	def prepare_in_background(self, pool):
+
+		"""
+		desc:
+			Rasterizes all dirty elements in a worker thread, and returns right
+			away. This is only safe for back-ends that rasterize off-screen
+			without a graphics context, such as the legacy back-end.
+
+		arguments:
+			pool:
+				desc:	A worker pool with an `apply_async()` function, such
+						as a `multiprocessing.pool.ThreadPool`.
+		"""
+
+		self._wait()
+		self._pending = pool.apply_async(self._flush)
+
+	def _wait(self):
+
+		"""
+		visible: False
+
+		desc:
+			Waits until rasterization in a worker thread (if any) has finished.
+			Exceptions that occurred in the worker thread are raised here.
+		"""
+
+		if self._pending is None:
+			return
+		pending = self._pending
+		self._pending = None
+		pending.get()
+
+	def _flush(self):
+
+		"""
+		visible: False
+
+		desc:
+			Rasterizes all dirty elements onto the canvas.
+		"""
+
+		if not self._full_redraw and not self._damage and \
+			not any(el.dirty for el in self._elements):
+			return
+		auto_prepare = self.canvas.auto_prepare
+		self.canvas.auto_prepare = False
+		old_cfg = self.canvas.get_config()
+		try:
+			self._flush_func()
+		finally:
+			self.canvas.restore_config(**old_cfg)
+			self.canvas.auto_prepare = auto_prepare
+		for el in self._elements:
+			el.dirty = False
+		self._damage = []
+		self._full_redraw = False
+
+	def _draw(self, name, *arglist, **kwdict):
+
+		"""
+		visible: False
+
+		desc:
+			Records a drawing operation in the current element, or executes it
+			right away if there is no current element.
+		"""
+
+		self._wait()
+		if self._current is None:
+			return getattr(self.canvas, name)(*arglist, **kwdict)
+		cfg = self.canvas.get_config()
+		self._current.operations.append((name, arglist, kwdict, cfg))
+		self._current.signature.append((name,
+			[_comparable(val) for val in arglist],
+			sorted((key, _comparable(val)) for key, val in kwdict.items()),
+			sorted((key, _comparable(val)) for key, val in cfg.items())))
+
+	def _replay(self, el):
+
+		"""
+		visible: False
+
+		desc:
+			Executes the recorded drawing operations of an element.
+		"""
+
+		cfg = None
+		for name, arglist, kwdict, _cfg in el.operations:
+			if _cfg != cfg:
+				self.canvas.restore_config(**_cfg)
+				cfg = _cfg
+			getattr(self.canvas, name)(*arglist, **kwdict)
+
+	def _surface_rect(self, rect):
+
+		"""
+		visible: False
+
+		desc:
+			Converts an element rectangle to a pygame.Rect in surface
+			coordinates.
+		"""
+
+		if rect is None:
+			return self.canvas.surface.get_rect()
+		x, y, w, h = rect
+		x, y = self.canvas.to_xy(x, y)
+		return pygame.Rect(int(x), int(y), int(w), int(h))
+
+	def _flush_all(self):
+
+		"""
+		visible: False
+
+		desc:
+			Clears the canvas and redraws all elements. This is used for
+			back-ends that do not support partial redraws.
+		"""
+
+		self.canvas.clear(**self._clear_style)
+		for el in self._elements:
+			self._replay(el)
+
+	def _flush_surface(self):
+
+		"""
+		visible: False
+
+		desc:
+			Redraws only the dirty rectangles of a surface-based canvas.
+		"""
+
+		if self._full_redraw:
+			self._flush_all()
+			return
+		surface = self.canvas.surface
+		if u'background_color' in self._clear_style:
+			background = color(self.canvas.experiment,
+				self._clear_style[u'background_color'])
+		else:
+			background = self.canvas.background_color
+		damage = self._damage + [el.rect for el in self._elements if el.dirty]
+		for rect in damage:
+			rect = self._surface_rect(rect)
+			surface.set_clip(rect)
+			surface.fill(background.backend_color, rect)
+			for el in self._elements:
+				if self._surface_rect(el.rect).colliderect(rect):
+					self._replay(el)
+		surface.set_clip(None)
+
+	def _flush_stim_list(self):
+
+		"""
+		visible: False
+
+		desc:
+			Recreates only the stimuli of dirty elements for a canvas that
+			keeps a list of stimuli.
+		"""
+
+		if self._full_redraw:
+			self.canvas.clear(**self._clear_style)
+			self._background_stims = self.canvas.stim_list[:]
+		for el in self._elements:
+			if not el.dirty and not self._full_redraw:
+				continue
+			self.canvas.stim_list = []
+			self._replay(el)
+			el.stims = self.canvas.stim_list
+		stim_list = self._background_stims[:]
+		for el in self._elements:
+			stim_list += el.stims
+		self.canvas.stim_list = stim_list
+		if hasattr(self.canvas, u'prepared'):
+			self.canvas.prepared = False
+
+def _comparable(val):
+
+	"""
+	visible: False
+
+	desc:
+		Converts color objects to their hexadecimal representation, and arrays
+		to lists, so that drawing operations can be compared.
+	"""
+
+	if hasattr(val, u'hexcolor'):
+		return val.hexcolor
+	if hasattr(val, u'tolist'):
+		return val.tolist()
+	return val
@@ -21,7 +21,9 @@ from libopensesame.py3compat import *
 from pygame.locals import *
 import pygame
 import os
+import threading
 from libopensesame.exceptions import osexception
+from libopensesame.frame_recorder import frame_recorder_singleton
 from libopensesame import debug, misc
 from openexp.backend import configurable
 from openexp._canvas import canvas
@@ -39,6 +41,12 @@ from openexp._coordinates.legacy import legacy as legacy_coordinates
 #   font-file-name-containing-unicode-error
 fileobjects = []
 fonts = {}
+# Font objects are shared between canvases, and canvases may be rasterized in
+# worker threads (see prepare_pool()). Therefore, fonts are only used while
+# holding this lock.
+font_lock = threading.RLock()
+# The pool of worker threads, which is created when it is first needed.
+_prepare_pool = None
 
 class legacy(canvas.canvas, legacy_coordinates):
 
@@ -71,8 +79,14 @@ class legacy(canvas.canvas, legacy_coordinates):
 			u"name" : u"Window position",
 			u"description" : u"Window position in window mode (format: 'x,y' or 'auto')",
 			u"default" : u"auto",
+			},
+		u"pygame_prepare_workers" : {
+			u"name" : u"Background workers",
+			u"description" : u"Number of threads that prepare sketchpads in the background (0 = disabled)",
+			u"default" : 0,
 			}
 		}
+	_display_list_mode = u'surface'
 
 	def __init__(self, experiment, auto_prepare=True, **style_args):
 
@@ -80,34 +94,81 @@ class legacy(canvas.canvas, legacy_coordinates):
 			**style_args)
 		legacy_coordinates.__init__(self)
 		self.antialias = True
+		self._surface_shared = False
 		self.surface = self.experiment.surface.copy()
 		self.clear()
 
+	@property
+	def surface(self):
+
+		"""
+		visible: False
+
+		desc:
+			The surface that is drawn onto. If the surface is shared with
+			another canvas (after a call to copy()), it is copied first, so
+			that drawing does not affect the other canvas. Therefore, this
+			property is only used by drawing functions. Functions that only
+			read the surface, such as show(), use `_surface` directly.
+		"""
+
+		if self._surface_shared:
+			self._surface = self._surface.copy()
+			self._surface_shared = False
+		return self._surface
+
+	@surface.setter
+	def surface(self, surface):
+
+		self._surface = surface
+		self._surface_shared = False
+
 	def set_config(self, **cfg):
 
 		canvas.canvas.set_config(self, **cfg)
-		for key, val in cfg.items():
-			if u'font_' in key:
-				self._font = None
+		self._update_font(cfg)
+
+	def restore_config(self, **cfg):
+
+		canvas.canvas.restore_config(self, **cfg)
+		self._update_font(cfg)
+
+	def _update_font(self, cfg):
+
+		"""
+		visible: False
+
+		desc:
+			Gets a new font object if the font family or size has changed. The
+			other font properties are applied when text is rendered.
+
+		arguments:
+			cfg:	A dict of changed configurables.
+		"""
+
+		if u'font_family' in cfg or u'font_size' in cfg:
+			self._font = None
 		if self._font is None:
 			# First see if the font refers to a file in the resources/ filepool
 			self._font = self._pygame_font(self.experiment, self.font_family,
 				self.font_size)
-			self._font.set_bold(self.font_bold)
-			self._font.set_italic(self.font_italic)
-			self._font.set_underline(self.font_underline)
 
 	def copy(self, canvas):
 
-		self.surface = canvas.surface.copy()
-		self.set_config(**canvas.get_config())
+		# The surface is shared (copy-on-write) until one of the canvases is
+		# drawn onto. The configuration has already been validated, so it is
+		# copied as is.
+		self._surface = canvas._surface
+		self._surface_shared = canvas._surface_shared = True
+		self.__cfg__ = canvas.get_config()
+		self._font = canvas._font
 
 	def show(self):
 
-		self.experiment.surface.blit(self.surface, (0, 0))
-		self.experiment.last_shown_canvas = self.surface
+		self.experiment.surface.blit(self._surface, (0, 0))
+		self.experiment.last_shown_canvas = self._surface
 		pygame.display.flip()
-		return pygame.time.get_ticks()
+		return frame_recorder_singleton.record(self.experiment.clock.time())
 
 	@configurable
 	def clear(self, color=None):
@@ -173,16 +234,90 @@ class legacy(canvas.canvas, legacy_coordinates):
 		pygame.draw.polygon(self.surface, self.color.backend_color, vertices,
 			penwidth)
 
+	@configurable
+	def circles(self, xs, ys, rs):
+
+		try:
+			import numpy as np
+		except ImportError:
+			np = None
+		try:
+			px = pygame.surfarray.pixels2d(self.surface)
+		except Exception:
+			# Direct pixel access requires NumPy and is not supported for all
+			# pixel formats.
+			px = None
+		if np is None or px is None:
+			for x, y, r in zip(xs, ys, canvas._broadcast(rs, len(xs))):
+				self.ellipse(x-r, y-r, 2*r, 2*r)
+			return
+		xs = np.asarray(xs, dtype=float)
+		ys = np.asarray(ys, dtype=float)
+		rs = np.asarray(rs, dtype=float) * np.ones(xs.shape)
+		if self.uniform_coordinates:
+			xs = xs + self._xcenter
+			ys = ys + self._ycenter
+		# The surface has already been copied (if it was shared) by
+		# pixels2d(), so from here on it is only read.
+		clip = self._surface.get_clip()
+		fg = self._surface.map_rgb(self.color.backend_color)
+		if self.fill:
+			_stamp_disks(np, px, clip, xs, ys, rs, fg)
+		else:
+			bg = self._surface.map_rgb(self.background_color.backend_color)
+			i = self.penwidth / 2
+			_stamp_rings(np, px, clip, xs, ys, rs+i, rs-(self.penwidth-i), fg,
+				bg)
+		del px
+
+	@configurable
+	def lines(self, x1s, y1s, x2s, y2s):
+
+		surface = self.surface
+		color = self.color.backend_color
+		penwidth = self.penwidth
+		for sx, sy, ex, ey in zip(x1s, y1s, x2s, y2s):
+			pygame.draw.line(surface, color, self.to_xy(sx, sy),
+				self.to_xy(ex, ey), penwidth)
+
+	@configurable
+	def polygons(self, vertices_list):
+
+		surface = self.surface
+		color = self.color.backend_color
+		penwidth = 0 if self.fill else self.penwidth
+		for vertices in vertices_list:
+			pygame.draw.polygon(surface, color,
+				[self.to_xy(x, y) for x, y in vertices], penwidth)
+
 	def _text(self, text, x, y):
 
-		surface = self._font.render(text, self.antialias,
-			self.color.backend_color)
+		with font_lock:
+			self._set_font_style()
+			surface = self._font.render(text, self.antialias,
+				self.color.backend_color)
 		x, y = self.to_xy(x, y)
 		self.surface.blit(surface, (x, y))
 
 	def _text_size(self, text):
 
-		return self._font.size(text)
+		with font_lock:
+			self._set_font_style()
+			return self._font.size(text)
+
+	def _set_font_style(self):
+
+		"""
+		visible: False
+
+		desc:
+			Applies the font style of the canvas to the font object. This is
+			necessary because font objects are shared between canvases.
+		"""
+
+		self._font.set_bold(self.font_bold)
+		self._font.set_italic(self.font_italic)
+		self._font.set_underline(self.font_underline)
 
 	def image(self, fname, center=True, x=None, y=None, scale=None):
 
@@ -285,9 +420,27 @@ class legacy(canvas.canvas, legacy_coordinates):
 		experiment.font = legacy._pygame_font(experiment, experiment.var.font_family,
 			experiment.var.font_size)
 
+	@staticmethod
+	def prepare_pool(experiment):
+
+		global _prepare_pool
+		if _prepare_pool is not None:
+			return _prepare_pool
+		workers = experiment.var.get(u'pygame_prepare_workers', 0)
+		if not isinstance(workers, int) or workers <= 0:
+			return None
+		from multiprocessing.pool import ThreadPool
+		_prepare_pool = ThreadPool(workers)
+		return _prepare_pool
+
 	@staticmethod
 	def close_display(experiment):
 
+		global _prepare_pool
+		if _prepare_pool is not None:
+			_prepare_pool.close()
+			_prepare_pool.join()
+			_prepare_pool = None
 		while fileobjects:
 			fileobjects.pop().close()
 		while fonts:
@@ -312,6 +465,20 @@ class legacy(canvas.canvas, legacy_coordinates):
 			type:	Font
 		"""
 
+		with font_lock:
+			return legacy._load_pygame_font(experiment, family, size)
+
+	@staticmethod
+	def _load_pygame_font(experiment, family, size):
+
+		"""
+		visible: False
+
+		desc:
+			Creates or retrieves a pygame.font.Font object. This should only be
+			called while holding the font lock.
+		"""
+
 		if (family, size) in fonts:
 			return fonts[(family, size)]
 		try:
@@ -326,3 +493,155 @@ class legacy(canvas.canvas, legacy_coordinates):
 			font = pygame.font.Font(fd, size)
 		fonts[(family, size)] = font
 		return font
+
+def _disk_mask(np, r):
+
+	"""
+	desc:
+		Gets the pixels of a disk, relative to the top-left of its bounding
+		box. The disks cover (nearly) the same pixels as pygame.draw.ellipse()
+		does for the bounding rectangle of the circle, which is how circle()
+		draws them.
+
+	arguments:
+		np:		The numpy module.
+		r:		The radius.
+
+	returns:
+		desc:	An (x, y) tuple of arrays.
+		type:	tuple
+	"""
+
+	size = int(2*r)
+	if size <= 0:
+		return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+	ox, oy = np.mgrid[0:size, 0:size]
+	inside = (ox+.5-size/2.)**2 + (oy+.5-size/2.)**2 <= (size/2.-.1)**2
+	return ox[inside], oy[inside]
+
+def _visible(clip, x, y):
+
+	"""
+	desc:
+		Checks which pixels fall within a clipping area.
+
+	returns:
+		desc:	A boolean array.
+		type:	ndarray
+	"""
+
+	return (x >= clip.left) & (x < clip.right) & (y >= clip.top) & \
+		(y < clip.bottom)
+
+def _stamp_disks(np, px, clip, xs, ys, rs, value):
+
+	"""
+	desc:
+		Sets all pixels that fall within a number of disks to a single value
+		in one vectorized operation per radius.
+
+	arguments:
+		np:		The numpy module.
+		px:		A 2D pixel array as returned by pygame.surfarray.pixels2d().
+		clip:	A pygame.Rect. Pixels outside of this area are not changed.
+		xs:		An array of center X coordinates.
+		ys:		An array of center Y coordinates.
+		rs:		An array of radii.
+		value:	A mapped pixel value.
+	"""
+
+	for r in np.unique(rs):
+		ox, oy = _disk_mask(np, r)
+		selected = rs == r
+		x = (np.trunc(xs[selected]-r).astype(int)[:, None] +
+			ox[None, :]).ravel()
+		y = (np.trunc(ys[selected]-r).astype(int)[:, None] +
+			oy[None, :]).ravel()
+		visible = _visible(clip, x, y)
+		px[x[visible], y[visible]] = value
+
+def _stamp_rings(np, px, clip, xs, ys, outer_rs, inner_rs, fg, bg):
+
+	"""
+	desc: |
+		Draws a number of rings in the same way as ellipse() draws outlines:
+		an outer disk in the foreground color, with an inner disk in the
+		background color.
+
+		For each combination of radii, the ring and its inside are combined
+		into a single pattern, which is stamped onto all centers at once.
+		Only pixels that are covered by more than one ring are resolved in
+		drawing order, so that the inside of a ring erases the outline of
+		earlier rings, but not of later rings, just as when the rings are
+		drawn one by one.
+
+	arguments:
+		np:			The numpy module.
+		px:			A 2D pixel array as returned by
+					pygame.surfarray.pixels2d().
+		clip:		A pygame.Rect. Pixels outside of this area are not
+					changed.
+		xs:			An array of center X coordinates.
+		ys:			An array of center Y coordinates.
+		outer_rs:	An array of outer radii.
+		inner_rs:	An array of inner radii.
+		fg:			A mapped pixel value for the outlines.
+		bg:			A mapped pixel value for the insides.
+	"""
+
+	outer_x = np.trunc(xs-outer_rs).astype(int)
+	outer_y = np.trunc(ys-outer_rs).astype(int)
+	# The offset of the inner disk within the bounding box of the outer disk.
+	# This is usually the same for all rings with the same radii.
+	dx = np.trunc(xs-inner_rs).astype(int) - outer_x
+	dy = np.trunc(ys-inner_rs).astype(int) - outer_y
+	# Rings are grouped by their radii and the offset of the inner disk
+	keys = [np.unique(a, return_inverse=True)
+		for a in (outer_rs, inner_rs, dx, dy)]
+	group = np.ravel_multi_index([inverse.ravel() for _, inverse in keys],
+		[len(unique) for unique, _ in keys])
+	x, y, index, value = [], [], [], []
+	for g in np.unique(group):
+		selected = np.nonzero(group == g)[0]
+		k = selected[0]
+		ox, oy = _disk_mask(np, outer_rs[k])
+		ix, iy = _disk_mask(np, inner_rs[k])
+		ix += dx[k]
+		iy += dy[k]
+		# Combine the outer and inner disk into one pattern of unique pixels,
+		# in which the inner disk is drawn last
+		left = min(0, dx[k])
+		top = min(0, dy[k])
+		width = max(int(2*outer_rs[k]), dx[k]+int(2*inner_rs[k])) - left
+		height = max(int(2*outer_rs[k]), dy[k]+int(2*inner_rs[k])) - top
+		pattern = np.zeros((max(width, 1), max(height, 1)), dtype=np.int8)
+		pattern[ox-left, oy-top] = 1
+		pattern[ix-left, iy-top] = 2
+		ox, oy = np.nonzero(pattern)
+		x.append((outer_x[selected, None] + (ox+left)[None, :]).ravel())
+		y.append((outer_y[selected, None] + (oy+top)[None, :]).ravel())
+		index.append(np.repeat(selected, len(ox)))
+		value.append(np.tile(pattern[ox, oy] == 2, len(selected)))
+	if not x:
+		return
+	x = np.concatenate(x)
+	y = np.concatenate(y)
+	index = np.concatenate(index)
+	value = np.where(np.concatenate(value), bg, fg).astype(px.dtype)
+	visible = _visible(clip, x, y)
+	x, y, index, value = x[visible], y[visible], index[visible], \
+		value[visible]
+	# Pixels that are covered by a single ring are set directly. For pixels
+	# that are covered by several rings, the last ring wins.
+	pixel = x * px.shape[1] + y
+	counts = np.bincount(pixel)
+	single = counts[pixel] == 1
+	px[x[single], y[single]] = value[single]
+	overlap = np.nonzero(~single)[0]
+	if not len(overlap):
+		return
+	overlap = overlap[np.lexsort((index[overlap], pixel[overlap]))]
+	last = np.ones(len(overlap), dtype=bool)
+	last[:-1] = pixel[overlap][1:] != pixel[overlap][:-1]
+	overlap = overlap[last]
+	px[x[overlap], y[overlap]] = value[overlap]
@@ -19,6 +19,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 from libopensesame.py3compat import *
 
+import math
 import pygame
 import pyglet
 from openexp.backend import configurable
@@ -26,6 +27,7 @@ from openexp._canvas import canvas
 from openexp.color import color
 from openexp._coordinates.psycho import psycho as psycho_coordinates
 from libopensesame.exceptions import osexception
+from libopensesame.frame_recorder import frame_recorder_singleton
 from libopensesame import debug
 try: # Try both import statements
 	from PIL import Image
@@ -90,6 +92,7 @@ class psycho(canvas.canvas, psycho_coordinates):
 			u'default' : u'yes',
 			}
 		}
+	_display_list_mode = u'stim_list'
 
 	def __init__(self, experiment, auto_prepare=True, **style_args):
 
@@ -108,11 +111,36 @@ class psycho(canvas.canvas, psycho_coordinates):
 			u'arabic' : u'Droid Arabic Naskh',
 			u'chinese-japanese-korean' : u'WenQuanYi Micro Hei',
 			}
+		self._stim_list_shared = False
 		self.clear()
 
+	@property
+	def stim_list(self):
+
+		"""
+		visible: False
+
+		desc:
+			The list of stimuli. If the list is shared with another canvas
+			(after a call to copy()), it is copied first, so that drawing does
+			not affect the other canvas.
+		"""
+
+		if self._stim_list_shared:
+			self._stim_list = self._stim_list[:]
+			self._stim_list_shared = False
+		return self._stim_list
+
+	@stim_list.setter
+	def stim_list(self, stim_list):
+
+		self._stim_list = stim_list
+		self._stim_list_shared = False
+
 	def set_config(self, **cfg):
 
-		if u'font_family' in cfg:
+		if u'font_family' in cfg and \
+			cfg[u'font_family'] != self.__cfg__.get(u'font_family', None):
 			style = cfg[u'font_family']
 			# If a font is taken from the file pool, it is not registered with
 			# PyGlet, and we therefore need to register it now.
@@ -123,15 +151,20 @@ class psycho(canvas.canvas, psycho_coordinates):
 
 	def copy(self, canvas):
 
-		self.stim_list = canvas.stim_list + []
-		self.set_config(**canvas.get_config())
+		# The stimulus list is shared (copy-on-write) until one of the
+		# canvases is drawn onto. The configuration has already been validated
+		# and the fonts have already been registered, so the configuration is
+		# copied as is.
+		self._stim_list = canvas._stim_list
+		self._stim_list_shared = canvas._stim_list_shared = True
+		self.__cfg__ = canvas.get_config()
 
 	def show(self):
 
-		for stim in self.stim_list:
+		for stim in self._stim_list:
 			stim.draw()
 		self.experiment.window.flip(clearBuffer=True)
-		return self.experiment.clock.time()
+		return frame_recorder_singleton.record(self.experiment.clock.time())
 
 	@configurable
 	def clear(self, color=None):
@@ -190,6 +223,38 @@ class psycho(canvas.canvas, psycho_coordinates):
 
 		self.shapestim(vertices, fix_coor=True, close=True)
 
+	@configurable
+	def circles(self, xs, ys, rs):
+
+		xys = [self.to_xy(x, y) for x, y in zip(xs, ys)]
+		sizes = [2*r for r in canvas._broadcast(rs, len(xys))]
+		self.element_array(xys, sizes, self.color, mask=u'circle')
+		if not self.fill:
+			self.element_array(xys, [size-2*self.penwidth for size in sizes],
+				self.background_color, mask=u'circle')
+
+	@configurable
+	def lines(self, x1s, y1s, x2s, y2s):
+
+		# Lines are drawn as thin rectangles, which are rotated around their
+		# center.
+		xys = []
+		sizes = []
+		oris = []
+		for sx, sy, ex, ey in zip(x1s, y1s, x2s, y2s):
+			sx, sy = self.to_xy(sx, sy)
+			ex, ey = self.to_xy(ex, ey)
+			xys.append(((sx+ex)/2., (sy+ey)/2.))
+			sizes.append((math.hypot(ex-sx, ey-sy), self.penwidth))
+			oris.append(-math.degrees(math.atan2(ey-sy, ex-sx)))
+		self.element_array(xys, sizes, self.color, oris=oris)
+
+	@configurable
+	def polygons(self, vertices_list):
+
+		for vertices in vertices_list:
+			self.shapestim(vertices, fix_coor=True, close=True)
+
 	def _text_size(self, text):
 
 		self._text(text, 0, 0)
@@ -331,6 +396,41 @@ class psycho(canvas.canvas, psycho_coordinates):
 			fillColor=fill_color, interpolate=False)
 		self.stim_list.append(stim)
 
+	def element_array(self, xys, sizes, color, mask=None, oris=0):
+
+		"""
+		desc:
+			Draws a number of uniformly colored elements as a single
+			ElementArrayStim.
+
+			__Note:__
+
+			Specific to the PsychoPy backend, primarily intended for internal
+			use. Using this function directly will break your experiment when
+			switching backends.
+
+		arguments:
+			xys:	A list of (x, y) tuples in PsychoPy coordinates.
+			sizes:	A list of sizes or (width, height) tuples.
+			color:	A color object.
+
+		keywords:
+			mask:	A PsychoPy mask, such as 'circle', or None for rectangular
+					elements.
+			oris:	A list of orientations, or a single orientation for all
+					elements.
+		"""
+
+		if not xys:
+			return
+		# Convert the hexadecimal color to a PsychoPy RGB value between -1 and
+		# 1.
+		rgb = [int(color.hexcolor[i:i+2], 16)/127.5-1 for i in (1, 3, 5)]
+		stim = visual.ElementArrayStim(self.experiment.window, units=u'pix',
+			nElements=len(xys), xys=xys, sizes=sizes, oris=oris,
+			elementTex=None, elementMask=mask, colors=rgb, colorSpace=u'rgb')
+		self.stim_list.append(stim)
+
 	@staticmethod
 	def init_display(experiment):
 
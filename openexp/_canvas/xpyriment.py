@@ -20,6 +20,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from openexp._canvas import canvas
 from libopensesame.exceptions import osexception
+from libopensesame.frame_recorder import frame_recorder_singleton
 from openexp.backend import configurable
 import pygame
 try:
@@ -46,6 +47,7 @@ class xpyriment(canvas.canvas, xpyriment_coordinates):
 			u"default" : u"yes"
 			},
 		}
+	_display_list_mode = u'stim_list'
 
 	def __init__(self, experiment, auto_prepare=True, **style_args):
 
@@ -54,19 +56,48 @@ class xpyriment(canvas.canvas, xpyriment_coordinates):
 		xpyriment_coordinates.__init__(self)
 		self.prepared = False
 		self.aa = 10
+		self._stim_list_shared = False
 		self.clear()
 
+	@property
+	def stim_list(self):
+
+		"""
+		visible: False
+
+		desc:
+			The list of stimuli. If the list is shared with another canvas
+			(after a call to copy()), it is copied first, so that drawing does
+			not affect the other canvas. The stimuli themselves are not copied,
+			because they are not modified by drawing operations.
+		"""
+
+		if self._stim_list_shared:
+			self._stim_list = self._stim_list[:]
+			self._stim_list_shared = False
+		return self._stim_list
+
+	@stim_list.setter
+	def stim_list(self, stim_list):
+
+		self._stim_list = stim_list
+		self._stim_list_shared = False
+
 	def copy(self, canvas):
 
-		self.set_config(**canvas.get_config())
+		# The stimulus list and the prepared Expyriment canvas are shared
+		# (copy-on-write) until one of the canvases is drawn onto. Preparing
+		# always creates a new Expyriment canvas, so the shared one is never
+		# modified.
+		self.__cfg__ = canvas.get_config()
 		self.auto_prepare = canvas.auto_prepare
 		self.aa = canvas.aa
-		self.prepared = False
-		self.clear()
-		self.stim_list = [stim.copy() for stim in canvas.stim_list]
-		if self.auto_prepare:
+		self._stim_list = canvas._stim_list
+		self._stim_list_shared = canvas._stim_list_shared = True
+		self._canvas = canvas._canvas
+		self.prepared = canvas.prepared
+		if self.auto_prepare and not self.prepared:
 			self.prepare()
-		canvas.prepared = False
 
 	def add_stim(self, stim, prepare=True):
 
@@ -94,7 +125,7 @@ class xpyriment(canvas.canvas, xpyriment_coordinates):
 			self._canvas = stimuli.Canvas(
 				self.experiment.expyriment.screen.size,
 				colour=self.background_color.backend_color)
-			for stim in self.stim_list:
+			for stim in self._stim_list:
 				stim.plot(self._canvas)
 			self._canvas.preload()
 			self.prepared = True
@@ -105,7 +136,7 @@ class xpyriment(canvas.canvas, xpyriment_coordinates):
 		if not self.prepared: self.prepare()
 		self._canvas.present()
 		self.experiment.last_shown_canvas = self._canvas
-		return self.experiment.time()
+		return frame_recorder_singleton.record(self.experiment.time())
 
 	@configurable
 	def clear(self, color=None):
@@ -97,3 +97,37 @@ class clock(object):
 		"""
 
 		raise NotImplementedError()
+
+	def sleep_until(self, t):
+
+		"""
+		desc: |
+			Sleeps (pauses) until a specific timestamp. If the timestamp has
+			already passed, this function returns right away.
+
+			Sleeping until a deadline, rather than for a duration, avoids the
+			accumulation of timing errors when several periods follow each
+			other, because any overshoot of one period is subtracted from the
+			next.
+
+		arguments:
+			t:
+				desc:	A timestamp in milliseconds, as returned by
+						`clock.time()`.
+				type:	[int, float]
+
+		example: |
+			# Show two canvas objects exactly 1 s apart, regardless of how
+			# long it takes to prepare the second canvas
+			my_canvas1 = canvas()
+			my_canvas1.text(u'1')
+			t0 = my_canvas1.show()
+			my_canvas2 = canvas()
+			my_canvas2.text(u'2')
+			clock.sleep_until(t0 + 1000)
+			my_canvas2.show()
+		"""
+
+		ms = t - self.time()
+		if ms > 0:
+			self.sleep(ms)
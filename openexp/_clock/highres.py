@@ -0,0 +1,81 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from openexp._clock.clock import clock
+import time
+try:
+	from time import perf_counter_ns
+except ImportError:
+	perf_counter_ns = None
+try:
+	from time import perf_counter
+except ImportError:
+	# Python 2
+	from timeit import default_timer as perf_counter
+
+class highres(clock):
+
+	"""
+	desc: |
+		A high-resolution clock that is based on a monotonic performance
+		counter. Timestamps are floats with sub-millisecond precision, and are
+		relative to the moment that the clock was created.
+
+		Sleeping is hybrid: the operating system sleeps until shortly before
+		the deadline, and the remaining time is spent in a spin-wait, which
+		avoids overshooting the deadline by a scheduler time slice.
+
+		For docstrings, see openexp._clock.clock.
+	"""
+
+	settings = {
+		u"highres_spin_margin" : {
+			u"name" : u"Spin-wait margin",
+			u"description" : u"The final part of a sleep (in ms) during which the CPU is kept busy to wake up exactly on time",
+			u"default" : 2,
+			}
+		}
+
+	def __init__(self, experiment):
+
+		clock.__init__(self, experiment)
+		self._spin_margin = experiment.var.get(u'highres_spin_margin', 2)
+		if perf_counter_ns is not None:
+			self._t0 = perf_counter_ns()
+		else:
+			self._t0 = perf_counter()
+
+	def time(self):
+
+		if perf_counter_ns is not None:
+			return (perf_counter_ns() - self._t0) / 1000000.
+		return 1000. * (perf_counter() - self._t0)
+
+	def sleep(self, ms):
+
+		self.sleep_until(self.time() + ms)
+
+	def sleep_until(self, t):
+
+		ms = t - self.time() - self._spin_margin
+		if ms > 0:
+			time.sleep(.001*ms)
+		while self.time() < t:
+			pass
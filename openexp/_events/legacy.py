@@ -0,0 +1,142 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+import math
+from collections import deque
+import pygame
+
+# A timestamped buffer for PyGame input events, which is shared by the legacy
+# keyboard and mouse back-ends.
+#
+# Rather than busy polling the PyGame event queue, the back-ends block on it
+# with a timeout, so that waiting for a response doesn't occupy a CPU core.
+# Each event is timestamped with the experiment clock as soon as it is taken
+# from the PyGame event queue. When the back-ends are waiting for input,
+# this is the moment at which the event arrives. PyGame requires events to
+# be handled in the main thread, so this cannot be done in a separate input
+# thread.
+#
+# Events that have been timestamped, but that have not been handled yet, are
+# kept in a ring buffer. If the buffer is full, the oldest events are
+# discarded.
+
+# The maximum number of events in the ring buffer
+buffer_size = 1024
+# The ring buffer, which contains (event, timestamp) tuples
+_buffer = deque(maxlen=buffer_size)
+# Older versions of PyGame don't support a timeout for event.wait()
+_wait_supports_timeout = pygame.version.vernum[0] >= 2
+
+def pump(clock):
+
+	"""
+	desc:
+		Moves all events from the PyGame event queue into the buffer, without
+		waiting.
+
+	arguments:
+		clock:
+			desc:	The clock that is used for timestamps.
+			type:	clock
+	"""
+
+	events = pygame.event.get()
+	if not events:
+		return
+	t = clock.time()
+	_buffer.extend((event, t) for event in events)
+
+def wait(clock, timeout=None):
+
+	"""
+	desc:
+		Waits until there is at least one event in the buffer, or until a
+		timeout occurs.
+
+	arguments:
+		clock:
+			desc:	The clock that is used for timestamps.
+			type:	clock
+
+	keywords:
+		timeout:
+			desc:	The maximum time to wait in milliseconds, or None to wait
+					indefinitely.
+			type:	[int, float, NoneType]
+	"""
+
+	if _buffer:
+		return
+	if not _wait_supports_timeout:
+		# Fall back to polling, but without occupying the CPU in between.
+		pump(clock)
+		if not _buffer:
+			pygame.time.wait(1)
+		return
+	if timeout is None:
+		event = pygame.event.wait()
+	else:
+		# event.wait() waits indefinitely for a timeout of 0
+		event = pygame.event.wait(max(1, int(math.ceil(timeout))))
+	if event.type == pygame.NOEVENT:
+		return
+	t = clock.time()
+	_buffer.append((event, t))
+	# Events that arrived together are timestamped together
+	_buffer.extend((event, t) for event in pygame.event.get())
+
+def get(clock):
+
+	"""
+	desc:
+		Takes all events from the buffer, after first moving all events from
+		the PyGame event queue into the buffer.
+
+	arguments:
+		clock:
+			desc:	The clock that is used for timestamps.
+			type:	clock
+
+	returns:
+		desc:	A generator of (event, timestamp) tuples, in the order in
+				which the events were received. Events are removed from the
+				buffer as they are taken, so events that are not taken remain
+				in the buffer.
+		type:	generator
+	"""
+
+	pump(clock)
+	while _buffer:
+		yield _buffer.popleft()
+
+def flush():
+
+	"""
+	desc:
+		Removes all events from the buffer and the PyGame event queue.
+
+	returns:
+		desc:	A list of the removed events.
+		type:	list
+	"""
+
+	events = [event for event, t in _buffer] + pygame.event.get()
+	_buffer.clear()
+	return events
@@ -26,6 +26,7 @@ from string import whitespace
 from libopensesame.exceptions import osexception
 from openexp._keyboard import keyboard
 from openexp.backend import configurable
+from openexp._events import legacy as events
 
 # Whitespace, backspace, and empty strings are not acceptable names for keys.
 # These should be converted to descriptions, e.g. '\t' to 'tab'
@@ -82,13 +83,12 @@ class legacy(keyboard.keyboard):
 	@configurable
 	def get_key(self):
 
-		start_time = pygame.time.get_ticks()
-		time = start_time
+		clock = self.experiment.clock
+		start_time = clock.time()
 		keylist = self.keylist
 		timeout = self.timeout
 		while True:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
+			for event, time in events.get(clock):
 				if event.type != pygame.KEYDOWN:
 					continue
 				if event.key == pygame.K_ESCAPE:
@@ -99,9 +99,14 @@ class legacy(keyboard.keyboard):
 					key = event.unicode
 				if keylist is None or key in keylist:
 					return key, time
-			if timeout is not None and time-start_time >= timeout:
+			if timeout is None:
+				events.wait(clock)
+				continue
+			remaining = timeout - (clock.time() - start_time)
+			if remaining <= 0:
 				break
-		return None, time
+			events.wait(clock, remaining)
+		return None, clock.time()
 
 	def get_mods(self):
 
@@ -132,7 +137,7 @@ class legacy(keyboard.keyboard):
 	def flush(self):
 
 		keypressed = False
-		for event in pygame.event.get():
+		for event in events.flush():
 			if event.type == KEYDOWN:
 				keypressed = True
 				if event.key == pygame.K_ESCAPE:
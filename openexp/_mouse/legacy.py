@@ -23,6 +23,7 @@ from openexp._mouse import mouse
 from openexp._coordinates.legacy import legacy as legacy_coordinates
 from libopensesame.exceptions import osexception
 from openexp.backend import configurable
+from openexp._events import legacy as events
 import pygame
 
 class legacy(mouse.mouse, legacy_coordinates):
@@ -65,12 +66,12 @@ class legacy(mouse.mouse, legacy_coordinates):
 		enable_escape = self.experiment.var.get(u'enable_escape', u'no',
 			[u'yes', u'no']) == u'yes'
 		pygame.mouse.set_visible(self.visible)
-		start_time = pygame.time.get_ticks()
-		time = start_time
+		clock = self.experiment.clock
+		start_time = clock.time()
 		while True:
-			time = pygame.time.get_ticks()
+			self._sample_trajectory()
 			# Process the input
-			for event in pygame.event.get():
+			for event, time in events.get(clock):
 				if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
 					self.experiment.pause()
 				if event.type == MOUSEBUTTONDOWN:
@@ -79,26 +80,55 @@ class legacy(mouse.mouse, legacy_coordinates):
 					# experiment is aborted
 					if enable_escape and event.pos[0] < 64 and event.pos[1] \
 						< 64:
-						_time = pygame.time.get_ticks()
-						while pygame.time.get_ticks() - _time < 2000:
-							for event in pygame.event.get():
-								if event.type == MOUSEBUTTONDOWN:
-									if event.pos[0] > \
-										self.experiment.var.width-64 and \
-										event.pos[1] < 64:
-										raise osexception(
-											u"The escape sequence was clicked/ tapped")
+						self._check_escape_sequence(clock, time)
 					if buttonlist is None or event.button in buttonlist:
 						pygame.mouse.set_visible(self._cursor_shown)
 						return event.button, self.from_xy(event.pos), time
-			if timeout is not None and time-start_time >= timeout:
-				break
+			remaining = None
+			if timeout is not None:
+				remaining = timeout - (clock.time() - start_time)
+				if remaining <= 0:
+					break
+			# While recording a trajectory, wake up for the next sample
+			if self._trajectory is not None:
+				until_sample = self._trajectory.next_sample_time - clock.time()
+				if remaining is None or until_sample < remaining:
+					remaining = until_sample
+			events.wait(clock, remaining)
 		pygame.mouse.set_visible(self._cursor_shown)
-		return None, None, time
+		return None, None, clock.time()
+
+	def _check_escape_sequence(self, clock, start_time):
+
+		"""
+		visible: False
+
+		desc:
+			Raises an exception if the top-right corner is clicked within
+			2000 ms after the top-left corner has been clicked.
+
+		arguments:
+			clock:		The experiment clock.
+			start_time:	The timestamp of the click on the top-left corner.
+		"""
+
+		while True:
+			remaining = 2000 - (clock.time() - start_time)
+			if remaining <= 0:
+				return
+			events.wait(clock, remaining)
+			for event, time in events.get(clock):
+				if event.type == MOUSEBUTTONDOWN and \
+					event.pos[0] > self.experiment.var.width-64 and \
+					event.pos[1] < 64:
+					raise osexception(
+						u"The escape sequence was clicked/ tapped")
 
 	def get_pos(self):
 
-		pygame.event.get()
+		# Update the cursor position without taking events from the queue, so
+		# that clicks are not lost
+		pygame.event.pump()
 		return self.from_xy(pygame.mouse.get_pos()), self.experiment.time()
 
 	def get_pressed(self):
@@ -108,7 +138,7 @@ class legacy(mouse.mouse, legacy_coordinates):
 	def flush(self):
 
 		buttonclicked = False
-		for event in pygame.event.get():
+		for event in events.flush():
 			if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
 				self.experiment.pause()
 			if event.type == MOUSEBUTTONDOWN:
@@ -138,6 +138,7 @@ class mouse(backend):
 
 		self.experiment = experiment
 		self._cursor_shown = False
+		self._trajectory = None
 		backend.__init__(self, configurables={
 			u'timeout' : self.assert_numeric_or_None,
 			u'buttonlist' : self.assert_list_or_None,
@@ -288,6 +289,66 @@ class mouse(backend):
 
 		raise NotImplementedError()
 
+	def start_trajectory(self, rate=100, capacity=60000):
+
+		"""
+		desc: |
+			Starts recording the mouse trajectory. While [mouse.get_click] is
+			called, the cursor position and button state are sampled at a
+			fixed rate into preallocated arrays.
+
+		keywords:
+			rate:
+				desc:	The sampling rate in Hz.
+				type:	[int, float]
+			capacity:
+				desc:	The maximum number of samples.
+				type:	int
+
+		example: |
+			my_mouse = mouse()
+			my_mouse.start_trajectory()
+			button, position, timestamp = my_mouse.get_click()
+			trajectory = my_mouse.stop_trajectory()
+			print('Maximum deviation: %.2f' % trajectory.max_deviation())
+		"""
+
+		from openexp._mouse.trajectory import trajectory
+		self._trajectory = trajectory(rate=rate, capacity=capacity)
+		self._sample_trajectory()
+
+	def stop_trajectory(self):
+
+		"""
+		desc:
+			Stops recording the mouse trajectory.
+
+		returns:
+			desc:	The recorded trajectory, or None if no trajectory was
+					being recorded.
+			type:	[trajectory, NoneType]
+		"""
+
+		trajectory = self._trajectory
+		self._trajectory = None
+		return trajectory
+
+	def _sample_trajectory(self):
+
+		"""
+		visible: False
+
+		desc:
+			Adds a sample to the trajectory, if a trajectory is being recorded
+			and a sample is due.
+		"""
+
+		if self._trajectory is None or \
+			not self._trajectory.due(self.experiment.clock.time()):
+			return
+		pos, t = self.get_pos()
+		self._trajectory.add(t, pos, self.get_pressed())
+
 	def synonyms(self, button):
 
 		"""
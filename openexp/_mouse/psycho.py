@@ -50,6 +50,7 @@ class psycho(mouse.mouse, psycho_coordinates):
 		pos = None
 		self.mouse.clickReset()
 		while True:
+			self._sample_trajectory()
 			time = self.experiment.clock.time()
 			buttons, times = self.mouse.getPressed(getTime=True)
 			for i in (1,2,3):
@@ -0,0 +1,295 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+import numpy as np
+
+class trajectory(object):
+
+	"""
+	desc: |
+		A mouse trajectory that is sampled at a fixed rate into preallocated
+		arrays of timestamps, x and y coordinates, and button states. The
+		button state is a bitmask, in which bit 0 corresponds to button 1,
+		bit 1 to button 2, etc. Samples that don't fit in the arrays anymore
+		are discarded.
+
+		Trajectories are recorded with [mouse.start_trajectory] and
+		[mouse.stop_trajectory].
+	"""
+
+	def __init__(self, rate=100, capacity=60000):
+
+		"""
+		desc:
+			Constructor.
+
+		keywords:
+			rate:
+				desc:	The sampling rate in Hz.
+				type:	[int, float]
+			capacity:
+				desc:	The maximum number of samples.
+				type:	int
+		"""
+
+		self.period = 1000. / rate
+		self._t = np.empty(capacity)
+		self._x = np.empty(capacity)
+		self._y = np.empty(capacity)
+		self._buttons = np.empty(capacity, dtype=np.uint8)
+		self.n = 0
+		self.next_sample_time = None
+
+	@property
+	def t(self):
+
+		"""
+		desc:
+			An array of timestamps.
+		"""
+
+		return self._t[:self.n]
+
+	@property
+	def x(self):
+
+		"""
+		desc:
+			An array of x coordinates.
+		"""
+
+		return self._x[:self.n]
+
+	@property
+	def y(self):
+
+		"""
+		desc:
+			An array of y coordinates.
+		"""
+
+		return self._y[:self.n]
+
+	@property
+	def buttons(self):
+
+		"""
+		desc:
+			An array of button bitmasks.
+		"""
+
+		return self._buttons[:self.n]
+
+	def due(self, t):
+
+		"""
+		desc:
+			Checks whether the next sample should be taken.
+
+		arguments:
+			t:
+				desc:	The current time.
+				type:	[int, float]
+
+		returns:
+			desc:	True if a sample is due, False otherwise.
+			type:	bool
+		"""
+
+		return self.next_sample_time is None or t >= self.next_sample_time
+
+	def add(self, t, pos, buttons):
+
+		"""
+		desc:
+			Adds a sample. Samples are scheduled at fixed intervals from the
+			first sample; if sampling falls behind, missed samples are
+			skipped.
+
+		arguments:
+			t:
+				desc:	The timestamp.
+				type:	[int, float]
+			pos:
+				desc:	An (x, y) tuple.
+				type:	tuple
+			buttons:
+				desc:	A sequence of button states, as returned by
+						`mouse.get_pressed()`.
+				type:	tuple
+		"""
+
+		if self.next_sample_time is None:
+			self.next_sample_time = t
+		self.next_sample_time += self.period
+		if self.next_sample_time <= t:
+			self.next_sample_time = t + self.period
+		if self.n >= len(self._t):
+			return
+		mask = 0
+		for i, pressed in enumerate(buttons):
+			if pressed:
+				mask |= 1 << i
+		self._t[self.n] = t
+		self._x[self.n], self._y[self.n] = pos
+		self._buttons[self.n] = mask
+		self.n += 1
+
+	def deviations(self):
+
+		"""
+		desc:
+			Gets the perpendicular distance of each sample to the straight
+			line from the first to the last sample.
+
+		returns:
+			desc:	An array of distances.
+			type:	ndarray
+		"""
+
+		x, y = self.x, self.y
+		if self.n < 2:
+			return np.zeros(self.n)
+		dx = x[-1] - x[0]
+		dy = y[-1] - y[0]
+		length = np.hypot(dx, dy)
+		if not length:
+			return np.hypot(x - x[0], y - y[0])
+		return ((x - x[0]) * dy - (y - y[0]) * dx) / length
+
+	def max_deviation(self):
+
+		"""
+		desc:
+			Gets the maximum absolute deviation from the straight line from
+			the first to the last sample.
+
+		returns:
+			desc:	The maximum deviation, or None if there are no samples.
+			type:	[float, NoneType]
+		"""
+
+		if not self.n:
+			return None
+		return float(np.abs(self.deviations()).max())
+
+	def auc(self):
+
+		"""
+		desc:
+			Gets the area under the curve, i.e. the area of the polygon that
+			is formed by the trajectory and the straight line from the last
+			back to the first sample.
+
+		returns:
+			desc:	The area, or None if there are no samples.
+			type:	[float, NoneType]
+		"""
+
+		if not self.n:
+			return None
+		x, y = self.x, self.y
+		# The shoelace formula, in which the polygon is closed implicitly
+		return float(.5 * np.abs(np.dot(x, np.roll(y, -1)) -
+			np.dot(y, np.roll(x, -1))))
+
+	def resample(self, max_samples):
+
+		"""
+		desc:
+			Resamples the trajectory to at most a given number of evenly
+			spaced samples, by linear interpolation. Button states are taken
+			from the nearest earlier sample.
+
+		arguments:
+			max_samples:
+				desc:	The maximum number of samples.
+				type:	int
+
+		returns:
+			desc:	A (t, x, y, buttons) tuple of arrays.
+			type:	tuple
+		"""
+
+		t, x, y, buttons = self.t, self.x, self.y, self.buttons
+		if self.n <= max_samples:
+			return t, x, y, buttons
+		ti = np.linspace(t[0], t[-1], max_samples)
+		i = np.searchsorted(t, ti, side=u'right') - 1
+		return ti, np.interp(ti, t, x), np.interp(ti, t, y), buttons[i]
+
+	def encode(self, max_samples=None):
+
+		"""
+		desc:
+			Encodes the trajectory as a compact string for the log file. Each
+			sample is encoded as `t,x,y,buttons`, with the timestamp relative
+			to the first sample, and all values rounded to integers. Samples
+			are separated by semicolons.
+
+		keywords:
+			max_samples:
+				desc:	The maximum number of samples, or None to encode all
+						samples. See [trajectory.resample].
+				type:	[int, NoneType]
+
+		returns:
+			desc:	The encoded trajectory.
+			type:	str
+		"""
+
+		if max_samples is None:
+			t, x, y, buttons = self.t, self.x, self.y, self.buttons
+		else:
+			t, x, y, buttons = self.resample(max_samples)
+		if not len(t):
+			return u''
+		a = np.round(np.column_stack((t - t[0], x, y, buttons))).astype(int)
+		return u';'.join(u'%d,%d,%d,%d' % tuple(row) for row in a.tolist())
+
+def log_trajectory(experiment, trajectory):
+
+	"""
+	desc:
+		Sets a trajectory and its summary as experimental variables:
+		`mouse_trajectory_data` (see [trajectory.encode]), `mouse_auc`, and
+		`mouse_max_deviation`. The data is not logged as `mouse_trajectory`,
+		because that variable is the yes/no flag that enables recording. The
+		experimental variable `mouse_trajectory_samples` (default: 100)
+		determines the maximum number of samples in the log; 0 means that all
+		samples are logged.
+
+	arguments:
+		experiment:
+			desc:	The experiment object.
+			type:	experiment
+		trajectory:
+			desc:	The trajectory.
+			type:	trajectory
+	"""
+
+	max_samples = experiment.var.get(u'mouse_trajectory_samples', 100)
+	experiment.var.mouse_trajectory_data = trajectory.encode(
+		max_samples if max_samples else None)
+	auc = trajectory.auc()
+	max_deviation = trajectory.max_deviation()
+	experiment.var.mouse_auc = u'NA' if auc is None else auc
+	experiment.var.mouse_max_deviation = u'NA' if max_deviation is None \
+		else max_deviation
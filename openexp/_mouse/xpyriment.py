@@ -49,10 +49,11 @@ class xpyriment(xpyriment_coordinates, legacy.legacy):
 		buttonlist = self.buttonlist
 		timeout = self.timeout
 		pygame.mouse.set_visible(self.visible)
-		start_time = pygame.time.get_ticks()
+		start_time = self.experiment.clock.time()
 		time = start_time
 		while True:
-			time = pygame.time.get_ticks()
+			self._sample_trajectory()
+			time = self.experiment.clock.time()
 			# Process the input
 			for event in pygame.event.get([MOUSEBUTTONDOWN, KEYDOWN]):
 				if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
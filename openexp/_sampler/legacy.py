@@ -21,10 +21,12 @@ from libopensesame.py3compat import *
 from pygame.locals import *
 import pygame
 from openexp._sampler import sampler
+from openexp._sampler.sound_bank import sound_bank
 from libopensesame.exceptions import osexception
 from libopensesame import misc
 from openexp.keyboard import keyboard
 from openexp.backend import configurable
+from openexp._events import legacy as events
 import os.path
 try:
 	import numpy
@@ -35,6 +37,12 @@ try:
 except ImportError:
 	import android.mixer as mixer
 
+# The event type that is posted when a sound has finished playing
+SOUND_END = USEREVENT + 1
+# The interval (in ms) for checking whether playback has finished, if no
+# end-of-playback event has arrived at the expected time
+WAIT_INTERVAL = 10
+
 class legacy(sampler.sampler):
 
 	"""
@@ -67,6 +75,11 @@ class legacy(sampler.sampler):
 			u"description" : u"1 = mono, 2 = stereo",
 			u"default" : 2
 			},
+		u"sound_bank_size" : {
+			u"name" : u"Sound bank size",
+			u"description" : u"The maximum memory (in MB) for decoded sounds that are kept for reuse",
+			u"default" : 256
+			},
 		}
 
 	def __init__(self, experiment, src, **playback_args):
@@ -87,9 +100,14 @@ class legacy(sampler.sampler):
 				if not py3 and isinstance(src, str):
 					import sys
 					src = src.encode(misc.filesystem_encoding())
-			self.sound = mixer.Sound(src)
+			self._bank_key = _bank_key(src)
+			self.sound = _load_sound(src, self._bank_key)
+		# Pitch and pan are applied to a copy of the original sound, so that
+		# they can be changed back again.
+		self._original_sound = self.sound
 		sampler.sampler.__init__(self, experiment, src, **playback_args)
 		self.keyboard = keyboard(experiment)
+		self._t_end = None
 
 	def set_config(self, **cfg):
 
@@ -98,60 +116,108 @@ class legacy(sampler.sampler):
 		if u'fade_in' in cfg and cfg[u'fade_in'] is None:
 			cfg[u'fade_in'] = 0
 		sampler.sampler.set_config(self, **cfg)
-		if u'volume' in cfg:
-			self.sound.set_volume(cfg[u'volume'])
-		if u'pitch' in cfg:
-			self.adjust_pitch(cfg[u'pitch'])
-		if u'pan' in cfg:
-			self.adjust_pan(cfg[u'pan'])
+		self._apply_config(cfg)
+
+	def restore_config(self, **cfg):
+
+		sampler.sampler.restore_config(self, **cfg)
+		self._apply_config(cfg)
+
+	def _apply_config(self, cfg):
+
+		"""
+		visible: False
+
+		desc:
+			Applies changed volume, pitch, and pan settings to the sound.
+
+		arguments:
+			cfg:	A dict of changed configurables.
+		"""
+
+		if u'pitch' in cfg or u'pan' in cfg:
+			self._assert_pitch(self.pitch)
+			self._assert_pan(self.pan)
+			self._process_sound()
+		elif u'volume' in cfg:
+			self.sound.set_volume(self.volume)
 
 	def adjust_pitch(self, p):
 
-		# On Android, numpy does not exist and this is not supported
-		if numpy is None:
-			return
+		self._assert_pitch(p)
+		self._process_sound(pitch=p)
+
+	def adjust_pan(self, p):
+
+		self._assert_pan(p)
+		self._process_sound(pan=p)
+
+	def _assert_pitch(self, p):
+
 		if type(p) not in (int, float) or p <= 0:
 			raise osexception(
 				u"openexp._sampler.legacy.pitch should be a positive number")
-		if p == 1:
-			return
-		buf = pygame.sndarray.array(self.sound)
-		_buf = []
-		for i in range(int(float(len(buf)) / p)):
-			_buf.append(buf[int(float(i) * p)])
-		self.sound = pygame.sndarray.make_sound(
-			numpy.array(_buf, dtype=u"int16"))
 
-	def adjust_pan(self, p):
+	def _assert_pan(self, p):
 
-		# On Android, numpy does not exist and this is not supported
-		if numpy is None:
-			return
 		if type(p) not in (int, float) and p not in (u"left", u"right"):
 			raise osexception(
 				u"openexp._sampler.legacy.pan should be a number or 'left', 'right'")
-		if p == 0:
-			return
-		buf = pygame.sndarray.array(self.sound)
-		for i in range(len(buf)):
-			l = buf[i][0]
-			r = buf[i][1]
-			if p == "left":
-				r = 0
-			elif p == "right":
-				l = 0
-			elif p < 0:
-				r = int(float(r) / abs(p))
+
+	def _process_sound(self, pitch=None, pan=None):
+
+		"""
+		visible: False
+
+		desc:
+			Applies pitch and pan to the original sound. Processed sound data
+			is stored in the sound bank, so that the same sound with the same
+			settings is only processed once.
+
+		keywords:
+			pitch:	The pitch, or None to use the current pitch.
+			pan:	The pan, or None to use the current pan.
+		"""
+
+		if pitch is None:
+			pitch = self.pitch
+		if pan is None:
+			pan = self.pan
+		# On Android, numpy does not exist and this is not supported
+		if numpy is None or (pitch == 1 and pan == 0):
+			self.sound = self._original_sound
+		else:
+			key = None
+			buf = None
+			if self._bank_key is not None:
+				key = self._bank_key + (pitch, pan)
+				buf = bank.get(key)
+			if buf is not None:
+				self.sound = mixer.Sound(buffer=buf)
 			else:
-				l = int(float(l) / p)
-			buf[i][0] = l
-			buf[i][1] = r
-		self.sound = pygame.sndarray.make_sound(numpy.array(buf))
+				buf = pygame.sndarray.array(self._original_sound)
+				if pitch != 1:
+					buf = _resample(buf, pitch)
+				if pan != 0:
+					buf = _pan(buf, pan)
+				self.sound = pygame.sndarray.make_sound(buf)
+				if key is not None:
+					bank.add(key, self.sound.get_raw())
+		self.sound.set_volume(self.volume)
 
 	@configurable
 	def play(self, **playback_args):
 
-		self.sound.play(maxtime=self.duration, fade_ms=self.fade_in)
+		channel = self.sound.play(maxtime=self.duration, fade_ms=self.fade_in)
+		# The end of playback is signalled by an event on the PyGame event
+		# queue, so that wait() can sleep until it arrives. The expected end
+		# time serves as a fallback in case the event is not posted.
+		if channel is not None:
+			channel.set_endevent(SOUND_END)
+		length = 1000. * self.sound.get_length()
+		if self.duration > 0:
+			length = min(length, self.duration)
+		self._t_end = self.experiment.clock.time() + length
 		if self.block:
 			self.wait()
 
@@ -173,7 +239,32 @@ class legacy(sampler.sampler):
 
 	def wait(self):
 
+		clock = self.experiment.clock
+		t_end = self._t_end
+		if not pygame.display.get_init():
+			# Without a PyGame display, for example with the psycho back-end,
+			# there is no event queue to wait on, so we poll with short
+			# sleeps instead. We don't use clock.sleep(), because the legacy
+			# clock sleeps with pygame.time.delay(), which keeps the CPU busy.
+			while mixer.get_busy():
+				self.keyboard.flush()
+				if t_end is None:
+					timeout = WAIT_INTERVAL
+				else:
+					timeout = min(WAIT_INTERVAL, max(1, t_end - clock.time()))
+				pygame.time.wait(int(timeout))
+			return
 		while mixer.get_busy():
+			# Sleep until an event arrives: the end-of-playback event, or a
+			# key press, so that the Escape key is handled right away. If the
+			# expected end time has already passed, for example because
+			# playback was paused or another sound is still playing, we check
+			# again regularly.
+			if t_end is None:
+				timeout = WAIT_INTERVAL
+			else:
+				timeout = max(WAIT_INTERVAL, t_end - clock.time())
+			events.wait(clock, timeout)
 			self.keyboard.flush()
 
 	@staticmethod
@@ -189,8 +280,144 @@ class legacy(sampler.sampler):
 		mixer.pre_init(experiment.var.sound_freq, experiment.var.sound_sample_size, \
 			experiment.var.sound_channels, experiment.var.sound_buf_size)
 		mixer.init()
+		bank.clear()
+		bank.memory_limit = \
+			experiment.var.get(u'sound_bank_size', 256) * 1024**2
 
 	@staticmethod
 	def close_sound(experiment):
 
 		mixer.quit()
+		bank.clear()
+
+	@staticmethod
+	def preload(experiment, src):
+
+		for path in src:
+			key = _bank_key(path)
+			if key is None:
+				raise osexception(u'Cannot preload %s' % path)
+			_load_sound(path, key, pinned=True)
+
+# The sound bank is shared by all sampler objects
+bank = sound_bank()
+
+def _bank_key(src):
+
+	"""
+	desc:
+		Gets a key that identifies decoded sound data in the sound bank.
+
+	arguments:
+		src:	The source of the sound.
+
+	returns:
+		A (path, modification time, mixer format) tuple, or None if the
+		source is not a file or the mixer doesn't support raw sound data.
+	"""
+
+	if not isinstance(src, (bytes, basestring)) or \
+		not hasattr(mixer.Sound, u'get_raw'):
+		return None
+	try:
+		return src, os.path.getmtime(src), mixer.get_init()
+	except (OSError, TypeError):
+		return None
+
+def _load_sound(src, key, pinned=False):
+
+	"""
+	desc:
+		Creates a sound object, using decoded sound data from the sound bank
+		if possible.
+
+	arguments:
+		src:	The source of the sound.
+		key:	The sound-bank key as returned by _bank_key(), or None to
+				bypass the sound bank.
+
+	keywords:
+		pinned:	Indicates whether the sound data should be kept in the sound
+				bank even when its memory limit is exceeded.
+
+	returns:
+		A mixer.Sound object.
+	"""
+
+	if key is None:
+		return mixer.Sound(src)
+	# The unprocessed sound has a pitch of 1 and a pan of 0
+	key += (1, 0)
+	buf = bank.get(key)
+	if buf is None:
+		sound = mixer.Sound(src)
+		buf = sound.get_raw()
+	else:
+		# The sound object gets its own copy of the data, so that its volume
+		# can be set independently.
+		sound = mixer.Sound(buffer=buf)
+	if pinned or key not in bank:
+		bank.add(key, buf, pinned=pinned)
+	return sound
+
+def _resample(buf, p):
+
+	"""
+	desc:
+		Changes the pitch of sound data by resampling it with linear
+		interpolation.
+
+	arguments:
+		buf:	A sound array of shape (samples,) or (samples, channels).
+		p:		The pitch, where 2 is twice as fast and high.
+
+	returns:
+		A new sound array with the same data type.
+	"""
+
+	n = int(float(len(buf)) / p)
+	x = numpy.arange(n) * float(p)
+	xp = numpy.arange(len(buf))
+	if buf.ndim == 1:
+		out = numpy.interp(x, xp, buf)
+	else:
+		out = numpy.empty((n, buf.shape[1]))
+		for channel in range(buf.shape[1]):
+			out[:, channel] = numpy.interp(x, xp, buf[:, channel])
+	if numpy.issubdtype(buf.dtype, numpy.integer):
+		out = numpy.round(out)
+	return out.astype(buf.dtype)
+
+def _pan(buf, p):
+
+	"""
+	desc:
+		Pans stereo sound data by attenuating one channel.
+
+	arguments:
+		buf:	A sound array of shape (samples, channels). Mono sound is
+				returned unchanged.
+		p:		'left', 'right', or a number. For negative numbers, the right
+				channel is divided by the absolute number; for positive
+				numbers, the left channel is divided by the number.
+
+	returns:
+		A new sound array with the same data type.
+	"""
+
+	buf = buf.copy()
+	if buf.ndim < 2 or buf.shape[1] < 2:
+		return buf
+	if p == u'left':
+		buf[:, 1] = 0
+		return buf
+	if p == u'right':
+		buf[:, 0] = 0
+		return buf
+	channel = 1 if p < 0 else 0
+	attenuated = buf[:, channel] / float(abs(p))
+	if numpy.issubdtype(buf.dtype, numpy.integer):
+		info = numpy.iinfo(buf.dtype)
+		attenuated = numpy.clip(numpy.trunc(attenuated), info.min, info.max)
+	buf[:, channel] = attenuated
+	return buf
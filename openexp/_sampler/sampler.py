@@ -316,6 +316,26 @@ class sampler(backend):
 
 		raise NotImplementedError()
 
+	@staticmethod
+	def preload(experiment, src):
+
+		"""
+		desc:
+			Decodes sound files in advance, so that creating SAMPLER objects
+			for them later on is fast. Back-ends that don't support preloading
+			ignore this.
+
+		arguments:
+			experiment:
+				desc:	The experiment object.
+				type:	experiment
+			src:
+				desc:	A list of full paths to `.wav` or `.ogg` files.
+				type:	list
+		"""
+
+		pass
+
 	@staticmethod
 	def close_sound(experiment):
 
@@ -0,0 +1,160 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+from libopensesame.exceptions import osexception
+
+class sound_bank(object):
+
+	"""
+	desc: |
+		A shared store of decoded sound data, so that a sound file is only
+		read and decoded once, no matter how many SAMPLER objects are created
+		for it. Processed versions of a sound (e.g. with a different pitch)
+		are stored as well.
+
+		Sound data is stored as raw bytes, keyed by a tuple that identifies
+		the source and the processing. The total size of the stored data is
+		limited: when the limit is exceeded, the least recently used sounds
+		are removed. Preloaded sounds are never removed automatically.
+
+		The sound bank saves decoding time, not memory: each SAMPLER creates
+		its own sound object from the stored data, and this sound object
+		holds its own copy of the data. Sound objects are not shared, because
+		the volume is a property of the sound object. The memory limit
+		therefore applies only to the data in the sound bank, and not to the
+		sounds of existing SAMPLER objects.
+	"""
+
+	def __init__(self, memory_limit=256*1024**2):
+
+		"""
+		desc:
+			Constructor.
+
+		keywords:
+			memory_limit:
+				desc:	The maximum total size of the stored sound data in
+						bytes.
+				type:	int
+		"""
+
+		self.memory_limit = memory_limit
+		self.clear()
+
+	def clear(self):
+
+		"""
+		desc:
+			Removes all sounds, including preloaded sounds.
+		"""
+
+		# The order of the keys reflects how recently they were used, from
+		# least to most recent.
+		self._keys = []
+		self._buffers = {}
+		self._pinned = set()
+		self.size = 0
+
+	def __contains__(self, key):
+
+		return key in self._buffers
+
+	def get(self, key):
+
+		"""
+		desc:
+			Gets sound data, and marks it as recently used.
+
+		arguments:
+			key:
+				desc:	A key that identifies the sound data.
+				type:	tuple
+
+		returns:
+			desc:	The raw sound data, or None if the bank doesn't contain
+					the sound data.
+			type:	[bytes, NoneType]
+		"""
+
+		buf = self._buffers.get(key, None)
+		if buf is not None:
+			self._keys.remove(key)
+			self._keys.append(key)
+		return buf
+
+	def add(self, key, buf, pinned=False):
+
+		"""
+		desc:
+			Adds sound data, and removes the least recently used sound data if
+			the memory limit is exceeded.
+
+		arguments:
+			key:
+				desc:	A key that identifies the sound data.
+				type:	tuple
+			buf:
+				desc:	The raw sound data.
+				type:	bytes
+
+		keywords:
+			pinned:
+				desc:	Indicates whether the sound data should be kept even
+						when the memory limit is exceeded, as is the case for
+						preloaded sounds.
+				type:	bool
+		"""
+
+		self.remove(key)
+		pinned_size = sum(len(self._buffers[_key]) for _key in self._pinned)
+		if pinned and pinned_size + len(buf) > self.memory_limit:
+			raise osexception(
+				u'Cannot preload sound, because the sound bank would exceed its memory limit of %.1f MB' \
+				% (self.memory_limit / 1024.**2))
+		self._keys.append(key)
+		self._buffers[key] = buf
+		self.size += len(buf)
+		if pinned:
+			self._pinned.add(key)
+		for _key in list(self._keys):
+			if self.size <= self.memory_limit:
+				break
+			if _key not in self._pinned:
+				self.remove(_key)
+
+	def remove(self, key):
+
+		"""
+		desc:
+			Removes sound data. If the bank doesn't contain the sound data,
+			nothing happens.
+
+		arguments:
+			key:
+				desc:	A key that identifies the sound data.
+				type:	tuple
+		"""
+
+		buf = self._buffers.pop(key, None)
+		if buf is None:
+			return
+		self._keys.remove(key)
+		self._pinned.discard(key)
+		self.size -= len(buf)
@@ -169,18 +169,29 @@ def configurable(fnc):
 
 	def inner(self, *arglist, **kwdict):
 
+		if not kwdict:
+			return fnc(self, *arglist)
+		# Only the configurables that actually change are set, and afterwards
+		# only these are restored. The old values have been validated before,
+		# so they are restored without validating them again.
 		cfg = {}
-		for key, val in list(kwdict.items()):
-			if key in self.configurables:
-				cfg[key] = val
-				del kwdict[key]
-		if len(cfg) > 0:
-			old_cfg = self.get_config()
-			self.set_config(**cfg)
-		retval = fnc(self, *arglist, **kwdict)
-		if len(cfg) > 0:
-			self.set_config(**old_cfg)
-		return retval
+		old_cfg = {}
+		for key in list(kwdict):
+			if key not in self.configurables:
+				continue
+			val = kwdict.pop(key)
+			old_val = self.__cfg__.get(key, None)
+			if _unchanged(old_val, val):
+				continue
+			cfg[key] = val
+			old_cfg[key] = old_val
+		if not cfg:
+			return fnc(self, *arglist, **kwdict)
+		self.set_config(**cfg)
+		try:
+			return fnc(self, *arglist, **kwdict)
+		finally:
+			self.restore_config(**old_cfg)
 	# We need to copy the docstring and argument specification, otherwise using
 	# this decorator will break the documentation functions.
 	if FunctionDoc is not None:
@@ -190,6 +201,35 @@ def configurable(fnc):
 		inner.__name__ = fnc.__name__
 	return inner
 
+def _unchanged(old_val, val):
+
+	"""
+	visible:	False
+
+	desc:
+		Checks whether a configurable value is the same as the current value,
+		in which case it doesn't need to be set.
+
+	arguments:
+		old_val:	The current value.
+		val:		The new value.
+
+	returns:
+		desc:	True if the value is unchanged, False otherwise.
+		type:	bool
+	"""
+
+	if val is old_val:
+		return True
+	# Only compare values of the same type, so that for example 1 and True,
+	# and a color name and a color object, are considered different.
+	if type(val) is not type(old_val):
+		return False
+	try:
+		return bool(val == old_val)
+	except Exception:
+		return False
+
 def getter(key, self):
 
 	"""
@@ -397,6 +437,25 @@ class backend(object):
 			if key not in self.__cfg__:
 				raise osexception(u'Invalid config: %s' % str(self.__cfg__))
 
+	def restore_config(self, **cfg):
+
+		"""
+		visible:	False
+
+		desc: |
+			Restores configurables to values that have been validated before,
+			such as values that were returned by `get_config()`. Unlike
+			`set_config()`, the values are not validated or converted again.
+
+			Back-ends that apply configurables as a side effect of
+			`set_config()` should override this function to re-apply them.
+
+		keyword-dict:
+			cfg:	The to-be-restored configurables.
+		"""
+
+		self.__cfg__.update(cfg)
+
 	def default_config(self):
 
 		"""
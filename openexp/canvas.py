@@ -50,6 +50,47 @@ def canvas(experiment, *arglist, **kwdict):
 	cls = backend.get_backend_class(experiment, u'canvas')
 	return cls(experiment, *arglist, **kwdict)
 
+def display_list(experiment, *arglist, **kwdict):
+
+	"""
+	desc:
+		A factory that returns a retained-mode display list on top of a
+		back-end specific canvas object.
+
+	arguments:
+		experiment:
+			desc:	The experiment object.
+			type:	experiment
+
+	argument-list:
+		arglist:	See canvas.__init__().
+
+	keyword-dict:
+		kwdict:		See canvas.__init__().
+	"""
+
+	from openexp._canvas.display_list import display_list
+	return display_list(canvas(experiment, *arglist, **kwdict))
+
+def prepare_pool(experiment):
+
+	"""
+	desc:
+		Gets the back-end specific pool of worker threads for preparing
+		canvases in the background.
+
+	arguments:
+		experiment:		The experiment object.
+		type:			experiment
+
+	returns:
+		A worker pool, or None if background preparation is not supported or
+		not enabled.
+	"""
+
+	cls = backend.get_backend_class(experiment, u'canvas')
+	return cls.prepare_pool(experiment)
+
 def init_display(experiment):
 
 	"""
@@ -55,6 +55,22 @@ def init_sound(experiment):
 	cls = backend.get_backend_class(experiment, u'sampler')
 	cls.init_sound(experiment)
 
+def preload(experiment, src):
+
+	"""
+	desc:
+		Calls the back-end specific preload function.
+
+	arguments:
+		experiment:		The experiment object.
+		type:			experiment
+		src:			A list of full paths to sound files.
+		type:			list
+	"""
+
+	cls = backend.get_backend_class(experiment, u'sampler')
+	cls.preload(experiment, src)
+
 def close_sound(experiment):
 
 	"""
@@ -20,12 +20,17 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from libopensesame.exceptions import osexception
 from openexp.sampler import sampler
+from collections import OrderedDict
 try:
 	import numpy as np
-	from scipy import signal
 except:
 	np = None
-	signal = None
+
+# The maximum size of the tone cache in bytes
+cache_size = 64*1024**2
+# The tone cache, from least to most recently used
+_cache = OrderedDict()
+_cache_bytes = 0
 
 def synth(experiment, osc="sine", freq=440, length=100, attack=0, decay=5):
 
@@ -58,11 +63,136 @@ def synth(experiment, osc="sine", freq=440, length=100, attack=0, decay=5):
 			u'Decay must be a numeric value between 0 and the sound length')
 	# We need to multiply the rate by two to get a stereo signal
 	rate = 2*experiment.var.get(u'sampler_frequency', 48100)
-	signal = osc_gen(osc, key_to_freq(freq), length, rate)
-	_envelope = envelope(length, attack, decay, rate)
-	sound = to_int_16(signal * _envelope)
+	sound = tone(osc, key_to_freq(freq), length, attack, decay, rate)
 	return sampler(experiment, sound)
 
+def tone(osc, freq, length, attack, decay, rate):
+
+	"""
+	desc: |
+		Generates a tone as a 16 bit int array. Tones are cached, so that
+		generating the same tone again is fast. The cache is limited to
+		`cache_size` bytes, and the least recently used tones are removed
+		first.
+
+		White noise is never cached, because each call should give a fresh
+		noise buffer.
+
+	arguments:
+		osc:
+			desc:	The oscillator.
+			type:	[str, unicode]
+		freq:
+			desc:	The frequency in hertz.
+			type:	[int, float]
+		length:
+			desc:	The length in milliseconds.
+			type:	[int, float]
+		attack:
+			desc:	The attack in milliseconds.
+			type:	[int, float]
+		decay:
+			desc:	The decay in milliseconds.
+			type:	[int, float]
+		rate:
+			desc:	The number of samples per second.
+			type:	int
+
+	returns:
+		desc:	A read-only array. Sampler objects copy the data, so the
+				array can be shared.
+		type:	ndarray
+
+	visible:
+		False
+	"""
+
+	global _cache_bytes
+	key = osc, freq, length, attack, decay, rate
+	if osc != u'white_noise':
+		a = _cache.pop(key, None)
+		if a is not None:
+			# Re-insert to mark the tone as most recently used
+			_cache[key] = a
+			return a
+	n = n_samples(length, rate)
+	a = np.concatenate([np.zeros(0, dtype=np.int16)] + list(stream(osc,
+		freq, length, attack, decay, rate, chunk_size=max(1, n))))
+	a.flags.writeable = False
+	if osc == u'white_noise' or a.nbytes > cache_size:
+		return a
+	_cache[key] = a
+	_cache_bytes += a.nbytes
+	while _cache_bytes > cache_size:
+		_cache_bytes -= _cache.popitem(last=False)[1].nbytes
+	return a
+
+def stream(osc, freq, length, attack, decay, rate, chunk_size=4096):
+
+	"""
+	desc: |
+		Generates a tone in chunks, which is useful for long tones, because
+		the full tone is never held in memory as a float array. Concatenating
+		the chunks gives the same result as `tone()`.
+
+	arguments:
+		osc:
+			desc:	The oscillator.
+			type:	[str, unicode]
+		freq:
+			desc:	The frequency in hertz.
+			type:	[int, float]
+		length:
+			desc:	The length in milliseconds.
+			type:	[int, float]
+		attack:
+			desc:	The attack in milliseconds.
+			type:	[int, float]
+		decay:
+			desc:	The decay in milliseconds.
+			type:	[int, float]
+		rate:
+			desc:	The number of samples per second.
+			type:	int
+
+	keywords:
+		chunk_size:
+			desc:	The number of samples per chunk.
+			type:	int
+
+	returns:
+		desc:	A generator of 16 bit int arrays.
+		type:	generator
+
+	example: |
+		from openexp.synth import stream
+		for chunk in stream(u'sine', 440, 60000, 0, 5, 96200):
+			my_file.write(chunk.tobytes())
+	"""
+
+	n = n_samples(length, rate)
+	# The time points run from 0 to the length, inclusive
+	dt = .001*length / (n-1) if n > 1 else 0
+	attack = int(.001*attack*rate)
+	decay = int(.001*decay*rate)
+	for start in range(0, n, chunk_size):
+		i = np.arange(start, min(n, start+chunk_size))
+		a = oscillate(osc, freq, i*dt)
+		a *= envelope_chunk(i, n, attack, decay)
+		yield to_int_16(a)
+
+def n_samples(length, rate):
+
+	"""
+	desc:
+		Gives the number of samples for a sound length.
+
+	visible:
+		False
+	"""
+
+	return int(.001*length*rate)
+
 def key_to_freq(key):
 
 	"""
@@ -130,16 +260,39 @@ def key_to_freq(key):
 
 def osc_gen(_type, freq, length, rate):
 
-	length *= .001
-	t = np.linspace(0, length, length*rate)
+	"""
+	desc:
+		An oscillator that generates the complete waveform.
+
+	visible:
+		False
+	"""
+
+	n = n_samples(length, rate)
+	return oscillate(_type, freq, np.linspace(0, .001*length, n))
+
+def oscillate(_type, freq, t):
+
+	"""
+	desc:
+		An oscillator that generates the waveform at specific time points.
+
+	visible:
+		False
+	"""
+
+	# scipy is only needed for the square and saw oscillators, so we only
+	# import it when it's used.
 	if _type == u'square':
+		from scipy import signal
 		return signal.square(2*np.pi*freq*t)
 	if _type == u'saw':
+		from scipy import signal
 		return signal.sawtooth(2*np.pi*freq*t)
 	if _type == u'sine':
 		return np.sin(2*np.pi*freq*t)
 	if _type == u'white_noise':
-		return np.random.random(length*rate)*2 - 1
+		return np.random.random(len(t))*2 - 1
 	raise osexception(u'Invalid oscillator: %s' % _type)
 
 def envelope(length, attack, decay, rate):
@@ -153,16 +306,32 @@ def envelope(length, attack, decay, rate):
 		False
 	"""
 
-	length *= .001
-	attack *= .001
-	decay *= .001
-	e = np.ones(length*rate)
+	n = n_samples(length, rate)
+	return envelope_chunk(np.arange(n), n, int(.001*attack*rate),
+		int(.001*decay*rate))
+
+def envelope_chunk(i, n, attack, decay):
+
+	"""
+	desc:
+		Gives the envelope for specific samples of a sound.
+
+	arguments:
+		i:		An array of sample indices.
+		n:		The total number of samples.
+		attack:	The number of attack samples.
+		decay:	The number of decay samples.
+
+	visible:
+		False
+	"""
+
+	e = np.ones(len(i))
 	if attack > 0:
-		attack = int(attack*rate)
-		e[:attack] *= np.linspace(0, 1, attack)
+		e = np.where(i < attack, i / float(max(1, attack-1)), e)
 	if decay > 0:
-		decay = int(decay*rate)
-		e[-decay:] *= np.linspace(1, 0, decay)
+		j = i - (n - decay)
+		e = np.where(j >= 0, e * (1 - j / float(max(1, decay-1))), e)
 	return e
 
 def to_int_16(a):
@@ -74,8 +74,8 @@ class advanced_delay(item.item):
 			The run phase of the plug-in.
 		"""
 
-		self.set_item_onset(self.time())
-		self.sleep(self._duration)
+		t0 = self.set_item_onset(self.time())
+		self.clock.sleep_until(t0 + self._duration)
 
 	def var_info(self):
 
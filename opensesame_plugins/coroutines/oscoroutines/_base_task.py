@@ -19,6 +19,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 from libopensesame.py3compat import *
 from libopensesame.exceptions import osexception
+from timeit import default_timer
 
 class base_task(object):
 
@@ -55,6 +56,11 @@ class base_task(object):
 		self.start_time = start_time
 		self.end_time = end_time
 		self.coroutines = coroutines
+		self.alive = False
+		self.next_wakeup = None
+		self.step_count = 0
+		self.step_duration = 0
+		self.max_step_duration = 0
 
 	def started(self, dt):
 
@@ -120,14 +126,48 @@ class base_task(object):
 	def step(self):
 
 		"""
-		desc:
+		desc: |
 			Lets the item yield one cycle.
+
+			The coroutine can yield a timestamp to indicate that it doesn't
+			need to be stepped again until that time, so that the coroutines
+			can sleep in the meantime. If it yields anything else, it is
+			stepped again in the next cycle. If it yields False, the
+			coroutines is aborted.
+
+		returns:
+			desc:	ALIVE, DEAD, or ABORT.
+			type:	int
 		"""
 
+		t0 = default_timer()
 		try:
-			if self.coroutine.send(True) is False:
-				return self.ABORT
+			value = self.coroutine.send(True)
 		except StopIteration:
 			self.coroutines.event('died %s' % self.coroutine)
 			return self.DEAD
+		finally:
+			duration = 1000. * (default_timer() - t0)
+			self.step_count += 1
+			self.step_duration += duration
+			self.max_step_duration = max(self.max_step_duration, duration)
+		if value is False:
+			return self.ABORT
+		if isinstance(value, (int, float)) and not isinstance(value, bool):
+			self.next_wakeup = value
+		else:
+			self.next_wakeup = None
 		return self.ALIVE
+
+	@property
+	def step_statistics(self):
+
+		"""
+		desc:
+			A description of how long stepping the coroutine took.
+		"""
+
+		if not self.step_count:
+			return u'no steps'
+		return u'%d steps, mean %.4f ms, max %.4f ms' % (self.step_count,
+			self.step_duration / self.step_count, self.max_step_duration)
@@ -18,7 +18,10 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from libopensesame.py3compat import *
+import heapq
 from libopensesame.item import item
+from libopensesame import frame_recorder
+from libopensesame.frame_recorder import frame_recorder_singleton
 from oscoroutines import item_task, inline_task
 
 
@@ -143,43 +146,89 @@ class coroutines(item):
 
 		"""See item."""
 
-		self._schedule.sort(key=lambda task: task.start_time)
+		# Record the timestamps of all display flips during the trampoline
+		handle = frame_recorder_singleton.start()
+		try:
+			self._run()
+		finally:
+			timestamps = frame_recorder_singleton.stop(handle)
+		frame_recorder.log_summary(self, timestamps)
+
+	def _run(self):
+
+		"""
+		desc: |
+			Runs the trampoline.
+
+			Start times, end times, and the wakeup times that tasks declare by
+			yielding a timestamp are kept in heaps. Tasks that don't declare a
+			wakeup time are stepped every cycle. If there are no such tasks,
+			the trampoline sleeps until the next start, end, or wakeup time.
+		"""
+
+		# The heaps contain (time, index, task) tuples, where time is relative
+		# to the start of the trampoline, and the index keeps tasks with the
+		# same time in schedule order.
+		starts = [(task.start_time, i, task)
+			for i, task in enumerate(self._schedule)]
+		heapq.heapify(starts)
+		ends = []
+		wakeups = []
+		polling = []
+		started = []
 		# Launch all coroutines
 		for task in self._schedule:
 			task.launch()
 		dt = 0
-		active = []
 		t0 = self.clock.time()
 		i = 0
 		running = True
 		while running and dt < self.var.duration:
-			# Activate coroutines by start time
-			while self._schedule and self._schedule[0].started(dt):
-				active.append(self._schedule.pop(0))
-				active.sort(key=lambda task: task.end_time)
-			# Run all active coroutines. If a task returns alive, it should be
-			# kept as an active task; if it returns DEAD, it should be removed
-			# from the active tasks; if it returns ABORT, the whole coroutines
-			# should be aborted.
-			_active = []
-			for task in active:
-				status = task.step()
-				if status == task.ALIVE:
-					_active.append(task)
-					continue
-				if status == task.ABORT:
-					running = False
-			active = _active
-			# De-activate coroutines by end time
-			while active and active[0].stopped(dt):
-				active.pop(0)
+			_polling = polling
+			polling = []
+			# Start coroutines by start time, and step coroutines that have
+			# asked to be woken up. If a task returns ALIVE, it should be
+			# stepped again; if it returns DEAD, it should be forgotten; if it
+			# returns ABORT, the whole coroutines should be aborted.
+			while running and starts and starts[0][0] <= dt:
+				start_time, index, task = heapq.heappop(starts)
+				task.alive = True
+				started.append(task)
+				heapq.heappush(ends, (task.end_time, index, task))
+				running = self._step(task, index, t0, polling, wakeups)
+			while running and wakeups and wakeups[0][0] <= dt:
+				wakeup_time, index, task = heapq.heappop(wakeups)
+				running = self._step(task, index, t0, polling, wakeups)
+			for index, task in _polling:
+				if running:
+					running = self._step(task, index, t0, polling, wakeups)
+			# Stop coroutines by end time
+			while ends and ends[0][0] <= dt:
+				end_time, index, task = heapq.heappop(ends)
+				if task.alive:
+					task.alive = False
+					task.stopped(dt)
+			# If no coroutines need to be stepped every cycle, there is
+			# nothing to do until the next deadline. Sleeping until a deadline
+			# relative to the start of the trampoline avoids the accumulation
+			# of drift.
+			if running and not polling:
+				deadline = self.var.duration
+				for heap in (starts, wakeups, ends):
+					if heap:
+						deadline = min(deadline, heap[0][0])
+				self.clock.sleep_until(t0 + deadline)
 			dt = self.clock.time()-t0
 			i += 1
 		self.event('killed after %d ms' % (self.clock.time()-t0))
 		# Kill pending coroutines
-		for task in active:
-			task.kill()
+		for task in started:
+			if task.alive:
+				task.alive = False
+				task.kill()
 		self.event('trampoline took %d ms' % (self.clock.time()-t0))
+		for task in started:
+			self.event('%s: %s' % (task.coroutine, task.step_statistics))
 		self.experiment.var.coroutines_cycles = i
 		self.experiment.var.coroutines_duration = dt
 		self.experiment.var.coroutines_mean_cycle_duration = 1.*dt/i
@@ -187,6 +236,48 @@ class coroutines(item):
 			(self.experiment.var.coroutines_cycles, \
 			self.experiment.var.coroutines_mean_cycle_duration))
 
+	def _step(self, task, index, t0, polling, wakeups):
+
+		"""
+		desc:
+			Steps a task, and schedules its next step.
+
+		arguments:
+			task:
+				desc:	The task.
+				type:	base_task
+			index:
+				desc:	The index of the task in the schedule.
+				type:	int
+			t0:
+				desc:	The start time of the trampoline.
+				type:	[int, float]
+			polling:
+				desc:	A list of (index, task) tuples for tasks that should
+						be stepped in the next cycle.
+				type:	list
+			wakeups:
+				desc:	The heap of wakeup times.
+				type:	list
+
+		returns:
+			desc:	False if the coroutines should be aborted, True otherwise.
+			type:	bool
+		"""
+
+		# The task may have been stopped since it was scheduled
+		if not task.alive:
+			return True
+		status = task.step()
+		if status == task.DEAD:
+			task.alive = False
+		elif status == task.ALIVE:
+			if task.next_wakeup is None:
+				polling.append((index, task))
+			else:
+				heapq.heappush(wakeups, (task.next_wakeup - t0, index, task))
+		return status != task.ABORT
+
 	def var_info(self):
 
 		"""See item."""
@@ -195,4 +286,7 @@ class coroutines(item):
 		l.append( (u"coroutines_cycles", u"[Determined at runtime]") )
 		l.append( (u"coroutines_duration", u"[Determined at runtime]") )
 		l.append( (u"coroutines_mean_cycle_duration", u"[Determined at runtime]") )
+		for key in (u'count', u'mean_interval', u'max_jitter', u'dropped'):
+			l.append( (u"flip_%s_%s" % (key, self.name),
+				u"[Determined at runtime]") )
 		return l
@@ -235,3 +235,93 @@ class basejoystick(object):
 		"""
 
 		raise NotImplementedError()
+
+	def start_sampling(self, rate=500, capacity=65536):
+
+		"""
+		desc: |
+			Starts sampling all axes, buttons, and hats in a background thread,
+			at a fixed rate. Samples are kept in a ring buffer, from which the
+			oldest samples are discarded when it is full. Each sample is a
+			(timestamp, axes, buttons, hats) tuple.
+
+			Sampling continues until [joystick.stop_sampling] is called, or
+			until the experiment ends. If sampling has already started with
+			the same settings, this function does nothing.
+
+		keywords:
+			rate:
+				desc:	The sampling rate in Hz.
+				type:	[int, float]
+			capacity:
+				desc:	The number of samples in the ring buffer.
+				type:	int
+		"""
+
+		raise NotImplementedError()
+
+	def stop_sampling(self):
+
+		"""
+		desc:
+			Stops sampling.
+		"""
+
+		raise NotImplementedError()
+
+	def get_samples(self):
+
+		"""
+		desc:
+			Gets all samples that are in the ring buffer.
+
+		returns:
+			desc:	A list of (timestamp, axes, buttons, hats) tuples, from
+					oldest to newest.
+			type:	list
+		"""
+
+		raise NotImplementedError()
+
+	def start_trace(self):
+
+		"""
+		desc:
+			Starts recording a trace, for example the trajectory of the
+			joystick during a trial. This starts sampling with the default
+			settings if sampling hasn't started yet. Recording happens in the
+			background, so this function returns right away.
+
+		returns:
+			desc:	A trace handle to pass to [joystick.stop_trace].
+			type:	int
+
+		example: |
+			trace = joystick.start_trace()
+			clock.sleep(1000)
+			for t, axes, buttons, hats in joystick.stop_trace(trace):
+				print(t, axes)
+		"""
+
+		raise NotImplementedError()
+
+	def stop_trace(self, trace):
+
+		"""
+		desc:
+			Gets the samples that have been recorded since a trace was
+			started. Samples that no longer fit in the ring buffer are lost.
+
+		arguments:
+			trace:
+				desc:	A trace handle that was returned by
+						[joystick.start_trace].
+				type:	int
+
+		returns:
+			desc:	A list of (timestamp, axes, buttons, hats) tuples, from
+					oldest to newest.
+			type:	list
+		"""
+
+		raise NotImplementedError()
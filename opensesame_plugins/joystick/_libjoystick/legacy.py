@@ -23,15 +23,137 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from libopensesame.py3compat import *
+import threading
+from time import sleep
+from timeit import default_timer
 import pygame
 from pygame.locals import *
 from pygame.joystick import Joystick
 from libopensesame.exceptions import osexception
 from libopensesame import plugins
+from openexp._events import legacy as events
+try:
+	# Updates the joystick state without pumping the event queue, which is
+	# thread safe. This is available as of PyGame 2.
+	from pygame._sdl2.controller import update as _update_joysticks
+	from pygame._sdl2.controller import init as _init_controllers
+except ImportError:
+	_update_joysticks = None
 
 basejoystick = plugins.load_cls(__file__, cls=u'basejoystick',
 	mod=u'basejoystick')
 
+class joystick_sampler(threading.Thread):
+
+	"""
+	desc: |
+		A thread that samples all axes, buttons, and hats of a joystick at a
+		fixed rate into a timestamped ring buffer. Each sample is a
+		(timestamp, axes, buttons, hats) tuple. Samples are overwritten when
+		the ring buffer is full.
+
+		With PyGame 2, the joystick state is updated by the thread itself.
+		With older versions of PyGame, the joystick state is only updated
+		when the event queue is pumped.
+	"""
+
+	def __init__(self, js, clock, rate, capacity):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			js:
+				desc:	The joystick.
+				type:	Joystick
+			clock:
+				desc:	The clock that is used for timestamps.
+				type:	clock
+			rate:
+				desc:	The sampling rate in Hz.
+				type:	[int, float]
+			capacity:
+				desc:	The number of samples in the ring buffer.
+				type:	int
+		"""
+
+		super(joystick_sampler, self).__init__()
+		self.daemon = True
+		self.js = js
+		self.clock = clock
+		self.period = 1. / rate
+		self.samples = [None] * capacity
+		self.index = 0
+		self._stop_event = threading.Event()
+		# The joystick state can only be updated by the thread when the game
+		# controller system is initialized. This is done here, and not in the
+		# thread, because SDL should be initialized from the main thread.
+		if _update_joysticks is not None:
+			_init_controllers()
+
+	def run(self):
+
+		"""
+		desc:
+			Samples the joystick until the sampler is stopped. Samples are
+			taken at fixed deadlines, so that timing errors do not accumulate.
+		"""
+
+		js = self.js
+		axes = range(js.get_numaxes())
+		buttons = range(js.get_numbuttons())
+		hats = range(js.get_numhats())
+		capacity = len(self.samples)
+		deadline = default_timer()
+		while not self._stop_event.is_set():
+			if _update_joysticks is not None:
+				_update_joysticks()
+			self.samples[self.index % capacity] = (self.clock.time(),
+				tuple(js.get_axis(i) for i in axes),
+				tuple(js.get_button(i) for i in buttons),
+				tuple(js.get_hat(i) for i in hats))
+			self.index += 1
+			deadline += self.period
+			delay = deadline - default_timer()
+			if delay > 0:
+				sleep(delay)
+			elif delay < -self.period:
+				# If we have fallen behind by more than a sample, we skip
+				# samples rather than trying to catch up.
+				deadline = default_timer()
+
+	def get_samples(self, start=0):
+
+		"""
+		desc:
+			Gets the samples that are still in the ring buffer.
+
+		keywords:
+			start:
+				desc:	The index of the first sample.
+				type:	int
+
+		returns:
+			desc:	A list of samples, from oldest to newest.
+			type:	list
+		"""
+
+		end = self.index
+		capacity = len(self.samples)
+		start = max(start, end - capacity)
+		return [self.samples[i % capacity] for i in range(start, end)]
+
+	def stop(self):
+
+		"""
+		desc:
+			Stops the sampler, and waits for the thread to finish.
+		"""
+
+		self._stop_event.set()
+		self.join()
+
 class legacy(basejoystick):
 
 	def __init__(self, experiment, device=0, joybuttonlist=None, timeout=None):
@@ -43,6 +165,7 @@ class legacy(basejoystick):
 		self.experiment = experiment
 		self.set_joybuttonlist(joybuttonlist)
 		self.set_timeout(timeout)
+		self._sampler = None
 
 	def get_joybutton(self, joybuttonlist=None, timeout=None):
 
@@ -50,97 +173,38 @@ class legacy(basejoystick):
 
 		if joybuttonlist is None or joybuttonlist == []:
 			joybuttonlist = self._joybuttonlist
-		if timeout is None:
-			timeout = self.timeout
-
-		start_time = pygame.time.get_ticks()
-		time = start_time
-
-		while timeout is None or time - start_time <= timeout:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-				if event.type == JOYBUTTONDOWN:
-					if joybuttonlist is None or event.button + 1 in \
-						joybuttonlist:
-						bpress = event.button + 1
-						return bpress, time
-
-		return None, time
+		event, time = self._get_event((JOYBUTTONDOWN,), joybuttonlist,
+			timeout)
+		if event is None:
+			return None, time
+		return event.button + 1, time
 
 	def get_joyaxes(self, timeout=None):
 
 		"""See _libjoystick.basejoystick"""
 
-		if timeout is None:
-			timeout = self.timeout
-
-		pos = []
-		start_time = pygame.time.get_ticks()
-		time = start_time
-
-		while timeout is None or time - start_time < timeout:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-				if event.type == JOYAXISMOTION:
-					for axis in range(self.js.get_numaxes()):
-						pos.append(self.js.get_axis(axis))
-					return pos, time
-
-		return None, time
+		event, time = self._get_event((JOYAXISMOTION,), None, timeout)
+		if event is None:
+			return None, time
+		return self._state(event.type), time
 
 	def get_joyballs(self, timeout=None):
 
 		"""See _libjoystick.basejoystick"""
 
-		if timeout is None:
-			timeout = self.timeout
-
-		ballpos = []
-		start_time = pygame.time.get_ticks()
-		time = start_time
-
-		while timeout is None or time - start_time < timeout:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-				if event.type == JOYBALLMOTION:
-					for ball in range(self.js.get_numballs()):
-						ballpos.append(self.js.get_ball(ball))
-					return ballpos, time
-
-		return None, time
+		event, time = self._get_event((JOYBALLMOTION,), None, timeout)
+		if event is None:
+			return None, time
+		return self._state(event.type), time
 
 	def get_joyhats(self, timeout=None):
 
 		"""See _libjoystick.basejoystick"""
 
-		if timeout is None:
-			timeout = self.timeout
-
-		hatpos = []
-		start_time = pygame.time.get_ticks()
-		time = start_time
-
-		while timeout is None or time - start_time < timeout:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-				if event.type == JOYHATMOTION:
-					for hat in range(self.js.get_numhats()):
-						hatpos.append(self.js.get_hat(hat))
-					return hatpos, time
-
-		return None, time
+		event, time = self._get_event((JOYHATMOTION,), None, timeout)
+		if event is None:
+			return None, time
+		return self._state(event.type), time
 
 	def get_joyinput(self, joybuttonlist=None, timeout=None):
 
@@ -148,45 +212,17 @@ class legacy(basejoystick):
 
 		if joybuttonlist is None or joybuttonlist == []:
 			joybuttonlist = self._joybuttonlist
-		if timeout is None:
-			timeout = self.timeout
-
-		pos = []
-		ballpos = []
-		hatpos = []
-		eventtype = None
-		start_time = pygame.time.get_ticks()
-		time = start_time
-
-		while timeout is None or time - start_time <= timeout:
-			time = pygame.time.get_ticks()
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-				if event.type == JOYBUTTONDOWN:
-					if joybuttonlist is None or event.button + 1 in \
-						joybuttonlist:
-						eventtype = u'joybuttonpress'
-						bpress = event.button + 1
-						return eventtype, bpress, time
-				if event.type == JOYAXISMOTION:
-					eventtype = u'joyaxismotion'
-					for axis in range(self.js.get_numaxes()):
-						pos.append(self.js.get_axis(axis))
-					return eventtype, pos, time
-				if event.type == JOYBALLMOTION:
-					eventtype = u'joyballmotion'
-					for ball in range(self.js.get_numballs()):
-						ballpos.append(self.js.get_ball(ball))
-					return eventtype, ballpos, time
-				if event.type == JOYHATMOTION:
-					eventtype = u'joyhatmotion'
-					for hat in range(self.js.get_numhats()):
-						hatpos.append(self.js.get_hat(hat))
-					return eventtype, hatpos, time
-
-		return eventtype, None, time
+		event, time = self._get_event((JOYBUTTONDOWN, JOYAXISMOTION,
+			JOYBALLMOTION, JOYHATMOTION), joybuttonlist, timeout)
+		if event is None:
+			return None, None, time
+		if event.type == JOYBUTTONDOWN:
+			return u'joybuttonpress', event.button + 1, time
+		if event.type == JOYAXISMOTION:
+			return u'joyaxismotion', self._state(event.type), time
+		if event.type == JOYBALLMOTION:
+			return u'joyballmotion', self._state(event.type), time
+		return u'joyhatmotion', self._state(event.type), time
 
 	def input_options(self):
 
@@ -201,10 +237,130 @@ class legacy(basejoystick):
 		"""See _libjoystick.basejoystick"""
 
 		joyinput = False
-		for event in pygame.event.get():
+		for event in events.flush():
 			if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
 				self.experiment.pause()
 			if event.type == JOYBUTTONDOWN or event.type == JOYAXISMOTION or \
 				event.type == JOYBALLMOTION or event.type == JOYHATMOTION:
 				joyinput = True
 		return joyinput
+
+	def start_sampling(self, rate=500, capacity=65536):
+
+		"""See _libjoystick.basejoystick"""
+
+		if self._sampler is not None:
+			if self._sampler.period == 1. / rate and \
+				len(self._sampler.samples) == capacity:
+				return
+			self.stop_sampling()
+		self._sampler = joystick_sampler(self.js, self.experiment.clock, rate,
+			capacity)
+		self._sampler.start()
+		if self.stop_sampling not in self.experiment.cleanup_functions:
+			self.experiment.cleanup_functions.append(self.stop_sampling)
+
+	def stop_sampling(self):
+
+		"""See _libjoystick.basejoystick"""
+
+		if self._sampler is None:
+			return
+		self._sampler.stop()
+		self._sampler = None
+
+	def get_samples(self):
+
+		"""See _libjoystick.basejoystick"""
+
+		if self._sampler is None:
+			return []
+		return self._sampler.get_samples()
+
+	def start_trace(self):
+
+		"""See _libjoystick.basejoystick"""
+
+		if self._sampler is None:
+			self.start_sampling()
+		return self._sampler.index
+
+	def stop_trace(self, trace):
+
+		"""See _libjoystick.basejoystick"""
+
+		if self._sampler is None:
+			raise osexception(u'Joystick sampling has been stopped')
+		return self._sampler.get_samples(trace)
+
+	def _get_event(self, eventtypes, joybuttonlist, timeout):
+
+		"""
+		visible: False
+
+		desc:
+			Waits for a joystick event.
+
+		arguments:
+			eventtypes:
+				desc:	The accepted event types.
+				type:	tuple
+			joybuttonlist:
+				desc:	The accepted buttons, or None to accept all buttons.
+				type:	[list, NoneType]
+			timeout:
+				desc:	A timeout, or None to use the default timeout.
+				type:	[int, float, NoneType]
+
+		returns:
+			desc:	An (event, timestamp) tuple. The event is None if a timeout
+					occurred.
+			type:	tuple
+		"""
+
+		if timeout is None:
+			timeout = self.timeout
+		clock = self.experiment.clock
+		start_time = clock.time()
+		while True:
+			for event, time in events.get(clock):
+				if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
+					self.experiment.pause()
+				if event.type not in eventtypes:
+					continue
+				if event.type == JOYBUTTONDOWN and joybuttonlist is not None \
+					and event.button + 1 not in joybuttonlist:
+					continue
+				return event, time
+			if timeout is None:
+				events.wait(clock)
+				continue
+			remaining = timeout - (clock.time() - start_time)
+			if remaining <= 0:
+				break
+			events.wait(clock, remaining)
+		return None, clock.time()
+
+	def _state(self, eventtype):
+
+		"""
+		visible: False
+
+		desc:
+			Gets the current state of all axes, balls, or hats.
+
+		arguments:
+			eventtype:
+				desc:	JOYAXISMOTION, JOYBALLMOTION, or JOYHATMOTION.
+				type:	int
+
+		returns:
+			desc:	A list of axis positions, ball positions, or hat positions.
+			type:	list
+		"""
+
+		if eventtype == JOYAXISMOTION:
+			return [self.js.get_axis(i) for i in range(self.js.get_numaxes())]
+		if eventtype == JOYBALLMOTION:
+			return [self.js.get_ball(i) for i in range(self.js.get_numballs())]
+		return [self.js.get_hat(i) for i in range(self.js.get_numhats())]
@@ -20,9 +20,120 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from libopensesame.exceptions import osexception
 from libopensesame import debug
+from collections import deque
+import threading
 import serial
 import os
 
+class srbox_reader(threading.Thread):
+
+	"""
+	desc: |
+		A thread that reads the output of the SR Box while it is in sending
+		mode.
+
+		The SR Box continuously sends its button state as one byte per
+		sample. The reader drains the serial port in bulk, and reconstructs
+		the timestamp of each sample from the time at which the data was read
+		and the sample rate: the last byte of a batch was sent just now, and
+		each earlier byte one sample period before the next. Button state
+		changes are appended to a `deque`, which can be consumed by another
+		thread without locking.
+	"""
+
+	def __init__(self, port, clock, sample_rate):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			port:
+				desc:	The serial port. Reads should block with a short
+						timeout, so that the thread can be stopped.
+				type:	serial.Serial
+			clock:
+				desc:	The clock that is used for timestamps.
+				type:	clock
+			sample_rate:
+				desc:	The sample rate of the SR Box in Hz.
+				type:	[int, float]
+		"""
+
+		super(srbox_reader, self).__init__()
+		self.daemon = True
+		self.port = port
+		self.clock = clock
+		self.period = 1000. / sample_rate
+		# (old state, new state, timestamp) tuples
+		self.changes = deque()
+		# The last button state, or None before the first sample
+		self.state = None
+		# Set whenever new data has been read
+		self.new_data = threading.Event()
+		self.exception = None
+		self._last_t = None
+		self._stop_event = threading.Event()
+
+	def run(self):
+
+		"""
+		desc:
+			Reads from the serial port until the reader is stopped.
+		"""
+
+		try:
+			while not self._stop_event.is_set():
+				data = self.port.read(1)
+				if not data:
+					continue
+				n = self.port.inWaiting()
+				if n:
+					data += self.port.read(n)
+				self.process(bytearray(data), self.clock.time())
+		except Exception as e:
+			self.exception = e
+		self.new_data.set()
+
+	def process(self, data, t):
+
+		"""
+		desc:
+			Timestamps a batch of samples, and registers the state changes.
+
+		arguments:
+			data:
+				desc:	The samples.
+				type:	bytearray
+			t:
+				desc:	The time at which the last sample was received.
+				type:	[int, float]
+		"""
+
+		n = len(data)
+		for i, byte in enumerate(data):
+			ts = t - (n - 1 - i) * self.period
+			# Timestamps cannot go back in time across batches
+			if self._last_t is not None and ts < self._last_t:
+				ts = self._last_t
+			self._last_t = ts
+			if byte == self.state:
+				continue
+			if self.state is not None:
+				self.changes.append((self.state, byte, ts))
+			self.state = byte
+		self.new_data.set()
+
+	def stop(self):
+
+		"""
+		desc:
+			Stops the reader, and waits for the thread to finish.
+		"""
+
+		self._stop_event.set()
+		self.join()
+
 class libsrbox(object):
 
 	"""
@@ -70,8 +181,12 @@ class libsrbox(object):
 	BUTTON8 = int('01111111', 2)
 	BYTEMASKS = [BUTTON1, BUTTON2, BUTTON3, BUTTON4, BUTTON5, BUTTON6, BUTTON7,
 		BUTTON8]
+	# The approximate number of samples per second that the SR Box sends
+	SAMPLE_RATE = 800
+	# The timeout (in seconds) for blocking reads by the reader thread
+	READ_TIMEOUT = .05
 
-	def __init__(self, experiment, dev=None):
+	def __init__(self, experiment, dev=None, sample_rate=None):
 
 		"""
 		desc:
@@ -88,11 +203,20 @@ class libsrbox(object):
 			dev:
 				desc:	The srbox device port or `None` for auto-detect.
 				type:	[str, unicode, NoneType]
+			sample_rate:
+				desc:	The number of samples per second that the SR Box
+						sends, or `None` for the default of 800 Hz. This is
+						used to reconstruct the timestamps of samples that
+						are read together.
+				type:	[int, float, NoneType]
 		"""
 
 		self.experiment = experiment
 		self._srbox = None
 		self._started = False
+		self._reader = None
+		self.sample_rate = self.SAMPLE_RATE if sample_rate is None \
+			else sample_rate
 
 		# If a device has been specified, use it
 		if dev not in (None, "", "autodetect"):
@@ -139,7 +263,7 @@ class libsrbox(object):
 		debug.msg("using device %s" % dev)
 		# Turn off all lights
 		if self._srbox is not None:
-			self._srbox.write('\x60')
+			self._srbox.write(b'\x60')
 
 	def send(self, ch):
 
@@ -154,6 +278,8 @@ class libsrbox(object):
 				type:	str
 		"""
 
+		if not isinstance(ch, bytes):
+			ch = safe_encode(ch, enc=u'latin-1')
 		self._srbox.write(ch)
 
 	def start(self):
@@ -162,7 +288,8 @@ class libsrbox(object):
 		desc:
 			Turns on sending mode, so that the SR Box starts to send output.
 			The SR Box must be in sending mode when you call
-			[srbox.get_button_press].
+			[srbox.get_button_press]. While the SR Box is in sending mode, its
+			output is read in a background thread.
 		"""
 
 		if self._started:
@@ -170,7 +297,11 @@ class libsrbox(object):
 		# Write the start byte
 		self._srbox.flushOutput()
 		self._srbox.flushInput()
-		self._srbox.write('\xA0')
+		self._srbox.timeout = self.READ_TIMEOUT
+		self._reader = srbox_reader(self._srbox, self.experiment.clock,
+			self.sample_rate)
+		self._reader.start()
+		self._srbox.write(b'\xA0')
 		self._started = True
 
 	def stop(self):
@@ -182,10 +313,13 @@ class libsrbox(object):
 
 		if not self._started:
 			return
+		self._reader.stop()
+		self._reader = None
+		self._srbox.timeout = 0
 		# Write the stop byte and flush the input
 		self._srbox.flushOutput()
 		self._srbox.flushInput()
-		self._srbox.write('\x20')
+		self._srbox.write(b'\x20')
 		self._started = False
 
 	def get_button_press(self, allowed_buttons=None, timeout=None,
@@ -224,45 +358,73 @@ class libsrbox(object):
 		for buttonnr, bytemask in enumerate(self.BYTEMASKS):
 			if allowed_buttons is None or buttonnr+1 in allowed_buttons:
 				bytemasks.append((buttonnr+1, bytemask))
-		inputbyte0 = None
+		reader = self._reader
+		# State changes that were read before the call are discarded
+		reader.changes.clear()
+		# If no state change is required, buttons that are already pressed
+		# are accepted right away.
+		if not require_state_change and reader.state is not None:
+			button_list = self._pressed(bytemasks, reader.state)
+			if button_list:
+				return button_list, t0
 		while True:
-			# Get a valid character and convert it to a byte
-			inputchar = self._srbox.read(1)
-			if inputchar == '':
+			# Clear the event before consuming state changes, so that changes
+			# that arrive in the meantime wake us up right away.
+			reader.new_data.clear()
+			while reader.changes:
+				inputbyte0, inputbyte1, t1 = reader.changes.popleft()
+				# A reconstructed timestamp can be slightly before the call
+				t1 = max(t0, t1)
+				if require_state_change:
+					# If a state change is required, a button should be
+					# pressed now but not before. Because there is only one
+					# state change at a time, we can return right away.
+					for buttonnr, bytemask in bytemasks:
+						if inputbyte1 | bytemask == 255 and \
+							inputbyte0 | bytemask != 255:
+							return [buttonnr], t1
+				else:
+					# If no state change is required, create a list of all
+					# buttons that are pressed.
+					button_list = self._pressed(bytemasks, inputbyte1)
+					if button_list:
+						return button_list, t1
+			if reader.exception is not None:
+				raise osexception(u'Failed to read from SR Box: %s' \
+					% reader.exception)
+			if timeout is None:
+				reader.new_data.wait()
 				continue
-			inputbyte1 = ord(inputchar)
 			# Check for a timeout
-			t1 = self.experiment.time()
-			if timeout is not None and t1 - t0 > timeout:
+			remaining = t0 + timeout - self.experiment.time()
+			if remaining <= 0:
 				break
-			# To check for state changes, we need an old and a new state.
-			# Therefore, on the first loop we don't do anything.
-			if require_state_change and inputbyte0 is None:
-				inputbyte0 = inputbyte1
-				continue
-			# Ignore no responses
-			if not inputbyte1:
-				inputbyte0 = inputbyte1
-				continue
-			if require_state_change:
-				# If a state change is required, a button should be pressed now
-				# but not before. Because there is only one state change at a
-				# time, we can return right away.
-				for buttonnr, bytemask in bytemasks:
-					if inputbyte1 | bytemask == 255 and \
-						inputbyte0 | bytemask != 255:
-						return [buttonnr], t1
-			else:
-				# If no state change is required, only consider the last input
-				# and create a list of all buttons that are pressed.
-				button_list = []
-				for button_nr, bytemask in bytemasks:
-					if inputbyte1 | bytemask == 255:
-						button_list.append(button_nr)
-				if button_list:
-					return button_list, t1
-			inputbyte0 = inputbyte1
-		return None, t1
+			reader.new_data.wait(remaining / 1000.)
+		return None, self.experiment.time()
+
+	def _pressed(self, bytemasks, inputbyte):
+
+		"""
+		visible: False
+
+		desc:
+			Gets the buttons that are pressed according to a sample.
+
+		arguments:
+			bytemasks:
+				desc:	A list of buttonnr, bytemask tuples.
+				type:	list
+			inputbyte:
+				desc:	A sample.
+				type:	int
+
+		returns:
+			desc:	A list of pressed buttons.
+			type:	list
+		"""
+
+		return [buttonnr for buttonnr, bytemask in bytemasks
+			if inputbyte | bytemask == 255]
 
 	def close(self):
 
@@ -272,5 +434,8 @@ class libsrbox(object):
 			the SRBOX plugin when the experiment finishes.
 		"""
 
+		if self._reader is not None:
+			self._reader.stop()
+			self._reader = None
 		self._srbox.close()
 		self._started = False
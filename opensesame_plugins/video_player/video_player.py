@@ -19,8 +19,14 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 from libopensesame.py3compat import *
 
+import threading
+try:
+	import queue
+except ImportError:
+	import Queue as queue
 # OpenCV is used to read the video file
-import cv
+import cv2
+import numpy
 # PyGame is used to control the display
 import pygame
 from pygame.locals import *
@@ -29,6 +35,133 @@ from libopensesame import item
 from libqtopensesame.items.qtautoplugin import qtautoplugin
 from libqtopensesame.widgets import pool_widget
 from libopensesame.exceptions import osexception
+from openexp._events import legacy as events
+from libopensesame import frame_recorder
+from libopensesame.frame_recorder import frame_recorder_singleton
+
+# The number of frames that are decoded ahead of time
+frame_buffer = 8
+
+class frame_decoder(threading.Thread):
+
+	"""
+	desc:
+		A thread that decodes video frames ahead of time into a ring of
+		reusable RGB buffers. Each buffer is wrapped in a PyGame surface that
+		shares its memory, so that decoded frames are never copied before they
+		are blitted to the display.
+	"""
+
+	def __init__(self, capture, size, n):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			capture:
+				desc:	The video capture to read from.
+				type:	cv2.VideoCapture
+			size:
+				desc:	The (width, height) of the frames. Frames are resized
+						if this differs from the size of the video.
+				type:	tuple
+			n:
+				desc:	The number of frames in the ring.
+				type:	int
+		"""
+
+		super(frame_decoder, self).__init__()
+		self.daemon = True
+		self.capture = capture
+		self.size = size
+		w, h = size
+		self.frames = [numpy.empty((h, w, 3), dtype=numpy.uint8)
+			for i in range(n)]
+		self.surfaces = [pygame.image.frombuffer(frame, size, u'RGB')
+			for frame in self.frames]
+		self.free = queue.Queue()
+		self.ready = queue.Queue()
+		for i in range(n):
+			self.free.put(i)
+		self.exception = None
+		self._stop_event = threading.Event()
+		self._src = None
+		self._tmp = None
+
+	def run(self):
+
+		"""
+		desc:
+			Decodes frames into free buffers until the video ends or the
+			decoder is stopped. The indices of decoded buffers are put in the
+			`ready` queue, followed by `None` when there are no more frames.
+		"""
+
+		try:
+			while not self._stop_event.is_set():
+				try:
+					i = self.free.get(timeout=.1)
+				except queue.Empty:
+					continue
+				ok, self._src = self.capture.read(self._src)
+				if not ok:
+					break
+				h, w = self._src.shape[:2]
+				if (w, h) != self.size:
+					self._tmp = cv2.resize(self._src, self.size, self._tmp)
+					cv2.cvtColor(self._tmp, cv2.COLOR_BGR2RGB, self.frames[i])
+				else:
+					cv2.cvtColor(self._src, cv2.COLOR_BGR2RGB, self.frames[i])
+				self.ready.put(i)
+		except Exception as e:
+			self.exception = e
+		self.ready.put(None)
+
+	def next_frame(self):
+
+		"""
+		desc:
+			Waits for the next decoded frame.
+
+		returns:
+			desc:	The index of the buffer that contains the frame, or None
+					if there are no more frames.
+			type:	[int, NoneType]
+		"""
+
+		i = self.ready.get()
+		if i is None:
+			# Put the sentinel back, so that later calls return None as well
+			self.ready.put(None)
+			if self.exception is not None:
+				raise self.exception
+		return i
+
+	def release(self, i):
+
+		"""
+		desc:
+			Returns a buffer to the ring, so that it can be reused.
+
+		arguments:
+			i:
+				desc:	The index of the buffer.
+				type:	int
+		"""
+
+		self.free.put(i)
+
+	def stop(self):
+
+		"""
+		desc:
+			Stops the decoder thread and releases the video capture.
+		"""
+
+		self._stop_event.set()
+		self.join()
+		self.capture.release()
 
 class video_player(item.item):
 
@@ -51,94 +184,143 @@ class video_player(item.item):
 		self.fullscreen = u"yes"
 		self.frame_dur = 50
 		self.video_src = u""
+		self.decoder = None
 		item.item.__init__(self, name, experiment, script)
 
 	def prepare(self):
 
-		"""Opens the video file for playback."""
+		"""Opens the video file and starts decoding frames."""
 
 		if self.experiment.var.get(u'canvas_backend') != u'legacy':
 			raise osexception( \
 				u'The video_player plug-in requires the legacy back-end!')
 
 		item.item.prepare(self)
+		# A decoder from an earlier prepare phase may still be running, for
+		# example if the item was prepared but not run.
+		self.stop_decoder()
 		path = self.experiment.pool[self.var.get(u'video_src')]
 		# Open the video file
-		self.video = cv.CreateFileCapture(path)
-		# Convert the string to a boolean, for slightly faster evaluations in
-		# the run phase
-		self._fullscreen = self.var.get(u'fullscreen') == u"yes"
+		video = cv2.VideoCapture(path)
+		if not video.isOpened():
+			raise osexception(u'Failed to open video file: %s' % path)
 		# The dimensions of the video
-		self._w = int(cv.GetCaptureProperty(self.video, cv.CV_CAP_PROP_FRAME_WIDTH))
-		self._h = int(cv.GetCaptureProperty(self.video, cv.CV_CAP_PROP_FRAME_HEIGHT))
-		if self._fullscreen:
-			# In fullscreen mode, the video is always shown in the top-left and the
-			# temporary images need to be fullscreen size
+		self._w = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+		self._h = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+		if self.var.get(u'fullscreen') == u"yes":
+			# In fullscreen mode, the video is always shown in the top-left and
+			# the frames are resized to fullscreen size
 			self._x = 0
 			self._y = 0
-			self.src_tmp = cv.CreateMat(self.experiment.var.height, \
-				self.experiment.var.width, cv.CV_8UC3)
-			self.src_rgb = cv.CreateMat(self.experiment.var.height, \
-				self.experiment.var.width, cv.CV_8UC3)
+			size = self.experiment.var.width, self.experiment.var.height
 		else:
-			# Otherwise the location of the video depends on its dimensions and the
-			# temporary image is the same size as the video
-			self._x = max(0, (self.experiment.var.width - self._w) / 2)
-			self._y = max(0, (self.experiment.var.height - self._h) / 2)
-			self.src_rgb = cv.CreateMat(self._h, self._w, cv.CV_8UC3)
+			# Otherwise the location of the video depends on its dimensions
+			self._x = max(0, (self.experiment.var.width - self._w) // 2)
+			self._y = max(0, (self.experiment.var.height - self._h) // 2)
+			size = self._w, self._h
+		# Start decoding, so that the first frames are ready when the run
+		# phase starts
+		self.decoder = frame_decoder(video, size,
+			self.var.get(u'frame_buffer', frame_buffer))
+		self.decoder.start()
+		if self.stop_decoder not in self.experiment.cleanup_functions:
+			self.experiment.cleanup_functions.append(self.stop_decoder)
+
+	def stop_decoder(self):
+
+		"""
+		desc:
+			Stops the decoder thread, if any, and releases the video file.
+		"""
+
+		if self.decoder is None:
+			return
+		self.decoder.stop()
+		self.decoder = None
 
 	def run(self):
 
 		"""Handles the actual video playback."""
 
+		handle = frame_recorder_singleton.start()
+		try:
+			self._play()
+		finally:
+			self.stop_decoder()
+			timestamps = frame_recorder_singleton.stop(handle)
+		frame_recorder.log_summary(self, timestamps,
+			self.var.get(u'frame_dur'))
+
+	def _play(self):
+
+		"""
+		Shows the decoded frames. Each frame has a fixed deadline relative to
+		the onset of the item, so that timing errors do not accumulate. Frames
+		that are late are dropped, if the next frame has already been decoded
+		and is also late.
+		"""
+
+		clock = self.experiment.clock
+		surface = self.experiment.surface
+		frame_dur = self.var.get(u'frame_dur')
+		duration = self.var.get(u'duration')
+		events.flush()
 		# Log the onset time of the item
-		self.set_item_onset()
-
-		t = pygame.time.get_ticks()
-		start_t = t
-		# Loop until a key is pressed
-		go = True
-		while go:
-			# Get the frame
-			self.src = cv.QueryFrame(self.video)
+		start_t = self.set_item_onset(clock.time())
+		shown = 0
+		dropped = 0
+		frame = 0
+		while True:
+			i = self.decoder.next_frame()
 			# Check for the end of the video
-			if self.src is None:
+			if i is None:
 				break
-			# Resize if requested and convert the resulting image to
-			# RGB format, which is compatible with PyGame
-			if self._fullscreen:
-				cv.Resize(self.src, self.src_tmp)
-				cv.CvtColor(self.src_tmp, self.src_rgb, cv.CV_BGR2RGB)
-			else:
-				cv.CvtColor(self.src, self.src_rgb, cv.CV_BGR2RGB)
-			# Convert the image to PyGame format
-			pg_img = pygame.image.frombuffer(self.src_rgb.tostring(), \
-				cv.GetSize(self.src_rgb), u"RGB")
+			deadline = start_t + frame * frame_dur
+			frame += 1
+			if clock.time() >= deadline + frame_dur and \
+				not self.decoder.ready.empty():
+				dropped += 1
+				self.decoder.release(i)
+				continue
+			surface.blit(self.decoder.surfaces[i], (self._x, self._y))
+			self.decoder.release(i)
 			# Show the video frame!
-			self.experiment.surface.blit(pg_img, (self._x, self._y))
+			clock.sleep_until(deadline)
 			pygame.display.flip()
-			# Pause before jumping to the next frame
-			pygame.time.wait(
-				self.var.get(u'frame_dur') - pygame.time.get_ticks() + t)
-			t = pygame.time.get_ticks()
-			if type(self.var.get(u'duration')) == int:
+			frame_recorder_singleton.record(clock.time())
+			shown += 1
+			if type(duration) == int:
 				# Wait for a specified duration
-				if t - start_t >= self.var.get(u'duration'):
-					go = False
+				if clock.time() - start_t >= duration:
+					break
 			# Catch escape presses
-			for event in pygame.event.get():
-				if event.type == KEYDOWN:
-					if event.key == pygame.K_ESCAPE:
-						self.experiment.pause()
-					if self.var.get(u'duration') == u"keypress":
-						go = False
-				if event.type == MOUSEBUTTONDOWN and self.var.get(u'duration') == \
-					u"mouseclick":
-					go = False
-		# Release the camera
-		# Note: This function appears to be missing. Perhaps it's ok
-		# and Python will release it automatically?
-		# cv.ReleaseCapture(self.video)
+			if self._check_events(duration):
+				break
+		self.experiment.var.set(u'frames_shown_%s' % self.name, shown)
+		self.experiment.var.set(u'frames_dropped_%s' % self.name, dropped)
+
+	def _check_events(self, duration):
+
+		"""
+		Handles pending key presses and mouse clicks.
+
+		Arguments:
+		duration	--	The duration of the item.
+
+		Returns:
+		True if playback should stop, False otherwise.
+		"""
+
+		stop = False
+		for event, t in events.get(self.experiment.clock):
+			if event.type == KEYDOWN:
+				if event.key == pygame.K_ESCAPE:
+					self.experiment.pause()
+				if duration == u"keypress":
+					stop = True
+			if event.type == MOUSEBUTTONDOWN and duration == u"mouseclick":
+				stop = True
+		return stop
 
 class qtvideo_player(video_player, qtautoplugin):
 
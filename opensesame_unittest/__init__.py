@@ -19,10 +19,18 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 import unittest
 from opensesame_unittest import backends, compilable, color, syntax, response, \
-	headless, translations
+	headless, translations, srbox, display_list, canvas_copy, prepare_workers, \
+	batched_drawing, style_keywords, event_buffer, clock, item_tracer, \
+	sampler_processing, sound_bank, synth, sampler_wait, video_player, \
+	frame_recorder, gc_scheduler, coroutines, joystick, mouse_trajectory, \
+	plugin_index, lazy_extensions, ui_cache, extension_events, startup_profiler
 
 for mod in (backends, compilable, color, syntax, response, headless, \
-	translations):
+	translations, srbox, display_list, canvas_copy, prepare_workers, \
+	batched_drawing, style_keywords, event_buffer, clock, item_tracer, \
+	sampler_processing, sound_bank, synth, sampler_wait, video_player, \
+	frame_recorder, gc_scheduler, coroutines, joystick, mouse_trajectory, \
+	plugin_index, lazy_extensions, ui_cache, extension_events, startup_profiler):
 	res = unittest.main(mod, exit=False)
 	if len(res.result.errors) > 0 or len(res.result.failures) > 0:
 		exit(1)
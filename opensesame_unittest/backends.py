@@ -124,7 +124,7 @@ class check_backend_argspec(unittest.TestCase):
 		self.checkBackendCategory(u'mouse', ['legacy', 'droid', 'xpyriment',
 			'psycho'])
 		self.checkBackendCategory(u'sampler', ['legacy'])
-		self.checkBackendCategory(u'clock', ['legacy', 'psycho'])
+		self.checkBackendCategory(u'clock', ['legacy', 'psycho', 'highres'])
 		self.checkBackendCategory(u'log', ['csv'])
 
 if __name__ == '__main__':
@@ -0,0 +1,125 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import random
+from libopensesame.experiment import experiment
+from openexp.canvas import canvas
+
+class check_batched_drawing(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether circles(), lines(), and polygons() draw (nearly) the
+		same as repeated calls to circle(), line(), and polygon().
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display.
+		"""
+
+		try:
+			import pygame
+			import numpy
+		except ImportError:
+			self.skipTest(u'pygame or numpy not available')
+		self.exp = experiment(string=
+			u'set canvas_backend legacy\nset uniform_coordinates yes\n')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_display()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display.
+		"""
+
+		self.exp.end()
+
+	def p_different(self, c1, c2):
+
+		"""
+		desc:
+			Determines the proportion of pixels that differ between two
+			canvases, relative to the pixels that have been drawn onto.
+
+		returns:
+			desc:	A proportion.
+			type:	float
+		"""
+
+		import pygame
+		a1 = pygame.surfarray.array2d(c1.surface)
+		a2 = pygame.surfarray.array2d(c2.surface)
+		bg = c1.surface.map_rgb(c1.background_color.backend_color)
+		drawn = ((a1 != bg) | (a2 != bg)).sum()
+		return float((a1 != a2).sum()) / drawn
+
+	def runTest(self):
+
+		"""
+		desc:
+			Draws random shapes with batched and single drawing functions.
+		"""
+
+		random.seed(0)
+		n = 100
+		xs = [random.randint(-600, 600) for i in range(n)]
+		ys = [random.randint(-400, 400) for i in range(n)]
+		rs = [random.randint(1, 40) for i in range(n)]
+		# circles() stamps disks, which cover nearly, but not exactly, the same
+		# pixels as pygame.draw.ellipse(). The differences are at the edges,
+		# and therefore relatively larger for outlines.
+		print(u'Checking filled circles')
+		c1 = canvas(self.exp, fill=True)
+		c1.circles(xs, ys, rs)
+		c2 = canvas(self.exp, fill=True)
+		for x, y, r in zip(xs, ys, rs):
+			c2.circle(x, y, r)
+		self.assertLess(self.p_different(c1, c2), .02)
+		print(u'Checking outlined, overlapping circles')
+		c1 = canvas(self.exp, penwidth=3)
+		c1.circles(xs, ys, 30)
+		c2 = canvas(self.exp, penwidth=3)
+		for x, y in zip(xs, ys):
+			c2.circle(x, y, 30)
+		self.assertLess(self.p_different(c1, c2), .08)
+		print(u'Checking lines')
+		c1 = canvas(self.exp, penwidth=2, color=u'green')
+		c1.lines(xs, ys, ys, xs)
+		c2 = canvas(self.exp, penwidth=2, color=u'green')
+		for sx, sy, ex, ey in zip(xs, ys, ys, xs):
+			c2.line(sx, sy, ex, ey)
+		self.assertEqual(self.p_different(c1, c2), 0)
+		print(u'Checking polygons')
+		vertices_list = [[(x, y), (x+r, y), (x, y+r)]
+			for x, y, r in zip(xs, ys, rs)]
+		c1 = canvas(self.exp, fill=True)
+		c1.polygons(vertices_list)
+		c2 = canvas(self.exp, fill=True)
+		for vertices in vertices_list:
+			c2.polygon(vertices)
+		self.assertEqual(self.p_different(c1, c2), 0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,113 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+from openexp.canvas import canvas
+
+class check_canvas_copy(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether copied canvases share their surface until one of them
+		is drawn onto.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		self.exp = experiment(string=
+			u'set canvas_backend legacy\nset uniform_coordinates yes\n')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_display()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display.
+		"""
+
+		self.exp.end()
+
+	def pixels(self, cnv):
+
+		"""
+		desc:
+			Gets the contents of a canvas without triggering a copy.
+
+		arguments:
+			cnv:
+				desc:	A canvas.
+				type:	canvas
+
+		returns:
+			desc:	The raw pixel data.
+			type:	bytes
+		"""
+
+		return cnv._surface.get_buffer().raw
+
+	def runTest(self):
+
+		"""
+		desc:
+			Copies canvases, and draws onto the copies and the originals.
+		"""
+
+		print(u'Checking canvas copy')
+		c1 = canvas(self.exp)
+		c1.fixdot()
+		before = self.pixels(c1)
+		c2 = canvas(self.exp)
+		c2.copy(c1)
+		self.assertIs(c1._surface, c2._surface)
+		print(u'Checking read-only access')
+		c2.show()
+		self.assertIs(c1._surface, c2._surface)
+		print(u'Checking drawing onto the copy')
+		c2.circle(0, 0, 100)
+		self.assertIsNot(c1._surface, c2._surface)
+		self.assertEqual(self.pixels(c1), before)
+		self.assertNotEqual(self.pixels(c2), before)
+		print(u'Checking drawing onto the original')
+		c3 = canvas(self.exp)
+		c3.copy(c1)
+		c1.circle(0, 0, 100)
+		self.assertEqual(self.pixels(c3), before)
+		self.assertEqual(self.pixels(c1), self.pixels(c2))
+		print(u'Checking configuration')
+		c1.color = u'red'
+		c4 = canvas(self.exp)
+		c4.copy(c1)
+		self.assertEqual(c4.color, c1.color)
+		c4.color = u'blue'
+		self.assertEqual(c1.color.hexcolor, u'#ff0000')
+
+if __name__ == '__main__':
+	unittest.main()
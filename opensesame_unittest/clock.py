@@ -0,0 +1,117 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+
+class check_clock(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks the resolution of the highres clock, and whether
+		clock.sleep_until() avoids the accumulation of timing errors.
+	"""
+
+	def clock(self, backend):
+
+		"""
+		desc:
+			Creates a clock.
+
+		arguments:
+			backend:
+				desc:	The name of a clock back-end.
+				type:	str
+
+		returns:
+			desc:	A clock object.
+			type:	clock
+		"""
+
+		exp = experiment()
+		exp.var.clock_backend = backend
+		exp.init_clock()
+		return exp.clock
+
+	def check_deadlines(self, clock, resolution, max_overshoot):
+
+		"""
+		desc:
+			Sleeps until a series of back-to-back deadlines, and checks how
+			much each deadline is overshot.
+
+		arguments:
+			clock:
+				desc:	A clock object.
+				type:	clock
+			resolution:
+				desc:	The resolution of the clock in milliseconds. Deadlines
+						can be undershot by this much, because they fall
+						between two ticks of the clock.
+				type:	float
+			max_overshoot:
+				desc:	The maximum median overshoot in milliseconds. Single
+						deadlines may be overshot more because of scheduling
+						delays, but never by a full period.
+				type:	float
+		"""
+
+		t0 = clock.time()
+		overshoots = []
+		for i in range(1, 21):
+			deadline = t0 + i * 10.3
+			clock.sleep_until(deadline)
+			overshoots.append(clock.time() - deadline)
+		overshoots.sort()
+		self.assertGreaterEqual(overshoots[0], -resolution)
+		self.assertLess(overshoots[len(overshoots) // 2], max_overshoot)
+		self.assertLess(overshoots[-1], 10.3)
+		# A deadline that has already passed returns right away
+		t1 = clock.time()
+		clock.sleep_until(t0)
+		self.assertLess(clock.time() - t1, 1)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Checks the highres and legacy clocks.
+		"""
+
+		print(u'Checking highres clock')
+		clock = self.clock(u'highres')
+		self.assertLess(clock.time(), 100)
+		timestamps = [clock.time() for i in range(100)]
+		self.assertEqual(timestamps, sorted(timestamps))
+		# Timestamps have sub-millisecond resolution
+		self.assertGreater(len(set(timestamps)), 1)
+		self.assertTrue(any(t != int(t) for t in timestamps))
+		self.check_deadlines(clock, 0, 1)
+		print(u'Checking legacy clock')
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		pygame.init()
+		# The legacy clock has a millisecond resolution, and sleeps are subject
+		# to scheduling delays. However, errors don't accumulate.
+		self.check_deadlines(self.clock(u'legacy'), 1, 5)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,198 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from libopensesame.experiment import experiment
+from libopensesame import plugins
+
+script = u'''
+set canvas_backend legacy
+set start main
+define sequence main
+	run define_gen always
+	run co always
+define inline_script define_gen
+	___prepare__
+	wakeups = []
+	def gen():
+		yield
+		while True:
+			wakeups.append(clock.time())
+			keep_going = yield clock.time() + 50
+			if not keep_going:
+				break
+	__end__
+	set _run ""
+define sketchpad s1
+	set duration 0
+	draw fixdot x=0 y=0
+define sketchpad s2
+	set duration 0
+	draw circle x=0 y=0 r=20
+define coroutines co
+	set duration 300
+	set function_name gen
+	run s2 start=100 end=100
+	run s1 start=0 end=0
+	run s2 start=200 end=200
+'''
+
+class dummy_coroutines(object):
+
+	"""
+	desc:
+		Stands in for the coroutines item, which tasks use only to log events.
+	"""
+
+	def __init__(self):
+
+		self.events = []
+
+	def event(self, msg):
+
+		self.events.append(msg)
+
+class check_coroutines(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether coroutines tasks declare their wakeup times, and whether
+		the trampoline sleeps until the next deadline instead of polling.
+	"""
+
+	def check_task(self, base_task):
+
+		"""
+		desc:
+			Checks how a task interprets the values that its coroutine yields.
+
+		arguments:
+			base_task:
+				desc:	The base_task class.
+				type:	type
+		"""
+
+		def gen():
+			yield
+			yield 1000
+			yield 1000.5
+			yield None
+			yield True
+			yield False
+
+		task = base_task(dummy_coroutines(), 0, 100)
+		task.coroutine = gen()
+		task.coroutine.send(None)
+		self.assertEqual(task.step(), task.ALIVE)
+		self.assertEqual(task.next_wakeup, 1000)
+		self.assertEqual(task.step(), task.ALIVE)
+		self.assertEqual(task.next_wakeup, 1000.5)
+		self.assertEqual(task.step(), task.ALIVE)
+		self.assertIsNone(task.next_wakeup)
+		# True is a bool, and not a timestamp
+		self.assertEqual(task.step(), task.ALIVE)
+		self.assertIsNone(task.next_wakeup)
+		self.assertEqual(task.step(), task.ABORT)
+		self.assertEqual(task.step(), task.DEAD)
+		self.assertEqual(task.step_count, 6)
+		self.assertTrue(task.step_statistics.startswith(u'6 steps'))
+		self.assertEqual(base_task(dummy_coroutines(), 0, 0).step_statistics,
+			u'no steps')
+
+	def check_invalid_times(self, base_task):
+
+		"""
+		desc:
+			Checks whether invalid start and end times are refused.
+
+		arguments:
+			base_task:
+				desc:	The base_task class.
+				type:	type
+		"""
+
+		from libopensesame.exceptions import osexception
+		for start_time, end_time in [(-1, 0), (100, 50), (u'0', 100)]:
+			self.assertRaises(osexception, base_task, dummy_coroutines(),
+				start_time, end_time)
+
+	def check_experiment(self):
+
+		"""
+		desc:
+			Runs a coroutines item with a generator function that asks to be
+			woken up every 50 ms, and sketchpads that are scheduled out of
+			order.
+		"""
+
+		folder = tempfile.mkdtemp()
+		try:
+			exp = experiment(string=script,
+				logfile=os.path.join(folder, u'subject-0.csv'))
+			exp.var.fullscreen = u'no'
+			exp.run()
+		finally:
+			shutil.rmtree(folder)
+		wakeups = exp.python_workspace._globals[u'wakeups']
+		self.assertGreaterEqual(len(wakeups), 5)
+		self.assertLessEqual(len(wakeups), 7)
+		for t1, t2 in zip(wakeups[:-1], wakeups[1:]):
+			self.assertGreaterEqual(t2 - t1, 45)
+		# Without sleeping, the trampoline would cycle thousands of times.
+		# With sleeping, there is about one cycle per deadline.
+		self.assertLess(exp.var.coroutines_cycles, 20)
+		self.assertGreaterEqual(exp.var.coroutines_duration, 300)
+		# The sketchpads are shown at their start times, even though they are
+		# not listed in order of start time.
+		shown = [t for t, msg in exp.items[u'co']._events
+			if msg.startswith(u'died')]
+		self.assertEqual(len(shown), 3)
+		for t1, t2 in zip(shown[:-1], shown[1:]):
+			self.assertGreaterEqual(t2 - t1, 95)
+			self.assertLess(t2 - t1, 150)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the coroutines test.
+		"""
+
+		try:
+			import pygame
+			# Like plugins.load_plugin(), add the plugin folder to the path,
+			# because coroutines has its own package.
+			sys.path.append(plugins.plugin_folder(u'coroutines'))
+			plugins.import_plugin(u'coroutines')
+			from oscoroutines._base_task import base_task
+		except Exception as e:
+			self.skipTest(u'coroutines not available: %s' % e)
+		print(u'Checking coroutine tasks')
+		self.check_task(base_task)
+		print(u'Checking start and end times')
+		self.check_invalid_times(base_task)
+		print(u'Checking coroutines experiment')
+		self.check_experiment()
+
+if __name__ == '__main__':
+	unittest.main()
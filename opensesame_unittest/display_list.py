@@ -0,0 +1,137 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+from openexp.canvas import canvas, display_list
+
+class check_display_list(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether partial redraws of a display list give the same result
+		as drawing everything from scratch.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		self.exp = experiment(string=
+			u'set canvas_backend legacy\nset uniform_coordinates yes\n')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_display()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display.
+		"""
+
+		self.exp.end()
+
+	def draw(self, dl, label):
+
+		"""
+		desc:
+			(Re)defines the elements of a display list.
+
+		arguments:
+			dl:
+				desc:	A display list.
+				type:	display_list
+			label:
+				desc:	The text of the label element.
+				type:	str
+		"""
+
+		with dl.element(u'fixdot', (-10, -10, 20, 20)):
+			dl.fixdot()
+		with dl.element(u'label', (-100, 50, 200, 50)):
+			dl.text(label, y=75)
+		with dl.element(u'box', (-200, -200, 100, 100)):
+			dl.rect(-190, -190, 80, 80, fill=True, color=u'red')
+
+	def assertSameAsFullRedraw(self, dl, label):
+
+		"""
+		desc:
+			Checks whether the display list looks like a canvas on which
+			everything is drawn from scratch.
+		"""
+
+		dl.flush()
+		ref = canvas(self.exp)
+		ref.fixdot()
+		ref.text(label, y=75)
+		ref.rect(-190, -190, 80, 80, fill=True, color=u'red')
+		self.assertEqual(dl.surface.get_buffer().raw,
+			ref.surface.get_buffer().raw)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Defines, changes, and removes elements.
+		"""
+
+		print(u'Checking display list')
+		dl = display_list(self.exp)
+		# The legacy back-end redraws only the dirty parts of its surface
+		self.assertEqual(dl._flush_func, dl._flush_surface)
+		self.draw(dl, u'first')
+		self.assertEqual(dl.dirty, [u'fixdot', u'label', u'box'])
+		self.assertSameAsFullRedraw(dl, u'first')
+		self.assertEqual(dl.dirty, [])
+		print(u'Checking identical elements')
+		self.draw(dl, u'first')
+		self.assertEqual(dl.dirty, [])
+		print(u'Checking changed elements')
+		self.draw(dl, u'second')
+		self.assertEqual(dl.dirty, [u'label'])
+		self.assertSameAsFullRedraw(dl, u'second')
+		print(u'Checking style changes')
+		dl.color = u'blue'
+		self.draw(dl, u'second')
+		# The style is recorded with each drawing operation, also when it is
+		# overridden by a keyword
+		self.assertEqual(dl.dirty, [u'fixdot', u'label', u'box'])
+		dl.color = u'white'
+		self.draw(dl, u'second')
+		self.assertSameAsFullRedraw(dl, u'second')
+		print(u'Checking removed elements')
+		dl.remove(u'box')
+		self.assertEqual(dl.dirty, [])
+		dl.flush()
+		ref = canvas(self.exp)
+		ref.fixdot()
+		ref.text(u'second', y=75)
+		self.assertEqual(dl.surface.get_buffer().raw,
+			ref.surface.get_buffer().raw)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,134 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import time
+import threading
+from libopensesame.experiment import experiment
+from openexp.keyboard import keyboard
+
+# The CPU time of the process. time.clock() is deprecated in Python 3.
+cpu_time = getattr(time, u'process_time', None) or time.clock
+
+class check_event_buffer(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the legacy keyboard and mouse back-ends wait for input
+		without busy polling, and timestamp events when they arrive.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		from openexp._events import legacy as events
+		self.events = events
+		self.exp = experiment(string=u'set canvas_backend legacy\n')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_display()
+		events.flush()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display.
+		"""
+
+		self.exp.end()
+
+	def post_key(self, key, unicode, delay=0):
+
+		"""
+		desc:
+			Posts a key press to the PyGame event queue, optionally from
+			another thread after a delay.
+
+		arguments:
+			key:
+				desc:	A PyGame key code.
+				type:	int
+			unicode:
+				desc:	The character of the key.
+				type:	str
+
+		keywords:
+			delay:
+				desc:	A delay in seconds.
+				type:	float
+		"""
+
+		import pygame
+		if delay:
+			threading.Timer(delay, self.post_key, [key, unicode]).start()
+			return
+		pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key,
+			unicode=unicode, mod=0))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Waits for timeouts and key presses.
+		"""
+
+		import pygame
+		kb = keyboard(self.exp, timeout=200)
+		print(u'Checking timeout without busy polling')
+		t0 = time.time()
+		c0 = cpu_time()
+		key, t = kb.get_key()
+		c1 = cpu_time()
+		self.assertIsNone(key)
+		self.assertGreaterEqual(time.time() - t0, .19)
+		self.assertLess(c1 - c0, .1)
+		print(u'Checking timestamp of a key press')
+		t0 = self.exp.clock.time()
+		self.post_key(pygame.K_a, u'a', delay=.1)
+		key, t = kb.get_key(timeout=1000)
+		self.assertEqual(key, u'a')
+		self.assertGreaterEqual(t - t0, 90)
+		self.assertLess(t - t0, 150)
+		print(u'Checking buffered events')
+		for key, unicode in [(pygame.K_x, u'x'), (pygame.K_b, u'b'),
+			(pygame.K_c, u'c')]:
+			self.post_key(key, unicode)
+		key, t = kb.get_key(keylist=[u'b', u'c'], timeout=0)
+		self.assertEqual(key, u'b')
+		# The event after the accepted key remains in the buffer
+		key, t = kb.get_key(timeout=0)
+		self.assertEqual(key, u'c')
+		print(u'Checking flush')
+		self.post_key(pygame.K_a, u'a')
+		self.events.pump(self.exp.clock)
+		self.assertTrue(kb.flush())
+		key, t = kb.get_key(timeout=0)
+		self.assertIsNone(key)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,216 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import time
+
+class dummy_extension(object):
+
+	"""
+	desc:
+		Stands in for an extension that takes a fixed time to handle events.
+	"""
+
+	def __init__(self, name, duration=0, fail=False):
+
+		self._name = name
+		self.duration = duration
+		self.fail = fail
+		self.registered = 0
+
+	def name(self):
+
+		return self._name
+
+	def register_ui_files(self):
+
+		self.registered += 1
+
+	def fire(self, event, **kwdict):
+
+		time.sleep(self.duration)
+		if self.fail:
+			raise Exception(u'Extension failed')
+
+class dummy_main_window(object):
+
+	"""
+	desc:
+		Stands in for the main window, which the extension manager only uses
+		to report misbehaving extensions.
+	"""
+
+	def __init__(self):
+
+		self.experiment = self
+		self.console = self
+		self.notifications = []
+		self.written = []
+
+	def notify(self, msg):
+
+		self.notifications.append(msg)
+
+	def write(self, msg):
+
+		self.written.append(msg)
+
+class check_extension_events(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the .ui files of extension folders are only collected
+		again when a folder changes, and whether the extension manager times
+		how long each extension takes to handle each event.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Imports the extension modules.
+		"""
+
+		os.environ.setdefault(u'QT_QPA_PLATFORM', u'offscreen')
+		try:
+			from libqtopensesame.extensions import _base_extension
+			from libqtopensesame.extensions import extension_manager
+		except Exception as e:
+			self.skipTest(u'libqtopensesame not available: %s' % e)
+		self._base_extension = _base_extension
+		self.extension_manager = extension_manager
+
+	def touch(self, path, offset):
+
+		"""
+		desc:
+			Changes the modification time of a path, so that the test doesn't
+			depend on the resolution of the file system's timestamps.
+		"""
+
+		mtime = os.stat(path).st_mtime + offset
+		os.utime(path, (mtime, mtime))
+
+	def check_ui_files(self):
+
+		"""
+		desc:
+			Checks whether .ui files are collected once per folder, and again
+			when the folder changes.
+		"""
+
+		folder = tempfile.mkdtemp()
+		try:
+			for path in (u'first.ui', u'readme.txt'):
+				with open(os.path.join(folder, path), u'w') as fd:
+					fd.write(u'\n')
+			resources = self._base_extension.ui_files(u'test', folder)
+			self.assertEqual(resources, {
+				u'extensions.test.first' : os.path.join(folder, u'first.ui')
+				})
+			self.assertIs(self._base_extension.ui_files(u'test', folder),
+				resources)
+			mtime = os.path.getmtime(folder)
+			with open(os.path.join(folder, u'second.ui'), u'w') as fd:
+				fd.write(u'\n')
+			# The folder is not listed again until its modification time
+			# changes
+			os.utime(folder, (mtime, mtime))
+			self.assertIs(self._base_extension.ui_files(u'test', folder),
+				resources)
+			self.touch(folder, 10)
+			resources = self._base_extension.ui_files(u'test', folder)
+			self.assertEqual(sorted(resources), [u'extensions.test.first',
+				u'extensions.test.second'])
+		finally:
+			self._base_extension._ui_files.pop(folder, None)
+			shutil.rmtree(folder)
+
+	def check_event_timing(self):
+
+		"""
+		desc:
+			Fires events to a slow, a fast, and a failing extension, and checks
+			the timing statistics.
+		"""
+
+		# The constructor loads all installed extensions, so the manager is
+		# set up by hand.
+		manager = self.extension_manager.__new__(self.extension_manager)
+		manager.main_window = dummy_main_window()
+		slow = dummy_extension(u'slow', duration=.05)
+		fast = dummy_extension(u'fast')
+		failing = dummy_extension(u'failing', fail=True)
+		manager._extensions = [slow, fast, failing]
+		manager.events = {
+			u'open_experiment' : [slow, fast, failing],
+			u'startup' : [fast]
+			}
+		manager.event_timing = {}
+		manager._suspended = False
+		manager._suspended_until = None
+		manager.fire(u'startup')
+		manager.fire(u'open_experiment')
+		manager.fire(u'open_experiment')
+		# Resources are registered, and timed, for all extensions on
+		# open_experiment
+		self.assertEqual([ext.registered for ext in manager._extensions],
+			[2, 2, 2])
+		for ext in manager._extensions:
+			self.assertEqual(manager.event_timing[
+				(ext.name(), u'register_ui_files')][0], 2)
+		count, total, longest = manager.event_timing[
+			(u'slow', u'open_experiment')]
+		self.assertEqual(count, 2)
+		self.assertGreaterEqual(total, 95)
+		self.assertGreaterEqual(longest, 47.5)
+		self.assertLessEqual(longest, total)
+		self.assertEqual(manager.event_timing[(u'fast', u'startup')][0], 1)
+		# A failing extension is reported, and still timed
+		self.assertEqual(len(manager.main_window.notifications), 2)
+		self.assertEqual(
+			manager.event_timing[(u'failing', u'open_experiment')][0], 2)
+		summary = manager.timing_summary()
+		self.assertEqual(len(summary), 7)
+		self.assertEqual(summary[0][:3], (u'slow', u'open_experiment', 2))
+		totals = [row[3] for row in summary]
+		self.assertEqual(totals, sorted(totals, reverse=True))
+		# Suspended events are not timed
+		manager.suspend()
+		manager.fire(u'startup')
+		manager.resume()
+		self.assertEqual(manager.event_timing[(u'fast', u'startup')][0], 1)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the extension-events test.
+		"""
+
+		print(u'Checking ui files')
+		self.check_ui_files()
+		print(u'Checking event timing')
+		self.check_event_timing()
+
+if __name__ == '__main__':
+	unittest.main()
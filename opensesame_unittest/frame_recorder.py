@@ -0,0 +1,152 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from libopensesame.experiment import experiment
+from libopensesame import frame_recorder, plugins
+
+script = u'''
+set canvas_backend legacy
+set save_flip_timestamps yes
+set start co
+define sketchpad s1
+	set duration 0
+	draw fixdot x=0 y=0
+define sketchpad s2
+	set duration 0
+	draw circle x=0 y=0 r=20
+define coroutines co
+	set duration 200
+	run s1 start=0 end=0
+	run s2 start=50 end=50
+	run s1 start=100 end=100
+	run s2 start=150 end=150
+'''
+
+class check_frame_recorder(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether display flips are recorded and summarized, and whether
+		the timestamps are saved next to the log file.
+	"""
+
+	def check_recorder(self):
+
+		"""
+		desc:
+			Checks nested recordings and the capacity of the recorder.
+		"""
+
+		recorder = frame_recorder.frame_recorder(capacity=5)
+		self.assertEqual(recorder.record(1), 1)
+		outer = recorder.start()
+		recorder.record(2)
+		inner = recorder.start()
+		recorder.record(3)
+		recorder.record(4)
+		self.assertEqual(recorder.stop(inner), [3, 4])
+		recorder.record(5)
+		recorder.record(6)
+		recorder.record(7)
+		# The outer recording contains the inner recording, and flips that
+		# don't fit are discarded
+		self.assertEqual(recorder.stop(outer), [2, 3, 4, 5, 6])
+		self.assertFalse(recorder.recording)
+		recorder.record(8)
+		handle = recorder.start()
+		self.assertEqual(recorder.stop(handle), [])
+
+	def check_summary(self):
+
+		"""
+		desc:
+			Checks the summary of a series of flips.
+		"""
+
+		summary = frame_recorder.summarize([0, 10, 20, 40, 50], 10)
+		self.assertEqual(summary[u'count'], 5)
+		self.assertEqual(summary[u'mean_interval'], 12.5)
+		self.assertEqual(summary[u'max_jitter'], 10)
+		self.assertEqual(summary[u'dropped'], 1)
+		# Without an intended interval, the median interval is used
+		summary = frame_recorder.summarize([0, 16, 33, 50, 83])
+		self.assertEqual(summary[u'max_jitter'], 16)
+		self.assertEqual(summary[u'dropped'], 1)
+		summary = frame_recorder.summarize([0])
+		self.assertEqual(summary[u'count'], 1)
+		self.assertIsNone(summary[u'mean_interval'])
+
+	def check_experiment(self):
+
+		"""
+		desc:
+			Runs a coroutines item, and checks the logged summary and the
+			saved timestamps.
+		"""
+
+		try:
+			import pygame
+			# Like plugins.load_plugin(), add the plugin folder to the path,
+			# because coroutines has its own package.
+			sys.path.append(plugins.plugin_folder(u'coroutines'))
+			plugins.import_plugin(u'coroutines')
+		except Exception as e:
+			print(u'coroutines not available: %s' % e)
+			return
+		folder = tempfile.mkdtemp()
+		try:
+			logfile = os.path.join(folder, u'subject-0.csv')
+			exp = experiment(string=script, logfile=logfile)
+			exp.var.fullscreen = u'no'
+			exp.run()
+			self.assertEqual(exp.var.flip_count_co, 4)
+			self.assertGreaterEqual(exp.var.flip_mean_interval_co, 45)
+			with open(os.path.join(folder, u'subject-0.co.flips'),
+				u'rb') as fd:
+				data = fd.read()
+		finally:
+			shutil.rmtree(folder)
+		n, = struct.unpack(u'<I', data[:4])
+		self.assertEqual(n, 4)
+		self.assertEqual(len(data), 4 + 8 * n)
+		timestamps = struct.unpack(u'<%dd' % n, data[4:])
+		self.assertEqual(list(timestamps), sorted(timestamps))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the frame recorder test.
+		"""
+
+		print(u'Checking frame recorder')
+		self.check_recorder()
+		print(u'Checking flip summary')
+		self.check_summary()
+		print(u'Checking recorded experiment')
+		self.check_experiment()
+
+if __name__ == '__main__':
+	unittest.main()
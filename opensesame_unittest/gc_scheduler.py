@@ -0,0 +1,127 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import gc
+import os
+import shutil
+import tempfile
+from libopensesame.exceptions import osexception
+from libopensesame.experiment import experiment
+from libopensesame.gc_scheduler import gc_scheduler
+
+script = u'''
+set canvas_backend legacy
+set gc_mode %s
+set gc_boundaries "block; not_a_sequence"
+set start block
+define sequence block
+	run trial always
+	run trial always
+	run trial always
+define sequence trial
+	run s always
+define sketchpad s
+	set duration 0
+	draw fixdot x=0 y=0
+'''
+
+class check_gc_scheduler(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether garbage is collected after the right sequences in each
+		garbage-collection mode.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a temporary folder for the log file.
+		"""
+
+		self.folder = tempfile.mkdtemp()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the temporary folder, and makes sure that automatic
+			garbage collection is enabled again.
+		"""
+
+		shutil.rmtree(self.folder)
+		gc.enable()
+
+	def run_experiment(self, mode):
+
+		"""
+		desc:
+			Runs an experiment with a block sequence of three trial sequences.
+
+		arguments:
+			mode:
+				desc:	The garbage-collection mode.
+				type:	str
+
+		returns:
+			desc:	The number of collections.
+			type:	int
+		"""
+
+		exp = experiment(string=script % mode,
+			logfile=os.path.join(self.folder, u'subject-0.csv'))
+		exp.var.fullscreen = u'no'
+		exp.run()
+		self.assertTrue(gc.isenabled())
+		return exp.var.get(u'gc_count', 0)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Checks the scheduler, and runs an experiment in each mode.
+		"""
+
+		print(u'Checking garbage-collection scheduler')
+		scheduler = gc_scheduler()
+		with self.assertRaises(osexception):
+			scheduler.configure(mode=u'sometimes')
+		scheduler.configure(mode=u'young')
+		self.assertEqual(scheduler.generation(u'trial'), 0)
+		scheduler.configure(mode=u'boundary', boundaries=[u'block'])
+		self.assertEqual(scheduler.generation(u'block'), 2)
+		self.assertIsNone(scheduler.generation(u'trial'))
+		scheduler.configure(mode=u'threshold', threshold=0)
+		self.assertEqual(scheduler.generation(u'trial'), 2)
+		scheduler.configure(mode=u'threshold', threshold=10**9)
+		self.assertIsNone(scheduler.generation(u'trial'))
+		print(u'Checking garbage collection during experiments')
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		# Three trial sequences and one block sequence
+		self.assertEqual(self.run_experiment(u'full'), 4)
+		self.assertEqual(self.run_experiment(u'young'), 4)
+		self.assertEqual(self.run_experiment(u'boundary'), 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,115 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from libopensesame.experiment import experiment
+from libopensesame.item_tracer import item_tracer, item_tracer_singleton
+
+script = u'''
+set canvas_backend legacy
+set trace_items yes
+set start seq
+define sequence seq
+	run s1 always
+	run s2 always
+define sketchpad s1
+	set duration 0
+	draw fixdot x=0 y=0
+define sketchpad s2
+	set duration 0
+	draw circle x=0 y=0 r=50
+'''
+
+class check_item_tracer(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the item tracer records prepare and run phases, and
+		saves them in the Chrome trace-event format.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a temporary folder for the log file.
+		"""
+
+		self.folder = tempfile.mkdtemp()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the temporary folder.
+		"""
+
+		shutil.rmtree(self.folder)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Checks the ring buffer, and traces an experiment.
+		"""
+
+		print(u'Checking disabled tracer')
+		tracer = item_tracer()
+		self.assertIsNone(tracer.start())
+		self.assertIsNone(tracer.stop(u'item', u'run', None, 0))
+		print(u'Checking ring buffer')
+		tracer.enable(capacity=3)
+		for i in range(5):
+			tracer.stop(u'item%d' % i, u'run', tracer.start(), 0)
+		self.assertEqual([r[0] for r in tracer.records],
+			[u'item2', u'item3', u'item4'])
+		for item, phase, start, end, depth in tracer.records:
+			self.assertLessEqual(start, end)
+		print(u'Checking experiment trace')
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		logfile = os.path.join(self.folder, u'subject-0.csv')
+		exp = experiment(string=script, logfile=logfile)
+		exp.var.fullscreen = u'no'
+		exp.run()
+		self.assertFalse(item_tracer_singleton.enabled)
+		for phase in (u'prepare', u'run'):
+			for item in (u'seq', u's1', u's2'):
+				self.assertGreaterEqual(
+					exp.var.get(u'%s_duration_%s' % (phase, item)), 0)
+		with open(os.path.join(self.folder, u'subject-0.trace.json')) as fd:
+			trace = json.load(fd)
+		events = dict(((event[u'name'], event[u'cat']), event)
+			for event in trace[u'traceEvents'])
+		self.assertIn((u's1', u'prepare'), events)
+		# Sketchpads are nested in the sequence
+		seq = events[(u'seq', u'run')]
+		s1 = events[(u's1', u'run')]
+		self.assertGreater(s1[u'args'][u'depth'], seq[u'args'][u'depth'])
+		self.assertGreaterEqual(s1[u'ts'], seq[u'ts'])
+		self.assertLessEqual(s1[u'ts'] + s1[u'dur'], seq[u'ts'] + seq[u'dur'])
+
+if __name__ == '__main__':
+	unittest.main()
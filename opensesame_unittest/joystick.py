@@ -0,0 +1,282 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import sys
+import time
+import threading
+from libopensesame.experiment import experiment
+from libopensesame import plugins
+
+# The CPU time of the process. time.clock() is deprecated in Python 3.
+cpu_time = getattr(time, u'process_time', None) or time.clock
+
+class dummy_joystick(object):
+
+	"""
+	desc:
+		Stands in for a PyGame joystick, so that the test doesn't need a
+		device.
+	"""
+
+	def __init__(self):
+
+		self.axes = [0., 0.]
+		self.buttons = [0, 0, 0]
+		self.hats = [(0, 0)]
+		self.balls = [(0, 0)]
+
+	def init(self):
+
+		pass
+
+	def get_numaxes(self):
+
+		return len(self.axes)
+
+	def get_numbuttons(self):
+
+		return len(self.buttons)
+
+	def get_numhats(self):
+
+		return len(self.hats)
+
+	def get_numballs(self):
+
+		return len(self.balls)
+
+	def get_axis(self, i):
+
+		return self.axes[i]
+
+	def get_button(self, i):
+
+		return self.buttons[i]
+
+	def get_hat(self, i):
+
+		return self.hats[i]
+
+	def get_ball(self, i):
+
+		return self.balls[i]
+
+class check_joystick(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the legacy joystick samples at a fixed rate into a ring
+		buffer, records traces, and waits for events without busy polling.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display, and a legacy joystick
+			for a dummy device.
+		"""
+
+		try:
+			import pygame
+			sys.path.append(plugins.plugin_folder(u'joystick'))
+			from _libjoystick import legacy
+		except Exception as e:
+			self.skipTest(u'joystick not available: %s' % e)
+		self.legacy = legacy
+		self.exp = experiment(string=u'set canvas_backend legacy\n')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_display()
+		legacy.events.flush()
+		self.dummy = dummy_joystick()
+		# The constructor opens a device with pygame.joystick.Joystick()
+		Joystick = pygame.joystick.Joystick
+		pygame.joystick.Joystick = lambda device: self.dummy
+		try:
+			self.js = legacy.legacy(self.exp)
+		finally:
+			pygame.joystick.Joystick = Joystick
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display, which also stops sampling.
+		"""
+
+		self.exp.end()
+
+	def post_event(self, eventtype, delay=0, **kwargs):
+
+		"""
+		desc:
+			Posts a joystick event to the PyGame event queue, optionally from
+			another thread after a delay.
+
+		arguments:
+			eventtype:
+				desc:	A PyGame event type.
+				type:	int
+
+		keywords:
+			delay:
+				desc:	A delay in seconds.
+				type:	float
+		"""
+
+		import pygame
+		if delay:
+			threading.Timer(delay, self.post_event, [eventtype],
+				kwargs).start()
+			return
+		pygame.event.post(pygame.event.Event(eventtype, joy=0, instance_id=0,
+			**kwargs))
+
+	def check_sampler(self):
+
+		"""
+		desc:
+			Samples at 500 Hz, and checks the number of samples, the sampling
+			intervals, the CPU time, and the ring buffer.
+		"""
+
+		sampler = self.legacy.joystick_sampler(self.dummy, self.exp.clock,
+			rate=500, capacity=1000)
+		c0 = cpu_time()
+		sampler.start()
+		time.sleep(.2)
+		sampler.stop()
+		c1 = cpu_time()
+		samples = sampler.get_samples()
+		self.assertGreaterEqual(len(samples), 80)
+		self.assertLessEqual(len(samples), 110)
+		self.assertLess(c1 - c0, .1)
+		timestamps = [sample[0] for sample in samples]
+		self.assertEqual(timestamps, sorted(timestamps))
+		mean_interval = (timestamps[-1] - timestamps[0]) / (len(samples) - 1)
+		self.assertGreaterEqual(mean_interval, 1.8)
+		self.assertLess(mean_interval, 2.5)
+		t, axes, buttons, hats = samples[0]
+		self.assertEqual(axes, (0., 0.))
+		self.assertEqual(buttons, (0, 0, 0))
+		self.assertEqual(hats, ((0, 0),))
+		# Only the most recent samples are kept
+		sampler = self.legacy.joystick_sampler(self.dummy, self.exp.clock,
+			rate=500, capacity=10)
+		sampler.start()
+		time.sleep(.1)
+		sampler.stop()
+		self.assertGreater(sampler.index, 10)
+		samples = sampler.get_samples()
+		self.assertEqual(len(samples), 10)
+		self.assertEqual(samples, sampler.samples[sampler.index % 10:] +
+			sampler.samples[:sampler.index % 10])
+		self.assertEqual(sampler.get_samples(sampler.index - 3), samples[-3:])
+
+	def check_trace(self):
+
+		"""
+		desc:
+			Records a trace while the axes move, and checks whether sampling
+			stops when the experiment ends.
+		"""
+
+		self.dummy.axes = [0., 0.]
+		trace = self.js.start_trace()
+		sampler = self.js._sampler
+		self.assertIsNotNone(sampler)
+		self.assertIn(self.js.stop_sampling, self.exp.cleanup_functions)
+		# Starting again with the same settings keeps the running sampler
+		self.js.start_sampling()
+		self.assertIs(self.js._sampler, sampler)
+		time.sleep(.05)
+		self.dummy.axes = [.5, -.5]
+		time.sleep(.05)
+		samples = self.js.stop_trace(trace)
+		self.assertGreaterEqual(len(samples), 40)
+		self.assertEqual(samples[0][1], (0., 0.))
+		self.assertEqual(samples[-1][1], (.5, -.5))
+		self.assertGreaterEqual(len(self.js.get_samples()), len(samples))
+		self.exp.end()
+		self.assertIsNone(self.js._sampler)
+		self.assertFalse(sampler.is_alive())
+		self.assertEqual(self.js.get_samples(), [])
+
+	def check_events(self):
+
+		"""
+		desc:
+			Waits for joystick events, and checks their timestamps.
+		"""
+
+		import pygame
+		print(u'Checking timeout without busy polling')
+		t0 = time.time()
+		c0 = cpu_time()
+		button, t = self.js.get_joybutton(timeout=200)
+		c1 = cpu_time()
+		self.assertIsNone(button)
+		self.assertGreaterEqual(time.time() - t0, .19)
+		self.assertLess(c1 - c0, .1)
+		print(u'Checking timestamp of a button press')
+		t0 = self.exp.clock.time()
+		self.post_event(pygame.JOYBUTTONDOWN, delay=.1, button=1)
+		button, t = self.js.get_joybutton(timeout=1000)
+		self.assertEqual(button, 2)
+		self.assertGreaterEqual(t - t0, 90)
+		self.assertLess(t - t0, 150)
+		print(u'Checking button list')
+		self.post_event(pygame.JOYBUTTONDOWN, button=1)
+		self.post_event(pygame.JOYBUTTONDOWN, button=2)
+		button, t = self.js.get_joybutton(joybuttonlist=[3], timeout=0)
+		self.assertEqual(button, 3)
+		print(u'Checking axis motion')
+		self.dummy.axes = [1., 0.]
+		self.post_event(pygame.JOYAXISMOTION, axis=0, value=1.)
+		axes, t = self.js.get_joyaxes(timeout=0)
+		self.assertEqual(axes, [1., 0.])
+		print(u'Checking joystick input')
+		self.dummy.hats = [(1, 0)]
+		self.post_event(pygame.JOYHATMOTION, hat=0, value=(1, 0))
+		inputtype, value, t = self.js.get_joyinput(timeout=0)
+		self.assertEqual(inputtype, u'joyhatmotion')
+		self.assertEqual(value, [(1, 0)])
+		print(u'Checking flush')
+		self.post_event(pygame.JOYBUTTONDOWN, button=0)
+		self.assertTrue(self.js.flush())
+		inputtype, value, t = self.js.get_joyinput(timeout=0)
+		self.assertIsNone(inputtype)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the joystick test.
+		"""
+
+		print(u'Checking joystick sampler')
+		self.check_sampler()
+		self.check_events()
+		print(u'Checking joystick trace')
+		self.check_trace()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,241 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from libopensesame import plugins
+
+# The source of the test extensions. Each extension keeps track of the events
+# that it receives.
+extension_src = u'''
+from libqtopensesame.extensions import base_extension
+
+events = []
+
+class %s(base_extension):
+
+	def event_startup(self):
+
+		events.append(u'startup')
+
+	def event_open_experiment(self, path):
+
+		events.append(u'open_experiment')
+
+	def activate(self):
+
+		events.append(u'activate')
+'''
+
+extensions = {
+	u'eager_test' : u'label: Eager test\n',
+	u'lazy_test' : u'label: Lazy test\nlazy: true\n'
+		u'events: [open_experiment]\nsettings:\n  lazy_test_setting: 1\n',
+	u'lazy_action_test' : u'label: Lazy action test\nlazy: true\n',
+	u'lazy_broken_test' : u'label: Lazy broken test\nlazy: true\n'
+		u'events: [open_experiment]\n',
+	}
+
+class check_lazy_extensions(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether extensions with `lazy: true` are only imported when
+		they are activated, receive one of their events, or are retrieved
+		from the extension manager.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a folder with test extensions, and a minimal main window.
+		"""
+
+		os.environ.setdefault(u'QT_QPA_PLATFORM', u'offscreen')
+		try:
+			from qtpy import QtWidgets, QtGui
+			from libqtopensesame.extensions import extension_manager
+			from libqtopensesame.extensions._lazy_extension import \
+				lazy_extension
+			from libqtopensesame.qtopensesame import qtopensesame
+		except Exception as e:
+			self.skipTest(u'libqtopensesame not available: %s' % e)
+		self.extension_manager = extension_manager
+		self.lazy_extension = lazy_extension
+		self.app = QtWidgets.QApplication.instance() or \
+			QtWidgets.QApplication([])
+		self.folder = tempfile.mkdtemp()
+		for ext_name, info in extensions.items():
+			path = os.path.join(self.folder, ext_name)
+			os.mkdir(path)
+			src = extension_src % ext_name
+			if ext_name == u'lazy_broken_test':
+				src += u'\nraise Exception(u"broken")\n'
+			with open(os.path.join(path, u'%s.py' % ext_name), u'w') as fd:
+				fd.write(src)
+			with open(os.path.join(path, u'info.yaml'), u'w') as fd:
+				fd.write(info)
+		self._extension_path = os.environ.get(u'OPENSESAME_EXTENSION_PATH',
+			None)
+		os.environ[u'OPENSESAME_EXTENSION_PATH'] = self.folder
+		# Only load the test extensions
+		self._plugin_dict = plugins._plugin_dict.pop(u'extensions', None)
+		plugins._plugin_dict[u'extensions'] = sorted(extensions)
+
+		class dummy_theme(object):
+
+			def apply_theme(self, component):
+
+				pass
+
+			def qicon(self, icon):
+
+				return QtGui.QIcon()
+
+		class dummy_ui(object):
+
+			def __init__(self, main_window):
+
+				self.console = self
+				self.toolbar_main = QtWidgets.QToolBar()
+				self.written = []
+
+			def write(self, msg):
+
+				self.written.append(msg)
+
+		class dummy_experiment(object):
+
+			def __init__(self):
+
+				self.resources = {}
+				self.notifications = []
+
+			def notify(self, msg):
+
+				self.notifications.append(msg)
+
+		# Components only accept a qtopensesame object as main window, but
+		# the main window itself is not initialized.
+		class dummy_main_window(qtopensesame):
+
+			def __init__(self):
+
+				QtWidgets.QMainWindow.__init__(self)
+				self.theme = dummy_theme()
+				self.ui = dummy_ui(self)
+				self.console = self.ui
+				self.experiment = dummy_experiment()
+
+			def set_busy(self, state=True):
+
+				pass
+
+		self.main_window = dummy_main_window()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the test extensions, and restores the extension list.
+		"""
+
+		plugins._plugin_dict.pop(u'extensions', None)
+		if self._plugin_dict is not None:
+			plugins._plugin_dict[u'extensions'] = self._plugin_dict
+		if self._extension_path is None:
+			del os.environ[u'OPENSESAME_EXTENSION_PATH']
+		else:
+			os.environ[u'OPENSESAME_EXTENSION_PATH'] = self._extension_path
+		for ext_name in extensions:
+			sys.modules.pop(ext_name, None)
+			plugins._folders.pop(ext_name, None)
+			plugins._properties.pop(ext_name, None)
+		index_path = plugins._index_path(self.folder)
+		if index_path is not None and os.path.exists(index_path):
+			os.remove(index_path)
+		plugins._indexes.pop(self.folder, None)
+		shutil.rmtree(self.folder)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the lazy-extension test.
+		"""
+
+		print(u'Checking startup')
+		manager = self.extension_manager(self.main_window)
+		self.main_window.extension_manager = manager
+		ext = dict((ext.name(), ext) for ext in manager._extensions)
+		self.assertEqual(sorted(ext), sorted(extensions))
+		self.assertNotIsInstance(ext[u'eager_test'], self.lazy_extension)
+		self.assertIn(u'eager_test', sys.modules)
+		for ext_name in (u'lazy_test', u'lazy_action_test',
+			u'lazy_broken_test'):
+			self.assertIsInstance(ext[ext_name], self.lazy_extension)
+			self.assertFalse(ext[ext_name].loaded)
+			self.assertNotIn(ext_name, sys.modules)
+		# The stand-in registers the action and settings from the info file
+		lazy = ext[u'lazy_test']
+		self.assertEqual(lazy.action.text(), u'Lazy test')
+		from libqtopensesame.misc.config import cfg
+		self.assertEqual(cfg.lazy_test_setting, 1)
+		self.assertEqual(manager.events[u'open_experiment'],
+			[ext[u'eager_test'], ext[u'lazy_broken_test'], lazy])
+		manager.fire(u'startup')
+		self.assertEqual(sys.modules[u'eager_test'].events, [u'startup'])
+		self.assertFalse(lazy.loaded)
+		print(u'Checking loading on event')
+		manager.fire(u'open_experiment', path=u'')
+		self.assertTrue(lazy.loaded)
+		real = lazy.extension()
+		self.assertNotIsInstance(real, self.lazy_extension)
+		self.assertIs(real.action, lazy.action)
+		# The extension receives the startup event when it is loaded
+		self.assertEqual(sys.modules[u'lazy_test'].events,
+			[u'startup', u'open_experiment'])
+		self.assertIn(lazy, manager.events[u'startup'])
+		manager.fire(u'startup')
+		self.assertEqual(sys.modules[u'lazy_test'].events,
+			[u'startup', u'open_experiment', u'startup'])
+		self.assertIs(manager[u'lazy_test'], real)
+		print(u'Checking broken extension')
+		broken = ext[u'lazy_broken_test']
+		self.assertFalse(broken.loaded)
+		self.assertEqual(len(self.main_window.experiment.notifications), 1)
+		# A broken extension no longer receives events
+		self.assertNotIn(broken, manager.events[u'open_experiment'])
+		manager.fire(u'open_experiment', path=u'')
+		self.assertEqual(len(self.main_window.experiment.notifications), 1)
+		print(u'Checking loading on activation')
+		lazy_action = ext[u'lazy_action_test']
+		lazy_action.action.trigger()
+		self.assertTrue(lazy_action.loaded)
+		self.assertEqual(sys.modules[u'lazy_action_test'].events,
+			[u'startup', u'activate'])
+		print(u'Checking loading on retrieval')
+		self.assertIs(manager[u'lazy_action_test'], lazy_action.extension())
+
+if __name__ == '__main__':
+	unittest.main()
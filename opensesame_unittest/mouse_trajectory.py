@@ -0,0 +1,160 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+
+script = u'''
+set canvas_backend legacy
+set mouse_trajectory yes
+set mouse_trajectory_rate 100
+set start mr
+define mouse_response mr
+	set timeout 50
+	set duration mouseclick
+'''
+
+class check_mouse_trajectory(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks the sampling and summary of mouse trajectories, and whether a
+		mouse_response item records a trajectory on every trial.
+	"""
+
+	def check_sampling(self, trajectory):
+
+		"""
+		desc:
+			Checks the sampling schedule, the button bitmasks, and the
+			capacity of a trajectory.
+
+		arguments:
+			trajectory:
+				desc:	The trajectory class.
+				type:	type
+		"""
+
+		traj = trajectory(rate=100, capacity=4)
+		self.assertTrue(traj.due(0))
+		traj.add(0, (0, 0), (1, 0, 1))
+		self.assertFalse(traj.due(5))
+		self.assertTrue(traj.due(10))
+		traj.add(10, (1, 1), (0, 0, 0))
+		# When sampling falls behind, missed samples are skipped
+		traj.add(35, (2, 2), (0, 1, 0))
+		self.assertFalse(traj.due(40))
+		self.assertTrue(traj.due(45))
+		traj.add(45, (3, 3), (0, 0, 0))
+		# Samples that don't fit are discarded
+		traj.add(55, (4, 4), (0, 0, 0))
+		self.assertEqual(traj.n, 4)
+		self.assertEqual(traj.t.tolist(), [0, 10, 35, 45])
+		self.assertEqual(traj.x.tolist(), [0, 1, 2, 3])
+		self.assertEqual(traj.buttons.tolist(), [5, 0, 2, 0])
+
+	def check_metrics(self, trajectory):
+
+		"""
+		desc:
+			Checks the deviation, area under the curve, resampling, and
+			encoding of a triangular trajectory.
+
+		arguments:
+			trajectory:
+				desc:	The trajectory class.
+				type:	type
+		"""
+
+		traj = trajectory(rate=100)
+		self.assertIsNone(traj.auc())
+		self.assertIsNone(traj.max_deviation())
+		self.assertEqual(traj.encode(), u'')
+		for i, pos in enumerate([(0, 0), (25, 25), (50, 50), (75, 25),
+			(100, 0)]):
+			traj.add(1000 + 10 * i, pos, (0,))
+		self.assertEqual(traj.max_deviation(), 50)
+		self.assertEqual(traj.auc(), 2500)
+		self.assertEqual(traj.encode(),
+			u'0,0,0,0;10,25,25,0;20,50,50,0;30,75,25,0;40,100,0,0')
+		t, x, y, buttons = traj.resample(3)
+		self.assertEqual(t.tolist(), [1000, 1020, 1040])
+		self.assertEqual(x.tolist(), [0, 50, 100])
+		self.assertEqual(y.tolist(), [0, 50, 0])
+		self.assertEqual(traj.encode(3), u'0,0,0,0;20,50,50,0;40,100,0,0')
+		# Resampling to more samples than there are leaves the trajectory
+		# unchanged
+		self.assertEqual(traj.encode(100), traj.encode())
+		# Without movement, the deviation is the distance to the start
+		traj = trajectory(rate=100)
+		for pos in [(0, 0), (3, 4), (0, 0)]:
+			traj.add(0, pos, (0,))
+		self.assertEqual(traj.max_deviation(), 5)
+
+	def check_trials(self):
+
+		"""
+		desc:
+			Runs a mouse_response item on several trials, and checks whether a
+			trajectory is logged on each trial.
+		"""
+
+		exp = experiment(string=script)
+		exp.var.fullscreen = u'no'
+		exp.init_clock()
+		exp.init_display()
+		try:
+			self.assertIn((u'mouse_trajectory_data', u'[Depends on response]'),
+				exp.items[u'mr'].var_info())
+			for trial in range(3):
+				exp.var.mouse_trajectory_data = u''
+				exp.items.execute(u'mr')
+				# The variable that enables recording is left unchanged
+				self.assertEqual(exp.var.mouse_trajectory, u'yes')
+				samples = exp.var.mouse_trajectory_data.split(u';')
+				self.assertGreaterEqual(len(samples), 4)
+				self.assertLessEqual(len(samples), 7)
+				self.assertGreaterEqual(int(samples[-1].split(u',')[0]), 30)
+				self.assertNotEqual(exp.var.mouse_auc, u'NA')
+				self.assertNotEqual(exp.var.mouse_max_deviation, u'NA')
+		finally:
+			exp.end()
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the mouse-trajectory test.
+		"""
+
+		try:
+			import pygame
+			import numpy
+		except ImportError:
+			self.skipTest(u'pygame or numpy not available')
+		from openexp._mouse.trajectory import trajectory
+		print(u'Checking trajectory sampling')
+		self.check_sampling(trajectory)
+		print(u'Checking trajectory metrics')
+		self.check_metrics(trajectory)
+		print(u'Checking trajectories over multiple trials')
+		self.check_trials()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,190 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+from libopensesame import plugins
+
+info_yaml = u'''category: Test
+sizes: !!python/tuple [1, 2]
+labels:
+	1: one
+	2: two
+'''
+
+class check_plugin_index(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether plugin indexes are stored in the user's home folder,
+		reused with the same content and types, and rebuilt only for plugins
+		that have changed.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a plugin folder with a new-style and an old-style plugin,
+			and a temporary home folder.
+		"""
+
+		self.home = tempfile.mkdtemp()
+		self.folder = tempfile.mkdtemp()
+		self._home = os.environ.get(u'HOME', None)
+		os.environ[u'HOME'] = self.home
+		self.add_plugin(u'new_plugin', u'info.yaml', info_yaml)
+		self.add_plugin(u'old_plugin', u'info.txt',
+			u'category: Old\npriority: 3\n')
+		self._parse_info = plugins._parse_info
+		self.parsed = []
+		plugins._parse_info = self.parse_info
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the temporary folders, and restores the home folder.
+		"""
+
+		plugins._parse_info = self._parse_info
+		plugins._indexes.pop(self.folder, None)
+		if self._home is None:
+			del os.environ[u'HOME']
+		else:
+			os.environ[u'HOME'] = self._home
+		shutil.rmtree(self.home)
+		shutil.rmtree(self.folder)
+
+	def parse_info(self, plugin, folder):
+
+		"""
+		desc:
+			Keeps track of which info files are parsed.
+		"""
+
+		self.parsed.append(plugin)
+		return self._parse_info(plugin, folder)
+
+	def add_plugin(self, plugin, info_file, info):
+
+		"""
+		desc:
+			Adds a plugin to the plugin folder.
+
+		arguments:
+			plugin:
+				desc:	The plugin name.
+				type:	str
+			info_file:
+				desc:	The name of the info file.
+				type:	str
+			info:
+				desc:	The contents of the info file.
+				type:	str
+		"""
+
+		path = os.path.join(self.folder, plugin)
+		os.mkdir(path)
+		with open(os.path.join(path, u'%s.py' % plugin), u'w') as fd:
+			fd.write(u'\n')
+		with open(os.path.join(path, info_file), u'w') as fd:
+			fd.write(info)
+
+	def reload(self):
+
+		"""
+		desc:
+			Forgets the index in memory, and gets it again.
+
+		returns:
+			desc:	The index.
+			type:	dict
+		"""
+
+		plugins._indexes.pop(self.folder, None)
+		self.parsed = []
+		return plugins._index(self.folder)
+
+	def touch(self, path, offset):
+
+		"""
+		desc:
+			Changes the modification time of a path, so that the test doesn't
+			depend on the resolution of the file system's timestamps.
+		"""
+
+		mtime = os.stat(path).st_mtime + offset
+		os.utime(path, (mtime, mtime))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the plugin-index test.
+		"""
+
+		print(u'Checking cold index')
+		cold = self.reload()
+		self.assertEqual(sorted(self.parsed), [u'new_plugin', u'old_plugin'])
+		path = plugins._index_path(self.folder)
+		self.assertTrue(path.startswith(self.home))
+		self.assertTrue(os.path.exists(path))
+		info = cold[u'plugins'][u'new_plugin'][u'info']
+		self.assertEqual(info[u'sizes'], (1, 2))
+		self.assertEqual(info[u'labels'], {1: u'one', 2: u'two'})
+		self.assertEqual(cold[u'plugins'][u'old_plugin'][u'info'],
+			{u'category': u'Old', u'priority': 3})
+		self.assertEqual(cold[u'plugins'][u'new_plugin'][u'module'],
+			os.path.join(self.folder, u'new_plugin', u'new_plugin.py'))
+		print(u'Checking warm index')
+		warm = self.reload()
+		self.assertEqual(self.parsed, [])
+		self.assertEqual(warm, cold)
+		# The stored index keeps the types of the parsed info
+		info = warm[u'plugins'][u'new_plugin'][u'info']
+		self.assertIsInstance(info[u'sizes'], tuple)
+		self.assertEqual(sorted(info[u'labels'].keys()), [1, 2])
+		print(u'Checking changed info file')
+		info_path = os.path.join(self.folder, u'old_plugin', u'info.txt')
+		with open(info_path, u'w') as fd:
+			fd.write(u'category: Changed\n')
+		self.touch(info_path, 10)
+		index = self.reload()
+		self.assertEqual(self.parsed, [u'old_plugin'])
+		self.assertEqual(index[u'plugins'][u'old_plugin'][u'info'],
+			{u'category': u'Changed'})
+		print(u'Checking added and removed plugins')
+		self.add_plugin(u'added_plugin', u'info.yaml', u'category: Added\n')
+		shutil.rmtree(os.path.join(self.folder, u'new_plugin'))
+		self.touch(self.folder, 10)
+		index = self.reload()
+		self.assertEqual(self.parsed, [u'added_plugin'])
+		self.assertEqual(sorted(index[u'plugins']),
+			[u'added_plugin', u'old_plugin'])
+		print(u'Checking corrupt index')
+		with open(path, u'wb') as fd:
+			fd.write(b'not an index')
+		self.assertEqual(self.reload(), index)
+		self.assertEqual(sorted(self.parsed), [u'added_plugin', u'old_plugin'])
+
+if __name__ == '__main__':
+	unittest.main()
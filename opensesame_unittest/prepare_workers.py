@@ -0,0 +1,116 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+from openexp._canvas.display_list import display_list
+
+script = u'''
+set canvas_backend legacy
+set uniform_coordinates yes
+set start s0
+'''
+
+sketchpad_script = u'''
+define sketchpad s%(i)d
+	set duration 0
+	draw fixdot x=0 y=0
+	draw circle x=%(x)d y=0 r=50 fill=1 color=red
+	draw rect x=-200 y=-200 w=100 h=%(x)d fill=0 penwidth=3
+	draw textline x=0 y=100 text="Sketchpad %(i)d" font_size=%(font_size)d font_bold=%(font_bold)s
+'''
+
+class check_prepare_workers(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether sketchpads that are prepared by worker threads look the
+		same as sketchpads that are prepared on the main thread.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display and several
+			sketchpads.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		self.names = [u's%d' % i for i in range(8)]
+		self.exp = experiment(string=script + u''.join(
+			sketchpad_script % {
+				u'i' : i,
+				u'x' : 10 * i,
+				u'font_size' : 16 + 2 * i,
+				u'font_bold' : u'yes' if i % 2 else u'no'
+				} for i in range(8)))
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_display()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display, which also stops the worker threads.
+		"""
+
+		self.exp.end()
+
+	def prepare(self):
+
+		"""
+		desc:
+			Prepares all sketchpads.
+
+		returns:
+			desc:	A list of canvas objects.
+			type:	list
+		"""
+
+		for name in self.names:
+			self.exp.items[name].prepare()
+		return [self.exp.items[name].canvas for name in self.names]
+
+	def runTest(self):
+
+		"""
+		desc:
+			Prepares the sketchpads with and without worker threads.
+		"""
+
+		print(u'Checking preparation without workers')
+		canvases = self.prepare()
+		for cnv in canvases:
+			self.assertNotIsInstance(cnv, display_list)
+		ref = [cnv._surface.get_buffer().raw for cnv in canvases]
+		print(u'Checking preparation with workers')
+		self.exp.var.pygame_prepare_workers = 4
+		canvases = self.prepare()
+		for cnv, pixels in zip(canvases, ref):
+			self.assertIsInstance(cnv, display_list)
+			cnv.flush()
+			self.assertEqual(cnv.canvas._surface.get_buffer().raw, pixels)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,138 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import struct
+import tempfile
+import wave
+from libopensesame.experiment import experiment
+
+class check_sampler_processing(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the legacy sampler changes pitch and pan correctly,
+		can change them back, and processes a sound only once for the same
+		settings.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a stereo sound file, and initializes the legacy sampler
+			back-end.
+		"""
+
+		try:
+			import pygame
+			import numpy
+		except ImportError:
+			self.skipTest(u'pygame or numpy not available')
+		self.folder = tempfile.mkdtemp()
+		self.path = os.path.join(self.folder, u'ramp.wav')
+		# A stereo ramp, with a louder right channel
+		fd = wave.open(self.path, u'wb')
+		fd.setnchannels(2)
+		fd.setsampwidth(2)
+		fd.setframerate(48000)
+		fd.writeframes(b''.join(struct.pack(u'<hh', i, 2 * i)
+			for i in range(4800)))
+		fd.close()
+		self.exp = experiment(string=u'set sampler_backend legacy\n')
+		self.exp.init_clock()
+		self.exp.init_sound()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the sound back-end, and removes the sound file.
+		"""
+
+		from openexp.sampler import close_sound
+		close_sound(self.exp)
+		shutil.rmtree(self.folder)
+
+	def samples(self, spl):
+
+		"""
+		desc:
+			Gets the samples of the current sound of a sampler.
+
+		returns:
+			desc:	An array of shape (samples, channels).
+			type:	ndarray
+		"""
+
+		import pygame
+		return pygame.sndarray.array(spl.sound)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Changes pitch and pan, and checks the resulting samples.
+		"""
+
+		from openexp.sampler import sampler
+		from openexp._sampler import legacy
+		spl = sampler(self.exp, self.path)
+		original = self.samples(spl)
+		self.assertEqual(original.shape, (4800, 2))
+		print(u'Checking pitch')
+		spl.pitch = 2
+		a = self.samples(spl)
+		self.assertEqual(len(a), 2400)
+		# Resampling a ramp with linear interpolation gives a steeper ramp
+		self.assertEqual(a[:, 0].tolist(), list(range(0, 4800, 2)))
+		spl.pitch = .5
+		a = self.samples(spl)
+		self.assertEqual(len(a), 9600)
+		self.assertEqual(a[:4, 0].tolist(), [0, 0, 1, 2])
+		print(u'Checking pan')
+		spl.pitch = 1
+		spl.pan = -2
+		a = self.samples(spl)
+		self.assertEqual(a[:, 0].tolist(), original[:, 0].tolist())
+		self.assertEqual(a[:, 1].tolist(), original[:, 0].tolist())
+		spl.pan = u'left'
+		a = self.samples(spl)
+		self.assertEqual(a[:, 0].tolist(), original[:, 0].tolist())
+		self.assertFalse(a[:, 1].any())
+		print(u'Checking changing back')
+		spl.pan = 0
+		self.assertIs(spl.sound, spl._original_sound)
+		spl.play(pitch=2, volume=.5)
+		spl.stop()
+		self.assertEqual(spl.pitch, 1)
+		self.assertIs(spl.sound, spl._original_sound)
+		print(u'Checking processed sound cache')
+		spl.pitch = 2
+		key = spl._bank_key + (2, 0)
+		self.assertIn(key, legacy.bank)
+		buf = legacy.bank.get(key)
+		spl2 = sampler(self.exp, self.path, pitch=2)
+		self.assertEqual(spl2.sound.get_raw(), buf)
+		self.assertIs(legacy.bank.get(key), buf)
+
+if __name__ == '__main__':
+	unittest.main()
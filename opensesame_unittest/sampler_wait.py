@@ -0,0 +1,123 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import time
+from libopensesame.experiment import experiment
+
+# The CPU time of the process. time.clock() is deprecated in Python 3.
+cpu_time = getattr(time, u'process_time', None) or time.clock
+
+class non_pygame_keyboard(object):
+
+	"""
+	desc:
+		Stands in for a keyboard back-end that doesn't use the PyGame event
+		queue, such as the psycho keyboard.
+	"""
+
+	def flush(self):
+
+		return False
+
+class check_sampler_wait(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether blocking playback with the legacy sampler waits until
+		the sound has finished, without occupying the CPU. This is checked
+		both with and without a PyGame display, because the legacy sampler is
+		also used with other canvas back-ends, such as psycho.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment, and initializes only the sound back-end.
+		"""
+
+		try:
+			import pygame
+			import numpy
+		except ImportError:
+			self.skipTest(u'pygame or numpy not available')
+		self.exp = experiment(string=u'''
+set canvas_backend legacy
+set sampler_backend legacy
+''')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_sound()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display (if any) and sound.
+		"""
+
+		self.exp.end()
+
+	def check_blocking_playback(self, spl):
+
+		"""
+		desc:
+			Plays a 200 ms tone, and checks how long playback blocked and how
+			much CPU time it used.
+
+		arguments:
+			spl:
+				desc:	A sampler with a 200 ms tone.
+				type:	sampler
+		"""
+
+		t0 = time.time()
+		c0 = cpu_time()
+		spl.play(block=True)
+		t1 = time.time()
+		c1 = cpu_time()
+		self.assertFalse(spl.is_playing())
+		self.assertGreaterEqual(t1 - t0, .18)
+		self.assertLess(t1 - t0, .5)
+		self.assertLess(c1 - c0, .1)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Plays sounds with and without a display.
+		"""
+
+		import pygame
+		from openexp.synth import synth
+		print(u'Checking blocking playback without a display')
+		# The legacy keyboard initializes PyGame, including the display.
+		# Other back-ends, such as psycho, use the legacy sampler without a
+		# PyGame display.
+		spl = synth(self.exp, length=200)
+		spl.keyboard = non_pygame_keyboard()
+		pygame.display.quit()
+		self.check_blocking_playback(spl)
+		print(u'Checking blocking playback with a display')
+		self.exp.init_display()
+		self.check_blocking_playback(synth(self.exp, length=200))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,138 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import struct
+import tempfile
+import wave
+from libopensesame.exceptions import osexception
+from libopensesame.experiment import experiment
+from openexp._sampler.sound_bank import sound_bank
+
+class check_sound_bank(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the sound bank evicts the least recently used sounds,
+		keeps preloaded sounds, and is used by the legacy sampler.
+	"""
+
+	def check_lru(self):
+
+		"""
+		desc:
+			Checks the memory limit, eviction order, and pinned sounds.
+		"""
+
+		bank = sound_bank(memory_limit=30)
+		bank.add((u'a',), b'a' * 10)
+		bank.add((u'b',), b'b' * 10)
+		bank.add((u'c',), b'c' * 10)
+		self.assertEqual(bank.size, 30)
+		# Getting a marks it as recently used, so b is evicted next
+		self.assertEqual(bank.get((u'a',)), b'a' * 10)
+		bank.add((u'd',), b'd' * 10)
+		self.assertNotIn((u'b',), bank)
+		self.assertIn((u'a',), bank)
+		self.assertEqual(bank.size, 30)
+		# Replacing sound data doesn't count twice
+		bank.add((u'a',), b'A' * 10)
+		self.assertEqual(bank.size, 30)
+		self.assertEqual(bank.get((u'a',)), b'A' * 10)
+		self.assertIsNone(bank.get((u'b',)))
+		# Pinned sounds are never evicted
+		bank.add((u'p',), b'p' * 20, pinned=True)
+		for i in range(5):
+			bank.add((i,), b'x' * 10)
+		self.assertIn((u'p',), bank)
+		self.assertEqual(bank.size, 30)
+		# But they cannot exceed the limit by themselves
+		with self.assertRaises(osexception):
+			bank.add((u'q',), b'q' * 20, pinned=True)
+		bank.remove((u'p',))
+		self.assertEqual(bank.size, 10)
+		bank.clear()
+		self.assertEqual(bank.size, 0)
+
+	def check_sampler(self):
+
+		"""
+		desc:
+			Checks preloading and reuse of decoded sounds by the legacy
+			sampler.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		from openexp.sampler import sampler, preload, close_sound
+		from openexp._sampler import legacy
+		folder = tempfile.mkdtemp()
+		path = os.path.join(folder, u'tone.wav')
+		fd = wave.open(path, u'wb')
+		fd.setnchannels(2)
+		fd.setsampwidth(2)
+		fd.setframerate(48000)
+		fd.writeframes(b''.join(struct.pack(u'<hh', i, -i)
+			for i in range(4800)))
+		fd.close()
+		exp = experiment(string=u'set sampler_backend legacy\n')
+		exp.init_clock()
+		exp.init_sound()
+		try:
+			preload(exp, [path])
+			size = legacy.bank.size
+			self.assertGreater(size, 0)
+			s1 = sampler(exp, path)
+			s2 = sampler(exp, path)
+			# The decoded sound is stored only once, but each sampler has its
+			# own sound object.
+			self.assertEqual(legacy.bank.size, size)
+			self.assertIsNot(s1.sound, s2.sound)
+			self.assertEqual(s1.sound.get_raw(), s2.sound.get_raw())
+			s1.volume = .5
+			self.assertAlmostEqual(s2.sound.get_volume(), 1, places=2)
+			# A modified file is decoded again
+			os.utime(path, (0, 0))
+			s3 = sampler(exp, path)
+			self.assertEqual(legacy.bank.size, 2 * size)
+			with self.assertRaises(osexception):
+				preload(exp, [os.path.join(folder, u'missing.wav')])
+		finally:
+			close_sound(exp)
+			shutil.rmtree(folder)
+		self.assertEqual(legacy.bank.size, 0)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the sound bank test.
+		"""
+
+		print(u'Checking sound bank')
+		self.check_lru()
+		print(u'Checking preloaded sounds')
+		self.check_sampler()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+from libopensesame.experiment import experiment
+
+class check_srbox(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks the SR Box reader against a pseudo-terminal that stands in for
+		the device.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Opens a pseudo-terminal, and connects an SR Box to its slave end.
+		"""
+
+		try:
+			import pty
+			import serial
+		except ImportError:
+			self.skipTest(u'pty or serial not available')
+		sys.path.insert(0, os.path.join(os.path.dirname(__file__), u'..',
+			u'opensesame_plugins', u'srbox'))
+		import libsrbox
+		self.exp = experiment()
+		self.exp.var.clock_backend = u'highres'
+		self.exp.init_clock()
+		self.master, slave = pty.openpty()
+		self.dev = libsrbox.libsrbox(self.exp, os.ttyname(slave))
+		os.close(slave)
+		# Discard the lights-off byte
+		os.read(self.master, 1)
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the SR Box and the pseudo-terminal.
+		"""
+
+		self.dev.close()
+		os.close(self.master)
+
+	def send(self, samples, delay=0):
+
+		"""
+		desc:
+			Sends samples to the SR Box, optionally after a delay.
+
+		arguments:
+			samples:
+				desc:	A list of byte values.
+				type:	list
+
+		keywords:
+			delay:
+				desc:	A delay in seconds.
+				type:	float
+		"""
+
+		if delay:
+			threading.Timer(delay, self.send, [samples]).start()
+			return
+		os.write(self.master, bytes(bytearray(samples)))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Checks button presses, state changes, timeouts, and timestamps.
+		"""
+
+		self.dev.start()
+		self.assertEqual(os.read(self.master, 1), b'\xA0')
+		print(u'Checking timeout')
+		button, t = self.dev.get_button_press(timeout=50)
+		self.assertIsNone(button)
+		print(u'Checking button press')
+		t0 = self.exp.time()
+		self.send([0] * 10 + [4] * 10, delay=.1)
+		button, t = self.dev.get_button_press(timeout=1000)
+		self.assertEqual(button, [3])
+		# The press is ten samples (12.5 ms) before the last sample
+		self.assertGreaterEqual(t - t0, 80)
+		self.assertLess(t - t0, 100)
+		print(u'Checking button that is already pressed')
+		time.sleep(.05)
+		button, t = self.dev.get_button_press(allowed_buttons=[3],
+			timeout=1000)
+		self.assertEqual(button, [3])
+		print(u'Checking state change')
+		self.send([4] * 10 + [5] * 10, delay=.1)
+		button, t = self.dev.get_button_press(require_state_change=True,
+			timeout=1000)
+		self.assertEqual(button, [1])
+		print(u'Checking disallowed buttons')
+		self.send([0, 2, 0], delay=.1)
+		button, t = self.dev.get_button_press(allowed_buttons=[1],
+			require_state_change=True, timeout=300)
+		self.assertIsNone(button)
+		print(u'Checking reconstructed timestamps')
+		t0 = self.exp.time()
+		self.send([0] * 80 + [8] * 80, delay=.2)
+		button, t = self.dev.get_button_press(allowed_buttons=[4],
+			require_state_change=True, timeout=1000)
+		self.assertEqual(button, [4])
+		# The press is 80 samples (100 ms at 800 Hz) before the last sample,
+		# which arrives after 200 ms.
+		self.assertGreaterEqual(t - t0, 80)
+		self.assertLess(t - t0, 150)
+		self.dev.stop()
+		self.assertEqual(os.read(self.master, 1), b'\x20')
+
+if __name__ == '__main__':
+	unittest.main()
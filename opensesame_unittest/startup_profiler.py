@@ -0,0 +1,126 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from libopensesame.startup_profiler import startup_profiler
+if sys.version_info[0] >= 3:
+	import builtins
+else:
+	import __builtin__ as builtins
+
+# Test modules, which take a known time to import
+modules = {
+	u'profile_pkg/__init__.py' : u'import time\ntime.sleep(.02)\n',
+	u'profile_pkg/sub.py' : u'import time\nimport profile_leaf\n'
+		u'time.sleep(.03)\n',
+	u'profile_leaf.py' : u'import time\ntime.sleep(.01)\n',
+	}
+
+class check_startup_profiler(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the startup profiler times imports of new modules,
+		including submodules that are imported from a package that has
+		already been imported, and initialization steps.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a folder with test modules.
+		"""
+
+		self.folder = tempfile.mkdtemp()
+		os.mkdir(os.path.join(self.folder, u'profile_pkg'))
+		for path, src in modules.items():
+			with open(os.path.join(self.folder, path), u'w') as fd:
+				fd.write(src)
+		sys.path.insert(0, self.folder)
+		self.profiler = startup_profiler()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Disables the profiler, and removes the test modules.
+		"""
+
+		self.profiler.disable()
+		sys.path.remove(self.folder)
+		for name in (u'profile_pkg', u'profile_pkg.sub', u'profile_leaf'):
+			sys.modules.pop(name, None)
+		shutil.rmtree(self.folder)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the startup-profiler test.
+		"""
+
+		print(u'Checking imports')
+		_import = builtins.__import__
+		profiler = self.profiler
+		profiler.enable()
+		self.assertNotEqual(builtins.__import__, _import)
+		import profile_pkg
+		self.assertEqual(list(profiler.imports), [u'profile_pkg'])
+		cumulative, own = profiler.imports[u'profile_pkg']
+		self.assertGreaterEqual(own, 19)
+		# The package has already been imported, but the submodule hasn't
+		from profile_pkg import sub
+		self.assertIn(u'profile_leaf', profiler.imports)
+		leaf_cumulative, leaf_own = profiler.imports[u'profile_leaf']
+		self.assertGreaterEqual(leaf_own, 9)
+		self.assertLess(leaf_own, 29)
+		cumulative, own = profiler.imports[u'profile_pkg']
+		# The submodule's time is added to the package; the time of the
+		# module that the submodule imports is counted only cumulatively.
+		self.assertGreaterEqual(own, 19 + 29)
+		self.assertGreaterEqual(cumulative, 19 + 29 + 9)
+		self.assertLess(own, cumulative)
+		# Modules that have already been imported are not timed again
+		n = len(profiler.imports)
+		import profile_leaf
+		from profile_pkg import sub
+		import os
+		self.assertEqual(len(profiler.imports), n)
+		print(u'Checking steps')
+		with profiler.step(u'test step'):
+			pass
+		self.assertEqual([name for name, duration in profiler.steps],
+			[u'test step'])
+		report = profiler.report()
+		self.assertIn(u'test step', report)
+		self.assertIn(u'profile_leaf', report)
+		print(u'Checking disabled profiler')
+		profiler.disable()
+		self.assertEqual(builtins.__import__, _import)
+		with profiler.step(u'disabled step'):
+			pass
+		self.assertEqual(len(profiler.steps), 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,109 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from libopensesame.experiment import experiment
+from openexp.canvas import canvas
+from openexp.synth import synth
+
+class check_style_keywords(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether style keywords are applied only during a single call,
+		and are restored afterwards.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates an experiment with a legacy display and sound.
+		"""
+
+		try:
+			import pygame
+		except ImportError:
+			self.skipTest(u'pygame not available')
+		self.exp = experiment(string=u'''
+set canvas_backend legacy
+set sampler_backend legacy
+set uniform_coordinates yes
+''')
+		self.exp.var.fullscreen = u'no'
+		self.exp.init_clock()
+		self.exp.init_display()
+		self.exp.init_sound()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Closes the display and sound.
+		"""
+
+		self.exp.end()
+
+	def pixels(self, cnv):
+
+		"""
+		desc:
+			Gets the contents of a canvas.
+
+		returns:
+			desc:	The raw pixel data.
+			type:	bytes
+		"""
+
+		return cnv.surface.get_buffer().raw
+
+	def runTest(self):
+
+		"""
+		desc:
+			Calls canvas and sampler functions with style keywords.
+		"""
+
+		print(u'Checking canvas style keywords')
+		c1 = canvas(self.exp, color=u'red')
+		cfg = c1.get_config()
+		c1.text(u'Styled', font_size=40, font_bold=True, color=u'blue')
+		self.assertEqual(c1.get_config(), cfg)
+		c1.text(u'Plain', y=100)
+		c2 = canvas(self.exp, color=u'blue', font_size=40, font_bold=True)
+		c2.text(u'Styled')
+		c2.set_config(**cfg)
+		c2.text(u'Plain', y=100)
+		self.assertEqual(self.pixels(c1), self.pixels(c2))
+		print(u'Checking unchanged style keywords')
+		c1.line(0, 0, 100, 100, color=u'red', penwidth=c1.penwidth)
+		self.assertEqual(c1.get_config(), cfg)
+		print(u'Checking restore after an exception')
+		with self.assertRaises(ValueError):
+			c1.polygon([(0, 0)], color=u'green', penwidth=5)
+		self.assertEqual(c1.get_config(), cfg)
+		print(u'Checking sampler style keywords')
+		s = synth(self.exp, length=10)
+		s.volume = .5
+		s.play(volume=.25, block=True)
+		self.assertEqual(s.volume, .5)
+		self.assertAlmostEqual(s.sound.get_volume(), .5, places=2)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,124 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_synth(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether synthesized tones are cached, and whether streamed
+		tones are identical to complete tones.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Clears the tone cache.
+		"""
+
+		try:
+			import numpy
+		except ImportError:
+			self.skipTest(u'numpy not available')
+		from openexp import synth
+		self.synth = synth
+		self.cache_size = synth.cache_size
+		self.clear_cache()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Restores the cache size, and clears the tone cache.
+		"""
+
+		self.synth.cache_size = self.cache_size
+		self.clear_cache()
+
+	def clear_cache(self):
+
+		"""
+		desc:
+			Clears the tone cache.
+		"""
+
+		self.synth._cache.clear()
+		self.synth._cache_bytes = 0
+
+	def runTest(self):
+
+		"""
+		desc:
+			Generates, streams, and caches tones.
+		"""
+
+		import numpy as np
+		synth = self.synth
+		print(u'Checking streamed tones')
+		tones = [(u'sine', 100, 0, 5), (u'sine', 250, 20, 50)]
+		try:
+			import scipy
+		except ImportError:
+			print(u'scipy not available, skipping square oscillator')
+		else:
+			tones.append((u'square', 100, 10, 10))
+		for osc, length, attack, decay in tones:
+			n = synth.n_samples(length, 96200)
+			# The complete tone, generated as in earlier versions
+			ref = synth.to_int_16(synth.osc_gen(osc, 440, length, 96200) *
+				synth.envelope(length, attack, decay, 96200))
+			a = synth.tone(osc, 440, length, attack, decay, 96200)
+			self.assertEqual(a.dtype, np.int16)
+			self.assertEqual(len(a), n)
+			self.assertTrue(np.array_equal(a, ref))
+			for chunk_size in (1000, 4096, n):
+				chunks = list(synth.stream(osc, 440, length, attack, decay,
+					96200, chunk_size=chunk_size))
+				self.assertTrue(all(len(chunk) <= chunk_size
+					for chunk in chunks))
+				self.assertTrue(np.array_equal(np.concatenate(chunks), ref))
+		print(u'Checking tone cache')
+		a = synth.tone(u'sine', 440, 100, 0, 5, 96200)
+		self.assertIs(synth.tone(u'sine', 440, 100, 0, 5, 96200), a)
+		self.assertFalse(a.flags.writeable)
+		self.assertIsNot(synth.tone(u'sine', 880, 100, 0, 5, 96200), a)
+		# White noise is never cached
+		n1 = synth.tone(u'white_noise', 440, 100, 0, 5, 96200)
+		n2 = synth.tone(u'white_noise', 440, 100, 0, 5, 96200)
+		self.assertFalse(np.array_equal(n1, n2))
+		print(u'Checking cache size')
+		self.clear_cache()
+		synth.cache_size = 3 * a.nbytes
+		t1 = synth.tone(u'sine', 100, 100, 0, 5, 96200)
+		t2 = synth.tone(u'sine', 200, 100, 0, 5, 96200)
+		t3 = synth.tone(u'sine', 300, 100, 0, 5, 96200)
+		# Using t1 marks it as recently used, so t2 is removed first
+		self.assertIs(synth.tone(u'sine', 100, 100, 0, 5, 96200), t1)
+		synth.tone(u'sine', 400, 100, 0, 5, 96200)
+		self.assertLessEqual(synth._cache_bytes, synth.cache_size)
+		self.assertIs(synth.tone(u'sine', 100, 100, 0, 5, 96200), t1)
+		self.assertIsNot(synth.tone(u'sine', 200, 100, 0, 5, 96200), t2)
+		# Tones that are larger than the cache are not cached
+		synth.tone(u'sine', 440, 1000, 0, 5, 96200)
+		self.assertLessEqual(synth._cache_bytes, synth.cache_size)
+
+if __name__ == '__main__':
+	unittest.main()
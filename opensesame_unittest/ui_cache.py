@@ -0,0 +1,210 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import io
+import os
+import shutil
+import tempfile
+
+ui_xml = u'''<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>test_widget</class>
+ <widget class="QWidget" name="test_widget">
+  <layout class="QVBoxLayout" name="layout">
+   <item>
+    <widget class="QLabel" name="label">
+     <property name="text">
+      <string>%s</string>
+     </property>
+    </widget>
+   </item>
+  </layout>
+ </widget>
+ <resources/>
+ <connections/>
+</ui>
+'''
+
+class check_ui_cache(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether .ui files are compiled once, reused from the cache
+		folder, recompiled when they change, and loaded with uic.loadUi()
+		when compilation fails.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Creates a temporary home folder and a .ui file.
+		"""
+
+		os.environ.setdefault(u'QT_QPA_PLATFORM', u'offscreen')
+		try:
+			from qtpy import QtWidgets
+			from libqtopensesame.misc import ui_cache
+		except Exception as e:
+			self.skipTest(u'ui_cache not available: %s' % e)
+		self.QtWidgets = QtWidgets
+		self.ui_cache = ui_cache
+		self.app = QtWidgets.QApplication.instance() or \
+			QtWidgets.QApplication([])
+		self.home = tempfile.mkdtemp()
+		self._home = os.environ.get(u'HOME', None)
+		os.environ[u'HOME'] = self.home
+		self.ui_path = os.path.join(self.home, u'test.ui')
+		self.write_ui(u'First')
+		self.compiled = []
+		self._compileUi = ui_cache.uic.compileUi
+		ui_cache.uic.compileUi = self.compileUi
+		self.fail_compile = False
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the home folder, and restores the compiler.
+		"""
+
+		self.ui_cache.uic.compileUi = self._compileUi
+		self.ui_cache._classes.pop(self.ui_path, None)
+		if self._home is None:
+			del os.environ[u'HOME']
+		else:
+			os.environ[u'HOME'] = self._home
+		shutil.rmtree(self.home)
+
+	def compileUi(self, src, fd):
+
+		"""
+		desc:
+			Keeps track of compilations, and optionally fails after writing
+			part of the module.
+		"""
+
+		self.compiled.append(src)
+		if self.fail_compile:
+			fd.write(u'# partial')
+			raise RuntimeError(u'Compilation failed')
+		self._compileUi(src, fd)
+
+	def write_ui(self, text, offset=0):
+
+		"""
+		desc:
+			Writes the .ui file with a label text, and optionally moves its
+			modification time forward.
+		"""
+
+		with io.open(self.ui_path, u'w', encoding=u'utf-8') as fd:
+			fd.write(ui_xml % text)
+		if offset:
+			mtime = os.stat(self.ui_path).st_mtime + offset
+			os.utime(self.ui_path, (mtime, mtime))
+
+	def load(self):
+
+		"""
+		desc:
+			Loads the .ui file into a new widget.
+
+		returns:
+			desc:	The widget.
+			type:	QWidget
+		"""
+
+		return self.ui_cache.load_ui(self.ui_path,
+			self.QtWidgets.QWidget())
+
+	def cache_files(self):
+
+		"""
+		returns:
+			desc:	The files in the cache folder.
+			type:	list
+		"""
+
+		return sorted(os.listdir(self.ui_cache.cache_folder()))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the ui-cache test.
+		"""
+
+		print(u'Checking compilation')
+		widget = self.load()
+		self.assertEqual(widget.label.text(), u'First')
+		self.assertEqual(len(self.compiled), 1)
+		files = self.cache_files()
+		self.assertEqual(len(files), 1)
+		self.assertTrue(files[0].startswith(u'ui_'))
+		cls = self.ui_cache.ui_class(self.ui_path)
+		print(u'Checking cache in memory')
+		widget = self.load()
+		self.assertEqual(widget.label.text(), u'First')
+		self.assertIs(self.ui_cache.ui_class(self.ui_path), cls)
+		self.assertEqual(len(self.compiled), 1)
+		print(u'Checking cache on disk')
+		self.ui_cache._classes.pop(self.ui_path)
+		widget = self.load()
+		self.assertEqual(widget.label.text(), u'First')
+		self.assertEqual(len(self.compiled), 1)
+		print(u'Checking changed file')
+		self.write_ui(u'Second', offset=10)
+		widget = self.load()
+		self.assertEqual(widget.label.text(), u'Second')
+		self.assertEqual(len(self.compiled), 2)
+		self.assertEqual(len(self.cache_files()), 2)
+		print(u'Checking concurrent compilation')
+		self.write_ui(u'Concurrent', offset=15)
+		_rename = self.ui_cache.os.rename
+
+		def rename(src, dst):
+			# Another process creates the module first, and the rename fails
+			# as it does on Windows
+			shutil.copy(src, dst)
+			raise OSError(u'File exists')
+
+		self.ui_cache.os.rename = rename
+		try:
+			widget = self.load()
+		finally:
+			self.ui_cache.os.rename = _rename
+		self.assertEqual(widget.label.text(), u'Concurrent')
+		self.assertIsNotNone(self.ui_cache.ui_class(self.ui_path))
+		self.assertEqual(len(self.compiled), 3)
+		self.assertEqual(len(self.cache_files()), 3)
+		print(u'Checking failed compilation')
+		self.fail_compile = True
+		self.write_ui(u'Third', offset=20)
+		for i in range(3):
+			widget = self.load()
+			self.assertEqual(widget.label.text(), u'Third')
+		# The failure is remembered, and no partial module is left behind
+		self.assertEqual(len(self.compiled), 4)
+		self.assertEqual(len(self.cache_files()), 3)
+		self.assertIsNone(self.ui_cache.ui_class(self.ui_path))
+
+if __name__ == '__main__':
+	unittest.main()
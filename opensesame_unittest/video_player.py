@@ -0,0 +1,161 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from libopensesame.experiment import experiment
+from libopensesame import plugins
+
+script = u'''
+set canvas_backend legacy
+set start vp
+define video_player vp
+	set video_src "%s"
+	set fullscreen no
+	set duration 10000
+	set frame_dur 10
+	set frame_buffer 3
+'''
+
+class check_video_player(unittest.TestCase):
+
+	"""
+	desc: |
+		Checks whether the video_player plug-in decodes frames in a background
+		thread, and stops this thread when it is no longer needed.
+	"""
+
+	def setUp(self):
+
+		"""
+		desc:
+			Imports the plug-in, and writes a short video with frames of
+			increasing brightness.
+		"""
+
+		try:
+			import cv2
+			import numpy as np
+			self.mod = plugins.import_plugin(u'video_player')
+		except Exception as e:
+			self.skipTest(u'video_player not available: %s' % e)
+		self.folder = tempfile.mkdtemp()
+		self.path = os.path.join(self.folder, u'video.avi')
+		writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*'MJPG'),
+			25, (64, 48))
+		for i in range(20):
+			writer.write(np.full((48, 64, 3), 10 * i, dtype=np.uint8))
+		writer.release()
+
+	def tearDown(self):
+
+		"""
+		desc:
+			Removes the video.
+		"""
+
+		shutil.rmtree(self.folder)
+
+	def decoders(self):
+
+		"""
+		desc:
+			Counts the running decoder threads.
+
+		returns:
+			desc:	The number of decoder threads.
+			type:	int
+		"""
+
+		return len([t for t in threading.enumerate()
+			if isinstance(t, self.mod.frame_decoder)])
+
+	def check_decoder(self):
+
+		"""
+		desc:
+			Decodes all frames with a small ring of buffers.
+		"""
+
+		import cv2
+		decoder = self.mod.frame_decoder(cv2.VideoCapture(self.path), (32, 24),
+			3)
+		decoder.start()
+		brightness = []
+		while True:
+			i = decoder.next_frame()
+			if i is None:
+				break
+			self.assertEqual(decoder.frames[i].shape, (24, 32, 3))
+			brightness.append(int(decoder.frames[i].mean()))
+			decoder.release(i)
+		# The end of the video is signalled repeatedly
+		self.assertIsNone(decoder.next_frame())
+		decoder.stop()
+		self.assertFalse(decoder.is_alive())
+		self.assertEqual(len(brightness), 20)
+		self.assertEqual(brightness, sorted(brightness))
+		self.assertGreater(brightness[-1] - brightness[0], 150)
+
+	def check_item(self):
+
+		"""
+		desc:
+			Prepares and runs the plug-in.
+		"""
+
+		exp = experiment(string=script % self.path)
+		exp.var.fullscreen = u'no'
+		exp.init_clock()
+		exp.init_display()
+		try:
+			vp = exp.items[u'vp']
+			# Preparing again replaces the decoder
+			vp.prepare()
+			vp.prepare()
+			self.assertEqual(self.decoders(), 1)
+			vp.run()
+			self.assertIsNone(vp.decoder)
+			self.assertEqual(self.decoders(), 0)
+			self.assertEqual(exp.var.frames_shown_vp +
+				exp.var.frames_dropped_vp, 20)
+			# A prepared decoder is stopped when the experiment ends
+			vp.prepare()
+			self.assertEqual(self.decoders(), 1)
+		finally:
+			exp.end()
+		self.assertEqual(self.decoders(), 0)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs the video_player test.
+		"""
+
+		print(u'Checking frame decoder')
+		self.check_decoder()
+		print(u'Checking video_player item')
+		self.check_item()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.py3compat import *
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import argparse
+import subprocess
+from timeit import default_timer
+from libopensesame import metadata
+from libopensesame.experiment import experiment
+
+# The sizes for which each benchmark is run
+canvas_element_counts = [1, 10, 100]
+sketchpad_element_counts = [1, 10, 100]
+loop_column_counts = [1, 10, 100]
+loop_cycles = 100
+logger_variable_counts = [1, 10, 100]
+eval_text_count = 1000
+session_lengths = [100, 500, 1000]
+
+experiment_script = u'''
+set canvas_backend %(canvas)s
+set keyboard_backend %(keyboard)s
+set mouse_backend %(mouse)s
+set sampler_backend %(sampler)s
+set color_backend %(color)s
+set clock_backend %(clock)s
+set width 1024
+set height 768
+set uniform_coordinates yes
+set fullscreen no
+set foreground white
+set background black
+set subject_nr 0
+set subject_parity even
+set start experiment
+
+define sequence experiment
+
+define sequence benchmark_empty_sequence
+'''
+
+def measure(fnc, repeat):
+
+	"""
+	desc:
+		Calls a function several times and measures how long it takes.
+
+	arguments:
+		fnc:
+			desc:	The function to measure.
+			type:	callable
+		repeat:
+			desc:	The number of times to call the function.
+			type:	int
+
+	returns:
+		desc:	The median duration in milliseconds.
+		type:	float
+	"""
+
+	durations = []
+	for i in range(repeat):
+		t0 = default_timer()
+		fnc()
+		durations.append(1000. * (default_timer() - t0))
+	durations.sort()
+	return durations[len(durations) // 2]
+
+def init_experiment(backend, logfile):
+
+	"""
+	desc:
+		Creates an experiment for a back-end combination, and initializes it
+		in the same way as experiment.run() does, but without running an entry
+		point.
+
+	arguments:
+		backend:
+			desc:	A back-end combination from backend_info.yaml, such as
+					'legacy'.
+			type:	str
+		logfile:
+			desc:	The path to the log file.
+			type:	str
+
+	returns:
+		desc:	An initialized experiment.
+		type:	experiment
+	"""
+
+	from openexp import backend as _backend
+	exp = experiment(logfile=logfile, string=u'set canvas_backend legacy')
+	info = _backend.backend_info(exp)[backend]
+	exp = experiment(logfile=logfile,
+		experiment_path=os.path.dirname(logfile),
+		string=experiment_script % info)
+	exp.running = True
+	exp.init_random()
+	exp.init_display()
+	exp.init_clock()
+	exp.init_sound()
+	exp.init_log()
+	exp.python_workspace.init_globals()
+	exp.reset_feedback()
+	return exp
+
+def benchmark_canvas(exp, repeat):
+
+	"""
+	desc:
+		Measures canvas.prepare() and canvas.show() for canvases with a varying
+		number of elements.
+	"""
+
+	from openexp.canvas import canvas
+	results = {}
+	for n in canvas_element_counts:
+		c = canvas(exp, auto_prepare=False)
+		for i in range(n):
+			x = random.randint(-400, 400)
+			y = random.randint(-300, 300)
+			if i % 3 == 0:
+				c.fixdot(x, y)
+			elif i % 3 == 1:
+				c.rect(x, y, 50, 50, fill=True)
+			else:
+				c.text(u'text', x=x, y=y)
+		results[u'canvas.prepare[elements=%d]' % n] = measure(c.prepare,
+			repeat)
+		results[u'canvas.show[elements=%d]' % n] = measure(c.show, repeat)
+	return results
+
+def benchmark_sketchpad(exp, repeat):
+
+	"""
+	desc:
+		Measures sketchpad.prepare() for sketchpads with a varying number of
+		elements.
+	"""
+
+	results = {}
+	for n in sketchpad_element_counts:
+		script = u'set duration 0\n'
+		for i in range(n):
+			x = random.randint(-400, 400)
+			y = random.randint(-300, 300)
+			if i % 2:
+				script += u'draw fixdot x=%d y=%d\n' % (x, y)
+			else:
+				script += u'draw rect x=%d y=%d w=50 h=50 fill=1\n' % (x, y)
+		item = exp.items.new(u'sketchpad',
+			name=u'benchmark_sketchpad_%d' % n, script=script)
+		results[u'sketchpad.prepare[elements=%d]' % n] = measure(
+			item.prepare, repeat)
+		item.canvas.show()
+	return results
+
+def benchmark_loop(exp, repeat):
+
+	"""
+	desc:
+		Measures the per-cycle overhead of a loop for a varying number of
+		columns. The loop runs an empty sequence.
+	"""
+
+	results = {}
+	for n in loop_column_counts:
+		script = u'''set source table
+set repeat 1
+set order random
+set cycles %d
+set break_if never
+run benchmark_empty_sequence
+''' % loop_cycles
+		for cycle in range(loop_cycles):
+			for column in range(n):
+				script += u'setcycle %d benchmark_column_%d %d\n' \
+					% (cycle, column, cycle)
+		item = exp.items.new(u'loop', name=u'benchmark_loop_%d' % n,
+			script=script)
+		def run_loop():
+			item.prepare()
+			item.run()
+		results[u'loop.cycle[columns=%d]' % n] = measure(run_loop, repeat) \
+			/ loop_cycles
+	return results
+
+def benchmark_logger(exp, repeat):
+
+	"""
+	desc:
+		Measures logger.run() for a varying number of logged variables.
+	"""
+
+	results = {}
+	for n in logger_variable_counts:
+		script = u'set auto_log no\n'
+		for i in range(n):
+			exp.var.set(u'benchmark_variable_%d' % i, i)
+			script += u'log benchmark_variable_%d\n' % i
+		item = exp.items.new(u'logger', name=u'benchmark_logger_%d' % n,
+			script=script)
+		item.prepare()
+		results[u'logger.run[variables=%d]' % n] = measure(item.run, repeat)
+	return results
+
+def benchmark_eval_text(exp, repeat):
+
+	"""
+	desc:
+		Measures the throughput of syntax.eval_text().
+	"""
+
+	text = u'Subject [subject_nr] ([subject_parity]) at [width]x[height]'
+	def eval_text():
+		for i in range(eval_text_count):
+			exp.syntax.eval_text(text)
+	return {u'syntax.eval_text[calls=%d]' % eval_text_count :
+		measure(eval_text, repeat)}
+
+def benchmark_response_store(exp, repeat):
+
+	"""
+	desc:
+		Measures response_store.add() at various session lengths, i.e. with
+		a varying number of previously collected responses.
+	"""
+
+	results = {}
+	for n in session_lengths:
+		exp.reset_feedback()
+		exp.responses.clear()
+		for i in range(n):
+			exp.responses.add(response=u'a', correct=i % 2,
+				response_time=random.random())
+		results[u'response_store.add[session_length=%d]' % n] = measure(
+			lambda: exp.responses.add(response=u'a', correct=1,
+			response_time=1), repeat)
+	return results
+
+benchmarks = [benchmark_canvas, benchmark_sketchpad, benchmark_loop,
+	benchmark_logger, benchmark_eval_text, benchmark_response_store]
+
+def run_benchmarks(backend, repeat):
+
+	"""
+	desc:
+		Runs all benchmarks for a back-end combination. A benchmark that fails
+		is reported as an error, and does not stop the other benchmarks.
+
+	arguments:
+		backend:
+			desc:	A back-end combination, such as 'legacy'.
+			type:	str
+		repeat:
+			desc:	The number of repetitions for each measurement.
+			type:	int
+
+	returns:
+		desc:	A dict with results and errors.
+		type:	dict
+	"""
+
+	results = {}
+	errors = {}
+	tmp_folder = tempfile.mkdtemp()
+	random.seed(0)
+	exp = init_experiment(backend, os.path.join(tmp_folder, u'benchmark.csv'))
+	try:
+		for benchmark in benchmarks:
+			print(u'Running %s (%s)' % (benchmark.__name__, backend))
+			try:
+				results.update(benchmark(exp, repeat))
+			except Exception as e:
+				errors[benchmark.__name__] = safe_decode(repr(e))
+	finally:
+		exp.end()
+		shutil.rmtree(tmp_folder, ignore_errors=True)
+	return {u'results' : results, u'errors' : errors}
+
+def git_commit():
+
+	"""
+	returns:
+		desc:	The current git commit, or None if it cannot be determined.
+		type:	[str, NoneType]
+	"""
+
+	try:
+		return safe_decode(subprocess.check_output(
+			[u'git', u'rev-parse', u'HEAD'],
+			cwd=os.path.dirname(os.path.abspath(__file__)),
+			stderr=subprocess.STDOUT)).strip()
+	except Exception:
+		return None
+
+def compare(reference, current, tolerance):
+
+	"""
+	desc:
+		Compares benchmark results to reference results, and prints the
+		relative differences.
+
+	arguments:
+		reference:
+			desc:	Reference results, as written by a previous run.
+			type:	dict
+		current:
+			desc:	The current results.
+			type:	dict
+		tolerance:
+			desc:	The relative slowdown (e.g. 0.25 for 25%) above which a
+					measurement is considered a regression.
+			type:	float
+
+	returns:
+		desc:	A list of (backend, measurement, reference, current) tuples
+				for all regressions.
+		type:	list
+	"""
+
+	regressions = []
+	for backend, d in sorted(current[u'backends'].items()):
+		if backend not in reference[u'backends']:
+			continue
+		ref_results = reference[u'backends'][backend][u'results']
+		for name, t in sorted(d[u'results'].items()):
+			if name not in ref_results or ref_results[name] <= 0:
+				continue
+			ratio = t / ref_results[name]
+			flag = u''
+			if ratio > 1 + tolerance:
+				regressions.append((backend, name, ref_results[name], t))
+				flag = u'  REGRESSION'
+			print(u'%-10s %-45s %10.4f -> %10.4f ms (%5.2fx)%s' % (backend,
+				name, ref_results[name], t, ratio, flag))
+	return regressions
+
+def main():
+
+	"""
+	desc:
+		Runs the benchmark suite from the command line. The exit code is 1 if
+		there are errors, or regressions compared to the reference results.
+	"""
+
+	parser = argparse.ArgumentParser(
+		description=u'Measures the performance of OpenSesame hot paths')
+	parser.add_argument(u'--backends', default=u'legacy',
+		help=u'A comma-separated list of back-end combinations')
+	parser.add_argument(u'--repeat', type=int, default=5,
+		help=u'The number of repetitions for each measurement')
+	parser.add_argument(u'--output', default=None,
+		help=u'A JSON file to write the results to')
+	parser.add_argument(u'--compare', default=None,
+		help=u'A JSON file with reference results from a previous run')
+	parser.add_argument(u'--tolerance', type=float, default=.25,
+		help=u'The relative slowdown that counts as a regression')
+	args = parser.parse_args()
+	# Without a display, the legacy back-ends can use a virtual SDL display.
+	# The other back-ends require a virtual X server, such as xvfb-run.
+	if u'DISPLAY' not in os.environ:
+		os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+		os.environ.setdefault(u'SDL_AUDIODRIVER', u'dummy')
+	report = {
+		u'meta' : {
+			u'opensesame_version' : metadata.__version__,
+			u'python_version' : platform.python_version(),
+			u'platform' : platform.platform(),
+			u'commit' : git_commit(),
+			u'time' : time.strftime(u'%Y-%m-%dT%H:%M:%S'),
+			u'repeat' : args.repeat,
+			},
+		u'backends' : {}
+		}
+	for backend in args.backends.split(u','):
+		report[u'backends'][backend] = run_benchmarks(backend, args.repeat)
+	failed = False
+	for backend, d in sorted(report[u'backends'].items()):
+		for name, t in sorted(d[u'results'].items()):
+			print(u'%-10s %-45s %10.4f ms' % (backend, name, t))
+		for name, error in sorted(d[u'errors'].items()):
+			print(u'%-10s %-45s ERROR: %s' % (backend, name, error))
+			failed = True
+	if args.output is not None:
+		with open(args.output, u'w') as fd:
+			json.dump(report, fd, indent=1, sort_keys=True)
+	if args.compare is not None:
+		with open(args.compare) as fd:
+			reference = json.load(fd)
+		if compare(reference, report, args.tolerance):
+			failed = True
+	sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+	main()